@@ -25,6 +25,122 @@ class Settings:
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama2")
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        self.llm_max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        self.llm_keepalive_expiry = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60.0"))
+        self.llm_warmup_timeout = float(os.getenv("LLM_WARMUP_TIMEOUT", "5.0"))
+        # Providers to route between, e.g. "gemini,openai" (default: every
+        # provider with an API key, or Ollama when there is none)
+        self.llm_providers = [
+            p.strip().lower()
+            for p in os.getenv("LLM_PROVIDERS", "").split(",")
+            if p.strip()
+        ]
+        self.llm_hedging = os.getenv("LLM_HEDGING", "true").lower() == "true"
+        # Hedge delay until a provider has enough samples for its own p95
+        self.llm_hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+        self.llm_latency_window = int(os.getenv("LLM_LATENCY_WINDOW", "50"))
+        self.llm_max_error_rate = float(os.getenv("LLM_MAX_ERROR_RATE", "0.5"))
+
+        # Circuit breakers: consecutive failures that open a provider's
+        # circuit, and seconds before a trial call is let through again
+        self.llm_breaker_threshold = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+        self.llm_breaker_reset = float(os.getenv("LLM_BREAKER_RESET", "30.0"))
+        self.tts_breaker_threshold = int(os.getenv("TTS_BREAKER_THRESHOLD", "5"))
+        self.tts_breaker_reset = float(os.getenv("TTS_BREAKER_RESET", "30.0"))
+
+        # DJ script requests from different rooms that arrive while an LLM
+        # call is running, within this window, share the next call
+        # (0 disables batching)
+        self.dj_batch_window = float(os.getenv("DJ_BATCH_WINDOW", "0.1"))
+        self.dj_batch_max_size = int(os.getenv("DJ_BATCH_MAX_SIZE", "16"))
+
+        # Synthesize the generic fallback DJ lines on startup
+        self.dj_fallback_prerender = (
+            os.getenv("DJ_FALLBACK_PRERENDER", "true").lower() == "true"
+        )
+
+        # Spotify HTTP Client Settings
+        self.spotify_http2 = os.getenv("SPOTIFY_HTTP2", "true").lower() == "true"
+        self.spotify_max_connections = int(os.getenv("SPOTIFY_MAX_CONNECTIONS", "100"))
+        self.spotify_max_keepalive_connections = int(
+            os.getenv("SPOTIFY_MAX_KEEPALIVE_CONNECTIONS", "20")
+        )
+        self.spotify_keepalive_expiry = float(
+            os.getenv("SPOTIFY_KEEPALIVE_EXPIRY", "30.0")
+        )
+        self.spotify_timeout = float(os.getenv("SPOTIFY_TIMEOUT", "10.0"))
+        self.spotify_connect_timeout = float(
+            os.getenv("SPOTIFY_CONNECT_TIMEOUT", "5.0")
+        )
+
+        # Spotify Catalog Cache Settings
+        self.spotify_cache_size = int(os.getenv("SPOTIFY_CACHE_SIZE", "2048"))
+        self.spotify_cache_negative_ttl = float(
+            os.getenv("SPOTIFY_CACHE_NEGATIVE_TTL", "600")
+        )
+
+        # Spotify Rate Limiting Settings (a rate limit of 0 disables the
+        # app-wide token bucket)
+        self.spotify_rate_limit = float(os.getenv("SPOTIFY_RATE_LIMIT", "25"))
+        self.spotify_rate_burst = int(os.getenv("SPOTIFY_RATE_BURST", "50"))
+        self.spotify_per_token_concurrency = int(
+            os.getenv("SPOTIFY_PER_TOKEN_CONCURRENCY", "4")
+        )
+        self.spotify_max_retries = int(os.getenv("SPOTIFY_MAX_RETRIES", "3"))
+        self.spotify_backoff_base = float(os.getenv("SPOTIFY_BACKOFF_BASE", "0.5"))
+        self.spotify_backoff_max = float(os.getenv("SPOTIFY_BACKOFF_MAX", "8.0"))
+        self.spotify_max_retry_after = float(
+            os.getenv("SPOTIFY_MAX_RETRY_AFTER", "30.0")
+        )
+
+        # Recommendation Settings
+        self.recommendation_deadline = float(
+            os.getenv("RECOMMENDATION_DEADLINE", "4.0")
+        )
+        self.candidate_pool_size = int(os.getenv("CANDIDATE_POOL_SIZE", "40"))
+        self.candidate_pool_low_watermark = int(
+            os.getenv("CANDIDATE_POOL_LOW_WATERMARK", "6")
+        )
+        self.candidate_max_age = float(os.getenv("CANDIDATE_MAX_AGE", "1800"))
+
+        # Moods the local classifier is at least this sure of skip the LLM
+        # (above 1 sends every mood to the LLM)
+        self.mood_classifier_threshold = float(
+            os.getenv("MOOD_CLASSIFIER_THRESHOLD", "0.8")
+        )
+
+        # Mood Cache Settings
+        self.mood_cache_size = int(os.getenv("MOOD_CACHE_SIZE", "512"))
+        self.mood_cache_ttl = float(os.getenv("MOOD_CACHE_TTL", "86400"))
+        # 0 disables the fuzzy tier
+        self.mood_cache_fuzzy_threshold = float(
+            os.getenv("MOOD_CACHE_FUZZY_THRESHOLD", "0.85")
+        )
+
+        # DJ Commentary Settings
+        self.dj_commentary_concurrency = int(
+            os.getenv("DJ_COMMENTARY_CONCURRENCY", "4")
+        )
+        self.dj_commentary_queue_size = int(os.getenv("DJ_COMMENTARY_QUEUE_SIZE", "2"))
+        self.dj_pregen_concurrency = int(os.getenv("DJ_PREGEN_CONCURRENCY", "2"))
+
+        # Voice Clip Cache Settings
+        self.voice_cache_max_mb = float(os.getenv("VOICE_CACHE_MAX_MB", "200"))
+        self.voice_cache_max_files = int(os.getenv("VOICE_CACHE_MAX_FILES", "2000"))
+        self.voice_streaming = os.getenv("VOICE_STREAMING", "true").lower() == "true"
+        self.voice_stream_buffers = int(os.getenv("VOICE_STREAM_BUFFERS", "32"))
+
+        # Room Store Settings
+        self.room_store = os.getenv("ROOM_STORE", "memory").lower()
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.room_store_max_retries = int(os.getenv("ROOM_STORE_MAX_RETRIES", "5"))
+
+        # Socket.IO Settings (redis://... or memory:// to share broadcasts)
+        self.socketio_message_queue = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+        self.socketio_channel = os.getenv("SOCKETIO_CHANNEL", "vibesync")
+
+        # Room Sync Settings
+        self.room_snapshot_interval = int(os.getenv("ROOM_SNAPSHOT_INTERVAL", "50"))
 
     @classmethod
     def get_settings(cls) -> "Settings":
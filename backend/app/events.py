@@ -1,91 +1,237 @@
 import uuid
+from typing import Any, Dict, Optional
 
+from app.core.config import Settings
 from app.logic.mood_parser import parse_mood
+from app.logic.room_sync import room_sync
 from app.server import sio
-from app.services.llm import generate_dj_script
-from app.services.recommendations import get_recommendations
+from app.services.dj_commentary import DJCommentaryPool
+from app.services.dj_pregen import DJPregenerator
+from app.services.llm import generate_dj_script, stream_dj_script
+from app.services.prefetch import prefetcher
 from app.services.spotify_client import SpotifyService
-from app.state import rooms, sid_map
+from app.state import room_locks, rooms, sid_map
+from app.utils.exceptions import CircuitOpenError
 from app.utils.logger import logger
 from app.utils.models import RoomState, RoomUser, Track, UserVibeData, VibeTrack
 
 
+def build_dj_context(
+    room: RoomState, track: Track, next_song: Optional[Track]
+) -> Dict[str, Any]:
+    """Prompt context for the DJ line introducing track."""
+    added_by_name = "someone"
+    if track.added_by and track.added_by not in ("system", "anonymous"):
+        for u in room.users:
+            if u.id == track.added_by:
+                added_by_name = u.name
+                break
+
+    return {
+        "current_song_name": track.name,
+        "current_song_artist": track.artist,
+        "next_song_name": next_song.name if next_song else "nothing queued",
+        "next_song_artist": next_song.artist if next_song else "unknown",
+        "added_by_user": added_by_name,
+        "vibe_description": "keeping it fresh",
+    }
+
+
+async def generate_commentary(
+    room: RoomState, track: Track, next_song: Optional[Track]
+) -> Optional[Dict[str, Any]]:
+    """Generate the DJ line introducing track, and its voice clip."""
+    script = await generate_dj_script(build_dj_context(room, track, next_song))
+    if not script:
+        return None
+
+    audio_url = None
+    try:
+        from app.services.voice import generate_voice_clip
+
+        audio_url = await generate_voice_clip(script)
+    except CircuitOpenError as e:
+        logger.debug(f"TTS skipped: {e}")
+    except Exception as e:
+        logger.error(f"TTS generation failed: {e}")
+
+    return {"text": script, "audio_url": audio_url}
+
+
+async def stream_commentary(
+    room_id: str, room: RoomState, track: Track, next_song: Optional[Track]
+) -> None:
+    """
+    Speak the DJ line while the LLM is still writing it.
+    TTS starts on the first sentence, and dj_commentary goes out as soon as
+    the first audio exists. Sentences written after that follow as
+    dj_commentary_text.
+    """
+    from app.services.voice import ScriptSpeech
+
+    speech = ScriptSpeech(stream_dj_script(build_dj_context(room, track, next_song)))
+    try:
+        try:
+            audio_url = await speech.audio_url()
+        except CircuitOpenError as e:
+            logger.debug(f"TTS skipped: {e}")
+            audio_url = None
+        except Exception as e:
+            logger.error(f"TTS generation failed: {e}")
+            audio_url = None
+
+        if audio_url is None:
+            script = await speech.text()
+            if script:
+                await sio.emit(
+                    "dj_commentary", {"text": script, "audio_url": None}, room=room_id
+                )
+            return
+
+        spoken = len(speech.sentences)
+        await sio.emit(
+            "dj_commentary",
+            {"text": " ".join(speech.sentences[:spoken]), "audio_url": audio_url},
+            room=room_id,
+        )
+        logger.info(f"DJ Commentary streaming in room {room_id}")
+
+        await speech.text()
+        rest = speech.sentences[spoken:]
+        if rest:
+            await sio.emit("dj_commentary_text", {"text": " ".join(rest)}, room=room_id)
+    finally:
+        speech.cancel()
+
+
 async def trigger_dj_voice(room_id: str, current_track: Track) -> None:
     """Helper to generate and emit DJ commentary."""
-    room = rooms.get(room_id)
+    room = await rooms.get(room_id)
     if not room or not room.ai_mode_enabled:
         return
 
     try:
         next_song = room.queue[0] if room.queue else None
+        if settings.voice_streaming:
+            await stream_commentary(room_id, room, current_track, next_song)
+            return
 
-        added_by_name = "someone"
-        if current_track.added_by and current_track.added_by not in (
-            "system",
-            "anonymous",
-        ):
-            for u in room.users:
-                if u.id == current_track.added_by:
-                    added_by_name = u.name
-                    break
-
-        context = {
-            "current_song_name": current_track.name,
-            "current_song_artist": current_track.artist,
-            "next_song_name": next_song.name if next_song else "nothing queued",
-            "next_song_artist": next_song.artist if next_song else "unknown",
-            "added_by_user": added_by_name,
-            "vibe_description": "keeping it fresh",
-        }
-
-        script = await generate_dj_script(context)
-
-        audio_url = None
-        if script:
-            try:
-                from app.services.voice import generate_voice_clip
-
-                audio_url = await generate_voice_clip(script)
-            except Exception as e:
-                logger.error(f"TTS generation failed: {e}")
-
-        if script:
-            await sio.emit(
-                "dj_commentary", {"text": script, "audio_url": audio_url}, room=room_id
-            )
+        commentary = await generate_commentary(room, current_track, next_song)
+        if commentary:
+            await sio.emit("dj_commentary", commentary, room=room_id)
             logger.info(f"DJ Commentary emitted for room {room_id}")
 
     except Exception as e:
         logger.error(f"Failed to generate DJ commentary: {e}")
 
 
+async def pregenerate_dj_voice(
+    room_id: str, track: Track, next_song: Optional[Track]
+) -> Optional[Dict[str, Any]]:
+    """Generate commentary for a queued track ahead of it playing."""
+    room = await rooms.get(room_id)
+    if not room or not room.ai_mode_enabled:
+        return None
+    return await generate_commentary(room, track, next_song)
+
+
+settings = Settings.get_settings()
+
+# Looked up at call time so tests can patch trigger_dj_voice
+dj_commentary = DJCommentaryPool(
+    lambda room_id, track: trigger_dj_voice(room_id, track),
+    concurrency=settings.dj_commentary_concurrency,
+    queue_size=settings.dj_commentary_queue_size,
+)
+dj_pregen = DJPregenerator(
+    lambda room_id, track, next_song: pregenerate_dj_voice(room_id, track, next_song),
+    concurrency=settings.dj_pregen_concurrency,
+)
+
+
+async def emit_pregenerated_commentary(
+    room_id: str, room: RoomState, track: Track
+) -> bool:
+    """
+    Emit the commentary prepared for a track that just started playing.
+    Returns False if none was ready and it still has to be generated.
+    """
+    next_song = room.queue[0] if room.queue else None
+    commentary = dj_pregen.take(room_id, track, next_song)
+    if not commentary:
+        return False
+
+    # Whatever was still being generated for the previous track is stale
+    dj_commentary.cancel(room_id)
+    await sio.emit("dj_commentary", commentary, room=room_id)
+    logger.info(f"Pre-generated DJ Commentary emitted for room {room_id}")
+    return True
+
+
+def _find_room_token(sid: str, room_id: str) -> Optional[str]:
+    """
+    Return the Spotify token of the socket, or of any other user in the room.
+    """
+    user_session = sid_map.get(sid)
+    token = user_session.get("token") if user_session else None
+    if token:
+        return token
+
+    # Fallback: If current user has no token (e.g. anonymous), try to find ANY user in the room with a token
+    token = sid_map.room_token(room_id)
+    if token:
+        logger.info(f"Using fallback token from another session in room {room_id}")
+    return token
+
+
+async def broadcast_room_state(
+    room_id: str, room: RoomState, skip_sid: Optional[str] = None
+) -> None:
+    """Broadcast what changed in the room since the last room_state/room_patch."""
+    update = room_sync.update(room_id, room)
+    if update:
+        event, payload = update
+        await sio.emit(event, payload, room=room_id, skip_sid=skip_sid)
+
+
 @sio.event
 async def connect(sid, environ) -> None:
     logger.debug(f"Socket Connected: {sid}")
 
 
-@sio.event
-async def disconnect(sid) -> None:
-    if sid in sid_map:
-        user_info = sid_map[sid]
-        room_id = user_info.get("room_id")
-        user_id = user_info.get("user_id")
+async def _remove_session(sid: str) -> None:
+    """
+    Drop the socket's session and remove its user from the room once their
+    last session there is gone.
+    """
+    user_info = sid_map.get(sid)
+    if user_info is None:
+        return
+
+    room_id = user_info.get("room_id")
+    user_id = user_info.get("user_id")
+
+    del sid_map[sid]  # Remove current socket first
+
+    if room_id and not sid_map.room_sids(room_id):
+        # Nobody left to play for; stop prefetching for the room
+        prefetcher.forget(room_id)
 
-        del sid_map[sid]  # Remove current socket first
+    # Only remove user from room if no active sessions remain
+    if room_id and not sid_map.user_sids(room_id, user_id):
 
-        if room_id and room_id in rooms:
-            # Check if this user has other active sessions in this room
-            is_still_active = False
-            for other_sid, info in sid_map.items():
-                if info.get("room_id") == room_id and info.get("user_id") == user_id:
-                    is_still_active = True
-                    break
+        def _remove_user(room: RoomState) -> None:
+            room.users = [u for u in room.users if u.id != user_id]
 
-            # Only remove user from room if no active sessions remain
-            if not is_still_active:
-                room = rooms[room_id]
-                room.users = [u for u in room.users if u.id != user_id]
-                await sio.emit("room_state", room.model_dump(), room=room_id)
+        async with room_locks(room_id):
+            room, _ = await rooms.update(room_id, _remove_user)
+            if room:
+                await broadcast_room_state(room_id, room)
+
+
+@sio.event
+async def disconnect(sid) -> None:
+    await _remove_session(sid)
 
 
 @sio.event
@@ -99,10 +245,8 @@ async def join_room(sid, data) -> None:
 
     await sio.enter_room(sid, room_id)
 
-    if room_id not in rooms:
-        rooms[room_id] = RoomState()
-
-    room = rooms[room_id]
+    user = None
+    user_vibe = None
 
     if user_profile and user_profile.get("id"):
         user = RoomUser(
@@ -112,9 +256,6 @@ async def join_room(sid, data) -> None:
             if user_profile.get("images")
             else None,
         )
-        existing = [u for u in room.users if u.id != user.id]
-        existing.append(user)
-        room.users = existing
 
         token = data.get("token")
         sid_map[sid] = {"room_id": room_id, "user_id": user.id, "token": token}
@@ -163,7 +304,7 @@ async def join_room(sid, data) -> None:
                             )
                         )
 
-                room.vibe_profile.users_data[user.id] = UserVibeData(
+                user_vibe = UserVibeData(
                     top_tracks=refined_tracks,
                 )
 
@@ -181,17 +322,45 @@ async def join_room(sid, data) -> None:
     else:
         sid_map[sid] = {"room_id": room_id, "user_id": "anonymous"}
 
-    await sio.emit("room_state", room.model_dump(), room=sid)
-    await sio.emit("room_state", room.model_dump(), room=room_id)
+    def _join(room: RoomState) -> None:
+        if user:
+            existing = [u for u in room.users if u.id != user.id]
+            existing.append(user)
+            room.users = existing
+        if user_vibe:
+            room.vibe_profile.users_data[user.id] = user_vibe
+
+    # Profile lookups are done, so the room is only touched once
+    async with room_locks(room_id):
+        room, _ = await rooms.update(room_id, _join, create=True)
+
+        # Everyone else gets the change, the new socket gets the full state
+        await broadcast_room_state(room_id, room, skip_sid=sid)
+        await sio.emit("room_state", room_sync.snapshot(room_id, room), room=sid)
+
+
+@sio.event
+async def request_room_state(sid, data) -> None:
+    """Resync a client that missed a room_patch."""
+    session = sid_map.get(sid, {})
+    room_id = (data or {}).get("room_id") or session.get("room_id")
+    if not room_id:
+        return
+
+    async with room_locks(room_id):
+        room = await rooms.get(room_id)
+        if room:
+            await broadcast_room_state(room_id, room, skip_sid=sid)
+            await sio.emit("room_state", room_sync.snapshot(room_id, room), room=sid)
 
 
 @sio.event
 async def leave_session(sid, data) -> None:
     room_id = data.get("room_id")
     if room_id:
-        sio.leave_room(sid, room_id)
-        if sid in sid_map:
-            pass
+        await sio.leave_room(sid, room_id)
+        if sid_map.get(sid, {}).get("room_id") == room_id:
+            await _remove_session(sid)
 
 
 @sio.event
@@ -208,9 +377,8 @@ async def add_to_queue(sid, data) -> None:
     session = sid_map.get(sid, {})
     user_id = session.get("user_id", "anonymous")
 
-    if room_id and track_data and room_id in rooms:
-        room = rooms[room_id]
-
+    room = None
+    if room_id and track_data:
         new_track = Track(
             uri=track_data.get("uri"),
             name=track_data.get("name"),
@@ -221,38 +389,69 @@ async def add_to_queue(sid, data) -> None:
             added_by=user_id,
         )
 
-        # Populate user info if available
-        if user_id != "anonymous":
-            found_user = next((u for u in room.users if u.id == user_id), None)
-            if found_user:
-                new_track.added_by_name = found_user.name
-                new_track.added_by_image = found_user.image
-
-        if room.current_track is None:
-            room.current_track = new_track
-            room.is_playing = True
-            logger.debug(f"Emitting play_track for {new_track.name} in room {room_id}")
-            await sio.emit("play_track", new_track.model_dump(), room=room_id)
-            await sio.emit("room_state", room.model_dump(), room=room_id)
-            await trigger_dj_voice(room_id, new_track)
-        else:
+        def _add(room: RoomState) -> bool:
+            """Queue the track, or play it right away if nothing is playing."""
+            # Populate user info if available
+            if user_id != "anonymous":
+                found_user = next((u for u in room.users if u.id == user_id), None)
+                if found_user:
+                    new_track.added_by_name = found_user.name
+                    new_track.added_by_image = found_user.image
+
+            if room.current_track is None:
+                room.current_track = new_track
+                room.is_playing = True
+                return True
+
             room.queue.append(new_track)
-            await sio.emit(
-                "queue_updated", [t.model_dump() for t in room.queue], room=room_id
-            )
-    else:
+            return False
+
+        announced = False
+        async with room_locks(room_id):
+            room, started = await rooms.update(room_id, _add)
+            if room is not None:
+                if started:
+                    logger.debug(
+                        f"Emitting play_track for {new_track.name} in room {room_id}"
+                    )
+                    await sio.emit("play_track", new_track.model_dump(), room=room_id)
+                    announced = await emit_pregenerated_commentary(
+                        room_id, room, new_track
+                    )
+                    await broadcast_room_state(room_id, room)
+                else:
+                    await sio.emit(
+                        "queue_updated",
+                        [t.model_dump() for t in room.queue],
+                        room=room_id,
+                    )
+                prefetcher.schedule(room_id, room, _find_room_token(sid, room_id))
+                dj_pregen.refresh(room_id, room)
+
+    if room is None:
         logger.warning(
             f"Add to queue failed: Room {room_id} not found or invalid data."
         )
+        return
+
+    # DJ commentary waits on the LLM and TTS, so it is generated in the background
+    if started and not announced:
+        dj_commentary.submit(room_id, new_track)
 
 
 @sio.event
 async def toggle_playback(sid, data) -> None:
     room_id = data.get("room_id")
-    if room_id in rooms:
-        room = rooms[room_id]
-        if room.current_track:
-            room.is_playing = not room.is_playing
+
+    def _toggle(room: RoomState) -> bool:
+        if not room.current_track:
+            return False
+        room.is_playing = not room.is_playing
+        return True
+
+    async with room_locks(room_id):
+        room, toggled = await rooms.update(room_id, _toggle)
+        if toggled:
             await sio.emit(
                 "playback_toggled", {"is_playing": room.is_playing}, room=room_id
             )
@@ -261,140 +460,108 @@ async def toggle_playback(sid, data) -> None:
 @sio.event
 async def skip_song(sid, data) -> None:
     room_id = data.get("room_id")
-    if room_id in rooms:
-        room = rooms[room_id]
+    room = await rooms.get(room_id)
+    if not room:
+        return
 
+    # Auto-Queue Logic (Task 4.1)
+    # Ensure buffer of at least 2 songs, topped up from the room's candidate pool
+    token = _find_room_token(sid, room_id)
+    auto_tracks = []
+    if len(room.queue) < 2:
+        if not token:
+            logger.error(
+                f"Auto-queue failed: No valid Spotify tokens found in room {room_id}"
+            )
+        else:
+            # Add up to 3 tracks to buffer
+            auto_tracks = prefetcher.take(room_id, room, 3)
+
+            if not auto_tracks and not room.queue:
+                # Cold start: nothing left to play until a batch arrives
+                logger.debug(
+                    f"Candidate pool empty for room {room_id}, fetching recommendations"
+                )
+                prefetcher.schedule(room_id, room, token)
+                await prefetcher.wait(room_id)
+                auto_tracks = prefetcher.take(room_id, room, 3)
+
+            if not auto_tracks:
+                logger.warning("Candidate pool had no tracks to auto-queue.")
+
+    def _advance(room: RoomState):
+        """Move the current track to history and play the next one."""
         if room.current_track:
             room.history.insert(0, room.current_track)
             # Keep history size manageable
             if len(room.history) > 20:
                 room.history.pop()
 
-        # Auto-Queue Logic (Task 4.1)
-        # Ensure buffer of at least 2 songs
+        added = []
         if len(room.queue) < 2:
-            user_session = sid_map.get(sid)
-            token = user_session.get("token") if user_session else None
-
-            # Fallback: If current user has no token (e.g. anonymous), try to find ANY user in the room with a token
-            if not token:
-                logger.warning(
-                    f"No token found for current socket {sid}, searching room participants..."
-                )
-                for s, info in sid_map.items():
-                    if info.get("room_id") == room_id and info.get("token"):
-                        token = info.get("token")
-                        logger.info(
-                            f"Using fallback token from user {info.get('user_id')}"
-                        )
-                        break
-
-            if not token:
-                logger.error(
-                    f"Auto-queue failed: No valid Spotify tokens found in room {room_id}"
-                )
-
-            if token:
-                logger.debug(f"Auto-queueing for room {room_id} (Token acquired)")
-                seeds = {}
-                history_items = room.history[:5]
-                # Try to use current track as seed - even if it's moving to history
-                seed_track = room.current_track
-                if not seed_track and room.history:
-                    seed_track = room.history[0]
-
-                if seed_track and seed_track.uri and "spotify:track:" in seed_track.uri:
-                    try:
-                        track_id = seed_track.uri.split(":")[-1].strip()
-                        if track_id:
-                            seeds["seed_tracks"] = [track_id]
-                    except Exception:
-                        pass
-
-                try:
-                    logger.debug(f"Fetching recommendations with seeds: {seeds}")
-                    recs = await get_recommendations(
-                        token, seeds, history_items, room.vibe_profile.active_mood
-                    )
-                    logger.debug(f"Recommendations received: {len(recs)} tracks")
-
-                    if recs:
-                        # Add up to 3 tracks to buffer
-                        added_count = 0
-                        for rec in recs:
-                            if added_count >= 3:
-                                break
-
-                            # Sanity check if check already in queue
-                            if any(t.uri == rec["uri"] for t in room.queue):
-                                continue
-
-                            top_rec = rec
-                            # Convert to Track
-                            artist_name = (
-                                top_rec["artists"][0]["name"]
-                                if top_rec["artists"]
-                                else "Unknown"
-                            )
-                            image_url = (
-                                top_rec["album"]["images"][0]["url"]
-                                if top_rec["album"]["images"]
-                                else None
-                            )
+            queued = {t.uri for t in room.queue}
+            added = [t for t in auto_tracks if t.uri not in queued]
+            room.queue.extend(added)
+
+        next_track = room.queue.pop(0) if room.queue else None
+        room.current_track = next_track
+        room.is_playing = next_track is not None
+        return added, next_track
+
+    # The room may have changed while waiting on recommendations, so the
+    # skip is applied to its latest state. Holding the room lock through the
+    # emits keeps concurrent skips from announcing tracks out of order.
+    async with room_locks(room_id):
+        room, result = await rooms.update(room_id, _advance)
+        if room is None:
+            return
+        added, next_track = result
+        # The queue may have filled up while waiting; keep the rest for later
+        prefetcher.put_back(room_id, room, [t for t in auto_tracks if t not in added])
+
+        if added:
+            await sio.emit(
+                "queue_updated",
+                [t.model_dump() for t in room.queue],
+                room=room_id,
+            )
+            logger.info(f"Auto-queued via AI: {len(added)} tracks")
 
-                            auto_track = Track(
-                                uri=top_rec["uri"],
-                                name=top_rec["name"],
-                                artist=artist_name,
-                                image=image_url,
-                                duration_ms=top_rec["duration_ms"],
-                                uuid=str(uuid.uuid4()),
-                                added_by="system",
-                                added_by_name="DJ AI",
-                            )
-                            room.queue.append(auto_track)
-                            added_count += 1
-
-                        if added_count > 0:
-                            await sio.emit(
-                                "queue_updated",
-                                [t.model_dump() for t in room.queue],
-                                room=room_id,
-                            )
-                            logger.info(f"Auto-queued via AI: {added_count} tracks")
-                    else:
-                        logger.warning("Recommendations service returned no tracks.")
-                except Exception as e:
-                    logger.error(f"Auto-queue failed: {e}")
-
-        if len(room.queue) > 0:
-            next_track = room.queue.pop(0)
-            room.current_track = next_track
-            room.is_playing = True
+        announced = False
+        if next_track:
             await sio.emit("play_track", next_track.model_dump(), room=room_id)
-            await sio.emit("room_state", room.model_dump(), room=room_id)
-            await trigger_dj_voice(room_id, next_track)
+            announced = await emit_pregenerated_commentary(room_id, room, next_track)
+            await broadcast_room_state(room_id, room)
+            prefetcher.schedule(room_id, room, token)
         else:
-            room.current_track = None
-            room.is_playing = False
             await sio.emit("stop_player", room=room_id)
-            await sio.emit("room_state", room.model_dump(), room=room_id)
+            await broadcast_room_state(room_id, room)
+        dj_pregen.refresh(room_id, room)
+
+    if next_track and not announced:
+        dj_commentary.submit(room_id, next_track)
 
 
 @sio.event
 async def remove_from_queue(sid, data) -> None:
     room_id = data.get("room_id")
     track_uuid = data.get("track_uuid")
+    if not track_uuid:
+        return
 
-    if room_id in rooms and track_uuid:
-        room = rooms[room_id]
+    def _remove(room: RoomState) -> bool:
         original_len = len(room.queue)
         room.queue = [t for t in room.queue if t.uuid != track_uuid]
+        return len(room.queue) != original_len
 
-        if len(room.queue) != original_len:
+    async with room_locks(room_id):
+        room, removed = await rooms.update(room_id, _remove)
+        if removed:
             await sio.emit(
                 "queue_updated", [t.model_dump() for t in room.queue], room=room_id
             )
+            prefetcher.schedule(room_id, room, _find_room_token(sid, room_id))
+            dj_pregen.refresh(room_id, room)
 
 
 @sio.event
@@ -402,20 +569,28 @@ async def set_vibe(sid, data) -> None:
     room_id = data.get("room_id")
     vibe_text = data.get("vibe_text")
 
-    if room_id in rooms and vibe_text:
-        room = rooms[room_id]
-
+    if vibe_text and await rooms.exists(room_id):
         # Parse Mood via LLM
         targets = await parse_mood(vibe_text)
 
-        # Update Room Vibe
-        room.vibe_profile.active_mood = targets
+        def _set_mood(room: RoomState) -> None:
+            room.vibe_profile.active_mood = targets
 
-        logger.info(f"Vibe set to '{vibe_text}' for room {room_id}: {targets}")
+        async with room_locks(room_id):
+            # Update Room Vibe
+            room, _ = await rooms.update(room_id, _set_mood)
+            if room is None:
+                return
 
-        await sio.emit(
-            "vibe_updated", {"vibe": vibe_text, "targets": targets}, room=room_id
-        )
+            # Pooled recommendations were picked for the old vibe
+            prefetcher.invalidate(room_id, room)
+            prefetcher.schedule(room_id, room, _find_room_token(sid, room_id))
+
+            logger.info(f"Vibe set to '{vibe_text}' for room {room_id}: {targets}")
+
+            await sio.emit(
+                "vibe_updated", {"vibe": vibe_text, "targets": targets}, room=room_id
+            )
 
 
 @sio.event
@@ -423,16 +598,9 @@ async def set_repeat_mode(sid, data) -> None:
     room_id = data.get("room_id")
     state = data.get("state")  # 'track', 'context', 'off'
 
-    if room_id in rooms and state:
+    if state and await rooms.exists(room_id):
         # Find a valid token
-        user_session = sid_map.get(sid)
-        token = user_session.get("token") if user_session else None
-
-        if not token:
-            for s, info in sid_map.items():
-                if info.get("room_id") == room_id and info.get("token"):
-                    token = info.get("token")
-                    break
+        token = _find_room_token(sid, room_id)
 
         if token:
             success = await SpotifyService.set_repeat_mode(token, state)
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.utils.models import Track
+
+
+def vibe_key(active_mood: Dict[str, Any]) -> str:
+    """Stable key identifying the room vibe the candidates were picked for."""
+    encoded = json.dumps(active_mood or {}, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class CandidatePool:
+    """
+    Per-room pool of recommended tracks awaiting auto-queue.
+    Keeps the whole recommendation batch instead of the first few picks,
+    de-duplicates by URI in O(1), and ages out candidates that are too old
+    or were picked for a different vibe.
+    """
+
+    def __init__(self, capacity: int = 40, max_age: float = 1800.0):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.vibe: Optional[str] = None
+        # uri -> (track, added_at). Insertion order is also age order.
+        self._candidates: "OrderedDict[str, Tuple[Track, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._candidates
+
+    def set_vibe(self, vibe: str) -> None:
+        """Switch to a new vibe, dropping candidates picked for the old one."""
+        if vibe != self.vibe:
+            self._candidates.clear()
+            self.vibe = vibe
+
+    def prune(self) -> int:
+        """Drop candidates older than max_age. Returns the number dropped."""
+        cutoff = time.monotonic() - self.max_age
+        dropped = 0
+        while self._candidates:
+            _, (_, added_at) = next(iter(self._candidates.items()))
+            if added_at > cutoff:
+                break
+            self._candidates.popitem(last=False)
+            dropped += 1
+        return dropped
+
+    def add(self, tracks: Iterable[Track], exclude_uris: Set[str], vibe: str) -> int:
+        """
+        Add candidates for the given vibe, skipping excluded and known URIs.
+        Batches picked for a vibe other than the current one are ignored.
+        Returns the number of tracks added.
+        """
+        if vibe != self.vibe:
+            return 0
+
+        now = time.monotonic()
+        added = 0
+        for track in tracks:
+            if len(self._candidates) >= self.capacity:
+                break
+            if track.uri in exclude_uris or track.uri in self._candidates:
+                continue
+            self._candidates[track.uri] = (track, now)
+            added += 1
+        return added
+
+    def take(self, count: int, exclude_uris: Set[str]) -> List[Track]:
+        """
+        Pop up to count of the oldest fresh candidates not in exclude_uris.
+        Taken URIs are added to exclude_uris.
+        """
+        self.prune()
+        taken = []
+        while self._candidates and len(taken) < count:
+            uri, (track, _) = self._candidates.popitem(last=False)
+            if uri in exclude_uris:
+                continue
+            taken.append(track)
+            exclude_uris.add(uri)
+        return taken
+
+    def put_back(
+        self, tracks: Iterable[Track], exclude_uris: Set[str], vibe: str
+    ) -> int:
+        """
+        Return taken candidates to the front of the pool, in order, so they
+        are taken next. They count as old as the current oldest candidate.
+        Ignored if the vibe changed since they were taken.
+        Returns the number of tracks put back.
+        """
+        if vibe != self.vibe:
+            return 0
+
+        added_at = time.monotonic()
+        if self._candidates:
+            _, (_, added_at) = next(iter(self._candidates.items()))
+        put = 0
+        for track in reversed(list(tracks)):
+            if len(self._candidates) >= self.capacity:
+                break
+            if track.uri in exclude_uris or track.uri in self._candidates:
+                continue
+            self._candidates[track.uri] = (track, added_at)
+            self._candidates.move_to_end(track.uri, last=False)
+            put += 1
+        return put
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._candidates), "capacity": self.capacity}
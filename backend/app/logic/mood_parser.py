@@ -1,8 +1,23 @@
+import copy
 import json
-from typing import Any, Dict
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.config import Settings
+from app.logic.mood_vocabulary import (
+    GENRE_ALIASES,
+    MOOD_KEYWORDS,
+    MOOD_TARGETS,
+    NEGATIONS,
+    NEUTRAL_WORDS,
+)
 from app.services.llm import get_llm_client
+from app.utils.cache import TTLCache
 from app.utils.logger import logger
+from app.utils.singleflight import SingleFlight
 
 MOOD_PARSER_SYSTEM_PROMPT = """
 You are an expert music curator and mood analyst.
@@ -20,6 +35,220 @@ Do not explain. Return ONLY the JSON object.
 """
 
 
+# Words that do not change what a mood means, e.g. "chill vibes" == "chill"
+FILLER_WORDS = frozenset(
+    {"a", "some", "the", "please", "music", "songs", "tunes", "vibe", "vibes", "mode"}
+)
+
+
+def normalize_mood(mood_text: str) -> str:
+    """
+    Canonical form of a mood for cache lookups: case, accents, punctuation,
+    spacing and filler words are ignored.
+    """
+    text = unicodedata.normalize("NFKC", mood_text).casefold()
+    words = re.findall(r"[\w'-]+", text)
+    meaningful = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(meaningful or words)
+
+
+# Two different words count as one misspelled the other at this similarity
+TYPO_SIMILARITY = 0.75
+
+
+def _word_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    # "80s" vs "90s" or "rock" vs "folk" name different music, however close
+    if any(c.isdigit() for c in a + b) or a in GENRE_ALIASES or b in GENRE_ALIASES:
+        return 0.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    return ratio if ratio >= TYPO_SIMILARITY else 0.0
+
+
+def mood_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two normalized moods in [0, 1]. Their words must pair up
+    one to one, in any order, each pair being the same word or a typo of it;
+    the score is the average similarity of the pairs. Negated moods never
+    match anything but themselves.
+    """
+    words_a, words_b = set(a.split()), set(b.split())
+    if not words_a or len(words_a) != len(words_b):
+        return 0.0
+    if words_a & NEGATIONS or words_b & NEGATIONS:
+        return 0.0
+
+    unpaired = words_b - words_a
+    total = float(len(words_a & words_b))
+    for word in words_a - words_b:
+        score, match = max(
+            ((_word_similarity(word, other), other) for other in unpaired),
+            default=(0.0, None),
+        )
+        if not score:
+            return 0.0
+        unpaired.discard(match)
+        total += score
+    return total / len(words_a)
+
+
+class MoodCache:
+    """
+    Parsed moods keyed by normalized mood text.
+    Exact matches come from an LRU with TTL. Otherwise the most similar
+    mood seen before is reused if it clears the fuzzy threshold; see
+    mood_similarity for what counts as the same mood.
+    """
+
+    def __init__(
+        self, maxsize: int = 512, ttl: float = 86400.0, fuzzy_threshold: float = 0.85
+    ):
+        self._exact = TTLCache(maxsize=maxsize, default_ttl=ttl)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_hits = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached targets, so callers may modify them."""
+        value = self._exact.get(key)
+        if value is None and self.fuzzy_threshold > 0:
+            value = self._closest(key)
+            if value is not None:
+                self.fuzzy_hits += 1
+        return copy.deepcopy(value)
+
+    def _closest(self, key: str) -> Optional[Dict[str, Any]]:
+        best_score, best = self.fuzzy_threshold, None
+        for seen, value in self._exact.items():
+            score = mood_similarity(key, seen)
+            if score >= best_score:
+                best_score, best = score, value
+        return best
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._exact.set(key, copy.deepcopy(value))
+
+    def clear(self) -> None:
+        self._exact.clear()
+        self.fuzzy_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        exact = self._exact.stats()
+        lookups = exact["hits"] + exact["misses"]
+        hits = exact["hits"] + self.fuzzy_hits
+        return {
+            "size": exact["size"],
+            "maxsize": exact["maxsize"],
+            "exact_hits": exact["hits"],
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": lookups - hits,
+            "evictions": exact["evictions"],
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class MoodClassifier:
+    """
+    Local first pass over a mood, so common moods skip the LLM.
+
+    Mood words, phrases and genre names are matched against an index
+    precompiled from the mood vocabulary, longest phrase first. Confidence
+    is the share of meaningful words that were recognized, scaled down
+    when they point at different moods. Negations always go to the LLM.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        # phrase tokens -> ("mood", name) or ("genre", seed)
+        self._index: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+        for mood, phrases in MOOD_KEYWORDS.items():
+            for phrase in phrases:
+                self._index[tuple(phrase.split())] = ("mood", mood)
+        for alias, seed in GENRE_ALIASES.items():
+            self._index[tuple(alias.split())] = ("genre", seed)
+        self._max_phrase = max(len(phrase) for phrase in self._index)
+
+        self.local = 0
+        self.escalated = 0
+
+    def _match(self, tokens: List[str], start: int) -> Tuple[int, Optional[Tuple]]:
+        """Longest indexed phrase at tokens[start:], as (length, entry)."""
+        longest = min(self._max_phrase, len(tokens) - start)
+        for length in range(longest, 0, -1):
+            entry = self._index.get(tuple(tokens[start : start + length]))
+            if entry:
+                return length, entry
+        return 1, None
+
+    def classify(self, mood_text: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Return (targets, confidence); targets is None if nothing matched."""
+        text = unicodedata.normalize("NFKC", mood_text).casefold()
+        tokens = re.findall(r"[\w'&-]+", text)
+        if not tokens or any(t in NEGATIONS for t in tokens):
+            return None, 0.0
+
+        moods: Counter = Counter()
+        genres: List[str] = []
+        matched = meaningful = 0
+        i = 0
+        while i < len(tokens):
+            length, entry = self._match(tokens, i)
+            if entry:
+                kind, value = entry
+                if kind == "mood":
+                    moods[value] += 1
+                elif value not in genres:
+                    genres.append(value)
+                matched += length
+                meaningful += length
+            elif tokens[i] not in NEUTRAL_WORDS:
+                meaningful += 1
+            i += length
+
+        if not matched:
+            return None, 0.0
+
+        confidence = matched / meaningful
+        targets: Dict[str, Any] = {"seed_genres": []}
+        if moods:
+            mood, hits = moods.most_common(1)[0]
+            confidence *= hits / sum(moods.values())
+            targets = copy.deepcopy(MOOD_TARGETS[mood])
+
+        # Named genres come first, topped up by the mood's genres
+        seeds = genres + [g for g in targets["seed_genres"] if g not in genres]
+        targets["seed_genres"] = seeds[:3]
+        return targets, round(confidence, 3)
+
+    def resolve(self, mood_text: str) -> Optional[Dict[str, Any]]:
+        """Return targets if the mood is classified confidently, else None."""
+        targets, confidence = self.classify(mood_text)
+        if targets is not None and confidence >= self.threshold:
+            self.local += 1
+            return targets
+        self.escalated += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.local + self.escalated
+        return {
+            "threshold": self.threshold,
+            "local": self.local,
+            "escalated": self.escalated,
+            "local_rate": round(self.local / total, 3) if total else 0.0,
+        }
+
+
+settings = Settings.get_settings()
+mood_cache = MoodCache(
+    maxsize=settings.mood_cache_size,
+    ttl=settings.mood_cache_ttl,
+    fuzzy_threshold=settings.mood_cache_fuzzy_threshold,
+)
+mood_classifier = MoodClassifier(threshold=settings.mood_classifier_threshold)
+_inflight = SingleFlight()
+
+
 def _parse_mood_fallback(mood_text: str) -> Dict[str, Any]:
     """Fallback simple keyword matching if LLM fails."""
     mood = mood_text.lower()
@@ -43,19 +272,38 @@ def _parse_mood_fallback(mood_text: str) -> Dict[str, Any]:
     return {}
 
 
+async def _parse_mood_llm(mood_text: str) -> Dict[str, Any]:
+    client = get_llm_client()
+    response = await client.generate(
+        system_prompt=MOOD_PARSER_SYSTEM_PROMPT, user_prompt=f"Mood: {mood_text}"
+    )
+    clean_response = response.replace("```json", "").replace("```", "").strip()
+    return json.loads(clean_response)
+
+
 async def parse_mood(mood_text: str) -> Dict[str, Any]:
     """
     Parse a mood string into Spotify recommendation target parameters.
-    Uses LLM for complex understanding, falls back to keywords on error.
+    Clear-cut moods are classified locally, moods the LLM has parsed
+    before come from the mood cache, and the rest go to the LLM, falling
+    back to keywords on error.
     """
-    client = get_llm_client()
+    targets = mood_classifier.resolve(mood_text)
+    if targets is not None:
+        return targets
+
+    key = normalize_mood(mood_text)
+    cached = mood_cache.get(key)
+    if cached is not None:
+        return cached
 
     try:
-        response = await client.generate(
-            system_prompt=MOOD_PARSER_SYSTEM_PROMPT, user_prompt=f"Mood: {mood_text}"
-        )
-        clean_response = response.replace("```json", "").replace("```", "").strip()
-        return json.loads(clean_response)
+        # Rooms setting the same new vibe at once share one LLM call
+        targets = await _inflight.do(key, lambda: _parse_mood_llm(mood_text))
     except Exception as e:
         logger.error(f"LLM Mood Parsing failed: {e}")
+        # Fallbacks are not cached, so the LLM gets another try next time
         return _parse_mood_fallback(mood_text)
+
+    mood_cache.set(key, targets)
+    return copy.deepcopy(targets)
@@ -0,0 +1,256 @@
+"""
+Vocabulary for the local mood classifier.
+
+Each mood maps to the targets parse_mood returns and to the words and
+phrases that name it. Genre words map straight to Spotify genre seeds.
+"""
+
+from typing import Any, Dict, List
+
+MOOD_TARGETS: Dict[str, Dict[str, Any]] = {
+    # study, party and chill match _parse_mood_fallback
+    "study": {"seed_genres": ["classical", "ambient", "study"]},
+    "party": {"seed_genres": ["pop", "dance", "house"], "target_popularity": 80},
+    "chill": {"seed_genres": ["acoustic", "chill", "indie-pop"]},
+    "sad": {"seed_genres": ["sad", "rainy-day", "piano"]},
+    "happy": {"seed_genres": ["pop", "happy", "summer"]},
+    "sleep": {"seed_genres": ["sleep", "ambient", "piano"]},
+    "workout": {"seed_genres": ["work-out", "edm", "hip-hop"]},
+    "romance": {"seed_genres": ["romance", "r-n-b", "soul"]},
+    "angry": {"seed_genres": ["metal", "hard-rock", "punk"]},
+    "road-trip": {"seed_genres": ["road-trip", "rock", "pop"]},
+}
+
+MOOD_KEYWORDS: Dict[str, List[str]] = {
+    "study": [
+        "study",
+        "studying",
+        "focus",
+        "focused",
+        "focusing",
+        "concentrate",
+        "concentration",
+        "homework",
+        "exam",
+        "exams",
+        "revision",
+        "reading",
+        "coding",
+        "deep work",
+        "productive",
+        "productivity",
+    ],
+    "party": [
+        "party",
+        "partying",
+        "dance",
+        "dancing",
+        "hype",
+        "hyped",
+        "club",
+        "clubbing",
+        "rave",
+        "banger",
+        "bangers",
+        "turn up",
+        "pregame",
+        "celebrate",
+        "celebration",
+    ],
+    "chill": [
+        "chill",
+        "chilled",
+        "chilling",
+        "chillout",
+        "relax",
+        "relaxed",
+        "relaxing",
+        "mellow",
+        "laid back",
+        "laid-back",
+        "calm",
+        "cozy",
+        "cosy",
+        "unwind",
+        "lazy sunday",
+    ],
+    "sad": [
+        "sad",
+        "blue",
+        "down",
+        "heartbroken",
+        "heartbreak",
+        "melancholy",
+        "melancholic",
+        "cry",
+        "crying",
+        "lonely",
+        "breakup",
+        "gloomy",
+        "rainy day",
+        "depressed",
+    ],
+    "happy": [
+        "happy",
+        "good",
+        "joy",
+        "joyful",
+        "cheerful",
+        "sunny",
+        "upbeat",
+        "feel good",
+        "feel-good",
+        "uplifting",
+        "summer",
+    ],
+    "sleep": [
+        "sleep",
+        "sleepy",
+        "sleeping",
+        "bedtime",
+        "insomnia",
+        "lullaby",
+        "wind down",
+        "nap",
+    ],
+    "workout": [
+        "workout",
+        "work out",
+        "gym",
+        "running",
+        "run",
+        "lifting",
+        "training",
+        "cardio",
+        "pumped",
+        "pump up",
+        "energetic",
+    ],
+    "romance": [
+        "romantic",
+        "romance",
+        "love",
+        "date night",
+        "sensual",
+        "intimate",
+        "valentine",
+    ],
+    "angry": ["angry", "rage", "mad", "furious", "aggressive"],
+    "road-trip": ["road trip", "roadtrip", "driving", "drive", "cruising"],
+}
+
+# Genre words and their Spotify genre seed
+GENRE_ALIASES: Dict[str, str] = {
+    "jazz": "jazz",
+    "rock": "rock",
+    "hip hop": "hip-hop",
+    "hip-hop": "hip-hop",
+    "hiphop": "hip-hop",
+    "rap": "hip-hop",
+    "metal": "metal",
+    "blues": "blues",
+    "country": "country",
+    "reggae": "reggae",
+    "edm": "edm",
+    "techno": "techno",
+    "house": "house",
+    "classical": "classical",
+    "ambient": "ambient",
+    "indie": "indie",
+    "folk": "folk",
+    "punk": "punk",
+    "soul": "soul",
+    "funk": "funk",
+    "disco": "disco",
+    "k-pop": "k-pop",
+    "kpop": "k-pop",
+    "latin": "latin",
+    "r&b": "r-n-b",
+    "rnb": "r-n-b",
+    "r-n-b": "r-n-b",
+    "piano": "piano",
+    "acoustic": "acoustic",
+    "pop": "pop",
+    "electronic": "electronic",
+    "reggaeton": "reggaeton",
+    "opera": "opera",
+    "gospel": "gospel",
+}
+
+# Carry no mood of their own; ignored when measuring how much was understood
+NEUTRAL_WORDS = frozenset(
+    {
+        "i",
+        "i'm",
+        "im",
+        "me",
+        "my",
+        "we",
+        "we're",
+        "us",
+        "our",
+        "let's",
+        "lets",
+        "want",
+        "wanna",
+        "need",
+        "some",
+        "something",
+        "anything",
+        "play",
+        "put",
+        "on",
+        "give",
+        "get",
+        "a",
+        "an",
+        "the",
+        "to",
+        "for",
+        "of",
+        "and",
+        "or",
+        "with",
+        "in",
+        "it",
+        "is",
+        "are",
+        "be",
+        "am",
+        "feel",
+        "feeling",
+        "like",
+        "kind",
+        "kinda",
+        "sort",
+        "type",
+        "just",
+        "really",
+        "very",
+        "so",
+        "super",
+        "pretty",
+        "more",
+        "hard",
+        "please",
+        "music",
+        "songs",
+        "song",
+        "tracks",
+        "tunes",
+        "vibe",
+        "vibes",
+        "vibing",
+        "mode",
+        "mood",
+        "time",
+        "now",
+        "today",
+        "tonight",
+    }
+)
+
+# Change what the surrounding words mean, so the text goes to the LLM
+NEGATIONS = frozenset(
+    {"not", "no", "don't", "dont", "without", "never", "less", "isn't", "nothing"}
+)
@@ -0,0 +1,197 @@
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, get_origin
+
+from app.core.config import Settings
+from app.utils.models import ClientRoomState, RoomState
+from pydantic import BaseModel
+
+# What clients see of a room is ClientRoomState. Its list fields are diffed
+# element by element, the others are replaced as a whole.
+LIST_FIELDS = tuple(
+    name
+    for name, field in ClientRoomState.model_fields.items()
+    if get_origin(field.annotation) is list
+)
+VALUE_FIELDS = tuple(
+    name for name in ClientRoomState.model_fields if name not in LIST_FIELDS
+)
+
+
+def _dump(value: Any) -> Any:
+    return value.model_dump() if isinstance(value, BaseModel) else value
+
+
+def _item_key(item: Any) -> Any:
+    """Identity of a list element: queue entries by uuid, users by id."""
+    for attr in ("uuid", "id", "uri"):
+        key = getattr(item, attr, None)
+        if key:
+            return key
+    return repr(item)
+
+
+def diff_list(
+    field: str,
+    old: Sequence[Any],
+    new: Sequence[Any],
+    dump: Callable[[Any], Any] = _dump,
+) -> List[Dict]:
+    """
+    JSON-patch ops turning old into new, matched by element identity so a
+    pop from the head or an append costs a single op.
+    """
+    matcher = SequenceMatcher(
+        None, [_item_key(i) for i in old], [_item_key(i) for i in new], autojunk=False
+    )
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                if old[i1 + offset] != new[j1 + offset]:
+                    ops.append(
+                        {
+                            "op": "replace",
+                            "path": f"/{field}/{j1 + offset}",
+                            "value": dump(new[j1 + offset]),
+                        }
+                    )
+            continue
+
+        # Ops apply left to right, so everything before j1 is already in place
+        for _ in range(i2 - i1):
+            ops.append({"op": "remove", "path": f"/{field}/{j1}"})
+        for j in range(j1, j2):
+            ops.append({"op": "add", "path": f"/{field}/{j}", "value": dump(new[j])})
+    return ops
+
+
+class _RoomVersion:
+    def __init__(self):
+        self.seq = 0
+        self.shadow: Dict[str, Any] = {}
+        self.patches_since_snapshot = 0
+        # id(model) -> (model, dump) for the models in the shadow. The model
+        # is kept so its id cannot be reused while cached.
+        self.dumps: Dict[int, Tuple[BaseModel, Dict]] = {}
+        self.snapshot: Optional[Dict] = None
+
+    def dump(self, value: Any) -> Any:
+        """model_dump() once per broadcast model; later calls hit the cache."""
+        if not isinstance(value, BaseModel):
+            return value
+        cached = self.dumps.get(id(value))
+        if cached is None or cached[0] is not value:
+            cached = (value, value.model_dump())
+            self.dumps[id(value)] = cached
+        return cached[1]
+
+
+class RoomSync:
+    """
+    Versioned room_state broadcasting.
+    Keeps a shadow of the last ClientRoomState sent to each room and turns
+    every change into a sequence-numbered list of JSON-patch ops, so
+    broadcast size scales with the change rather than the room. A full
+    snapshot is sent for the first broadcast and every snapshot_interval
+    patches so clients that missed a patch converge without asking.
+
+    With several workers each keeps its own shadow. Because seq is the room
+    version, a client that got a newer state from another worker sees a
+    base mismatch on a stale patch and resyncs instead of applying it.
+
+    Tracks and users are treated as immutable once broadcast (replace them
+    to change them), which lets their serialized form be cached.
+    """
+
+    def __init__(self, snapshot_interval: int = 50):
+        self.snapshot_interval = snapshot_interval
+        self._versions: Dict[str, _RoomVersion] = {}
+
+    def seq(self, room_id: str) -> int:
+        version = self._versions.get(room_id)
+        return version.seq if version else 0
+
+    def _record(self, version: _RoomVersion, room: RoomState) -> None:
+        for field in LIST_FIELDS:
+            version.shadow[field] = list(getattr(room, field))
+        for field in VALUE_FIELDS:
+            version.shadow[field] = getattr(room, field)
+        version.snapshot = None
+
+        # Drop cached dumps of models no longer in the room
+        live = {id(item) for field in LIST_FIELDS for item in version.shadow[field]}
+        live.update(id(version.shadow[field]) for field in VALUE_FIELDS)
+        version.dumps = {k: v for k, v in version.dumps.items() if k in live}
+
+    def diff(self, room_id: str, room: RoomState) -> List[Dict]:
+        """Ops turning the last broadcast state of the room into the current one."""
+        version = self._versions[room_id]
+        shadow = version.shadow
+        ops = []
+        for field in LIST_FIELDS:
+            ops.extend(
+                diff_list(field, shadow[field], getattr(room, field), version.dump)
+            )
+        for field in VALUE_FIELDS:
+            value = getattr(room, field)
+            if value != shadow[field]:
+                ops.append(
+                    {"op": "replace", "path": f"/{field}", "value": version.dump(value)}
+                )
+        return ops
+
+    def update(self, room_id: str, room: RoomState) -> Optional[Tuple[str, Dict]]:
+        """
+        Advance the room to its current state.
+        Returns the (event, payload) to broadcast: "room_patch" with the ops,
+        "room_state" with a full snapshot, or None when nothing changed.
+        """
+        version = self._versions.get(room_id)
+        if version is None:
+            version = _RoomVersion()
+            self._versions[room_id] = version
+            version.seq = max(room.version, 1)
+            self._record(version, room)
+            return "room_state", self.snapshot(room_id, room)
+
+        ops = self.diff(room_id, room)
+        if not ops:
+            return None
+
+        base = version.seq
+        # Sequence numbers follow the stored room version, so every worker
+        # numbers the same state the same way
+        version.seq = max(room.version, version.seq + 1)
+        self._record(version, room)
+
+        version.patches_since_snapshot += 1
+        if version.patches_since_snapshot >= self.snapshot_interval:
+            version.patches_since_snapshot = 0
+            return "room_state", self.snapshot(room_id, room)
+
+        return "room_patch", {"seq": version.seq, "base": base, "ops": ops}
+
+    def snapshot(self, room_id: str, room: RoomState) -> Dict:
+        """
+        Full ClientRoomState at the current sequence number, as last broadcast.
+        Built from cached dumps and reused until the next change.
+        """
+        version = self._versions.get(room_id)
+        if version is None:
+            self.update(room_id, room)
+            version = self._versions[room_id]
+
+        if version.snapshot is None:
+            shadow = version.shadow
+            state = {f: [version.dump(i) for i in shadow[f]] for f in LIST_FIELDS}
+            state.update({f: version.dump(shadow[f]) for f in VALUE_FIELDS})
+            version.snapshot = {**state, "seq": version.seq}
+        return version.snapshot
+
+    def forget(self, room_id: str) -> None:
+        self._versions.pop(room_id, None)
+
+
+settings = Settings.get_settings()
+
+room_sync = RoomSync(snapshot_interval=settings.room_snapshot_interval)
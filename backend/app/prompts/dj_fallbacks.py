@@ -0,0 +1,25 @@
+"""
+DJ HAL Fallback Lines.
+
+Used instead of an LLM script when the provider is unavailable.
+Templates take the same context as DJ_SYSTEM_PROMPT; generic lines need no
+context, so their voice clips are synthesized once at startup.
+"""
+
+DJ_FALLBACK_TEMPLATES = [
+    "Up next, {current_song_name} by {current_song_artist}. Let's ride this groove!",
+    "{added_by_user} brought the heat with {current_song_name}. Turn it up!",
+    "Shout out to {added_by_user} for this one. Here's {current_song_artist}!",
+    "This is {current_song_name}. {current_song_artist} knows how to set a vibe.",
+    "Here comes {current_song_artist} with {current_song_name}. Pure groove.",
+    "{current_song_name} coming right up. Stay tuned, {next_song_name} is next!",
+]
+
+DJ_GENERIC_LINES = [
+    "Hey everyone, keep the vibe going! Coming up next is a great track.",
+    "DJ HAL in the house. This next one is a certified banger!",
+    "Keep those good vibes flowing. Here's another groove for you!",
+    "Stay locked in, the room is on fire tonight. Let's go!",
+    "New track loading. You're gonna love this one!",
+    "The energy in here is unreal. Let's keep it rolling!",
+]
@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+from app.services.spotify_client import SpotifyService
+from fastapi import APIRouter
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Get runtime cache and throughput metrics."""
+    from app.events import dj_commentary, dj_pregen
+    from app.logic.mood_parser import mood_cache, mood_classifier
+    from app.services.dj_fallbacks import dj_fallbacks
+    from app.services.llm import dj_script_batcher, llm_breakers, llm_registry
+    from app.services.voice import tts_breaker, voice_cache, voice_streams
+
+    return {
+        "dj_commentary": dj_commentary.stats(),
+        "dj_pregen": dj_pregen.stats(),
+        "dj_fallbacks": dj_fallbacks.stats(),
+        "dj_script_batches": dj_script_batcher.stats(),
+        "mood_cache": mood_cache.stats(),
+        "mood_classifier": mood_classifier.stats(),
+        "llm_router": llm_registry.stats(),
+        "llm_breakers": llm_breakers.stats(),
+        "tts_breaker": tts_breaker.stats(),
+        "voice_cache": voice_cache.stats(),
+        "voice_streams": voice_streams.stats(),
+        "spotify_catalog_cache": SpotifyService.cache_stats(),
+        "spotify_scheduler": SpotifyService.scheduler_stats(),
+        "spotify_coalescing": SpotifyService.coalescing_stats(),
+    }
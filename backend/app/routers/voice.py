@@ -0,0 +1,34 @@
+import re
+
+from app.services.voice import voice_cache, voice_streams
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+
+router = APIRouter()
+
+CLIP_NAME = re.compile(r"[0-9a-f]{32}\.mp3")
+
+
+@router.get("/voices/stream/{filename}")
+async def stream_voice(filename: str):
+    """
+    Stream a DJ voice clip while it is being synthesized.
+    Listeners who open it late get it from the start; once the clip has
+    left the in-memory buffer it is served from the voice cache.
+    """
+    if not CLIP_NAME.fullmatch(filename):
+        raise HTTPException(status_code=404, detail="Voice clip not found")
+
+    stream = voice_streams.get(filename)
+    if stream is not None and (stream.chunks or not stream.done):
+        return StreamingResponse(
+            stream.read(),
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "no-store"},
+        )
+
+    path = voice_cache.directory / filename
+    if path.exists():
+        return FileResponse(path, media_type="audio/mpeg")
+
+    raise HTTPException(status_code=404, detail="Voice clip not found")
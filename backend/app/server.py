@@ -1,8 +1,16 @@
 import os
+from contextlib import asynccontextmanager
 
 import socketio
 from app.core.config import Settings
 from app.routers.auth import router as auth_router
+from app.routers.metrics import router as metrics_router
+from app.routers.voice import router as voice_router
+from app.services.dj_fallbacks import dj_fallbacks
+from app.services.llm import dj_script_batcher, llm_registry
+from app.services.prefetch import prefetcher
+from app.services.socket_manager import get_client_manager
+from app.services.spotify_client import SpotifyService
 from app.utils.logger import logger
 from app.version import __version__
 from dotenv import load_dotenv
@@ -12,7 +20,34 @@ from fastapi.staticfiles import StaticFiles
 
 load_dotenv()
 
-app = FastAPI(version=__version__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared clients on startup and close them cleanly on shutdown."""
+    SpotifyService.get_client()
+    logger.info("Spotify HTTP client pool initialized")
+    await llm_registry.warm_up(settings.llm_warmup_timeout)
+    if settings.dj_fallback_prerender:
+        dj_fallbacks.start()
+    yield
+    # Stop whatever still produces work before closing the services it
+    # calls: background DJ and prefetch jobs, then the script batcher,
+    # then the LLM and Spotify clients, and the room store last
+    from app.events import dj_commentary, dj_pregen
+    from app.state import rooms
+
+    await dj_commentary.aclose()
+    await dj_pregen.aclose()
+    await prefetcher.aclose()
+    await dj_fallbacks.aclose()
+    await dj_script_batcher.aclose()
+    await llm_registry.aclose()
+    await SpotifyService.aclose()
+    logger.info("Spotify HTTP client pool closed")
+    await rooms.aclose()
+
+
+app = FastAPI(version=__version__, lifespan=lifespan)
 
 # Ensure static directory exists
 os.makedirs("static/voices", exist_ok=True)
@@ -52,10 +87,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+sio = socketio.AsyncServer(
+    async_mode="asgi", cors_allowed_origins="*", client_manager=get_client_manager()
+)
 socket_app = socketio.ASGIApp(sio, app)
 
 app.include_router(auth_router)
+app.include_router(metrics_router)
+app.include_router(voice_router)
 
 # Import events to register handlers
 from app import events  # noqa
@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.utils.logger import logger
+from app.utils.models import Track
+
+CommentaryWorker = Callable[[str, Track], Awaitable[None]]
+
+
+class DJCommentaryPool:
+    """
+    Generates DJ commentary in the background so playback handlers never
+    wait on the LLM or TTS.
+
+    Each room has a small bounded queue drained by a single runner, so a
+    room's commentary stays in order, and a semaphore caps how many rooms
+    generate at once. Commentary for a newer track supersedes anything still
+    queued or running for an older one.
+    """
+
+    def __init__(
+        self, worker: CommentaryWorker, concurrency: int = 4, queue_size: int = 2
+    ):
+        self.worker = worker
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # room_id -> pending (generation, track)
+        self._queues: Dict[str, Deque[Tuple[int, Track]]] = {}
+        # Bumped whenever a room's pending commentary goes stale
+        self._generations: Dict[str, int] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, asyncio.Task] = {}
+
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, room_id: str, track: Track, supersede: bool = True) -> None:
+        """
+        Queue commentary for the track and return immediately.
+        With supersede, older commentary for the room is cancelled first.
+        """
+        queue = self._queues.setdefault(room_id, deque())
+
+        if supersede:
+            self.cancel(room_id)
+
+        if len(queue) >= self.queue_size:
+            queue.popleft()
+            self.dropped += 1
+
+        queue.append((self._generations.get(room_id, 0), track))
+        self.submitted += 1
+
+        runner = self._runners.get(room_id)
+        if runner is None or runner.done():
+            self._runners[room_id] = asyncio.create_task(self._run(room_id, queue))
+
+    def cancel(self, room_id: str) -> None:
+        """Drop the room's queued commentary and cancel the one running."""
+        if room_id not in self._queues:
+            return
+        self._generations[room_id] = self._generations.get(room_id, 0) + 1
+        queue = self._queues[room_id]
+        self.cancelled += len(queue)
+        queue.clear()
+        job = self._jobs.get(room_id)
+        if job and not job.done():
+            job.cancel()
+
+    async def _run(self, room_id: str, queue: Deque[Tuple[int, Track]]) -> None:
+        try:
+            while queue:
+                generation, track = queue.popleft()
+                async with self._semaphore:
+                    # Superseded while waiting for a slot
+                    if generation != self._generations.get(room_id, 0):
+                        self.cancelled += 1
+                        continue
+                    await self._run_job(room_id, track)
+        finally:
+            if self._runners.get(room_id) is asyncio.current_task():
+                del self._runners[room_id]
+            if not queue and self._queues.get(room_id) is queue:
+                del self._queues[room_id]
+                self._generations.pop(room_id, None)
+
+    async def _run_job(self, room_id: str, track: Track) -> None:
+        job = asyncio.ensure_future(self.worker(room_id, track))
+        self._jobs[room_id] = job
+        try:
+            await job
+            self.completed += 1
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # The pool is shutting down
+            self.cancelled += 1
+            logger.debug(f"Stale DJ commentary for {track.name} cancelled")
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"DJ commentary failed for room {room_id}: {e}")
+        finally:
+            if self._jobs.get(room_id) is job:
+                del self._jobs[room_id]
+
+    async def wait(self, room_id: Optional[str] = None) -> None:
+        """Wait until queued commentary (for one room or all) has been handled."""
+        while True:
+            runners = [
+                task
+                for rid, task in self._runners.items()
+                if room_id is None or rid == room_id
+            ]
+            if not runners:
+                return
+            await asyncio.gather(*runners, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel all pending and running commentary."""
+        runners = list(self._runners.values())
+        for task in runners:
+            task.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        self._queues.clear()
+        self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._jobs),
+            "queued": sum(len(q) for q in self._queues.values()),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import random
+import string
+from typing import Any, Dict, List, Optional, Set
+
+from app.prompts.dj_fallbacks import DJ_FALLBACK_TEMPLATES, DJ_GENERIC_LINES
+
+logger = logging.getLogger(__name__)
+
+# Values build_dj_context uses when it does not know the real one
+UNKNOWN_VALUES = frozenset({"", "someone", "unknown", "nothing queued"})
+
+
+def _fields(template: str) -> List[str]:
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field]
+
+
+class FallbackLibrary:
+    """
+    DJ lines for when the LLM is unavailable.
+
+    Lines are dealt from a shuffled deck of templates and generic lines, so
+    none repeats until all have been used. Templates are filled in from the
+    DJ prompt context and skipped when a field they need is unknown. The
+    generic lines are synthesized into the voice clip cache at startup, so
+    speaking them needs no network call.
+    """
+
+    def __init__(
+        self,
+        templates: List[str],
+        generic: List[str],
+        voice: str = "en-US-SteffanNeural",
+    ):
+        self.templates = list(templates)
+        self.generic = list(generic)
+        self.voice = voice
+        self._deck: List[str] = []
+        self._last: Optional[str] = None
+        self._prerendered: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.templated = 0
+        self.generic_served = 0
+
+    @staticmethod
+    def _fits(template: str, context: Dict[str, Any]) -> bool:
+        return all(
+            str(context.get(field, "")).strip().lower() not in UNKNOWN_VALUES
+            for field in _fields(template)
+        )
+
+    def lines(self, context: Dict[str, Any]) -> List[str]:
+        """Every line usable with this context, templates filled in."""
+        return [
+            t.format(**context) for t in self.templates if self._fits(t, context)
+        ] + self.generic
+
+    def _deal(self) -> str:
+        if not self._deck:
+            self._deck = self.templates + self.generic
+            random.shuffle(self._deck)
+            # Don't start the new round with the line that ended the last one
+            if len(self._deck) > 1 and self._deck[-1] == self._last:
+                self._deck[0], self._deck[-1] = self._deck[-1], self._deck[0]
+        self._last = self._deck.pop()
+        return self._last
+
+    def line(self, context: Dict[str, Any]) -> str:
+        """The next fallback line for this context."""
+        for _ in range(2 * (len(self.templates) + len(self.generic))):
+            entry = self._deal()
+            if entry in self.generic:
+                self.generic_served += 1
+                return entry
+            if self._fits(entry, context):
+                self.templated += 1
+                return entry.format(**context)
+        return self.generic[0]
+
+    async def warm_up(self) -> None:
+        """Synthesize the generic lines, one at a time; failures are skipped."""
+        from app.services.voice import generate_voice_clip
+
+        for text in self.generic:
+            try:
+                await generate_voice_clip(text, self.voice)
+                self._prerendered.add(text)
+            except Exception as e:
+                logger.warning(f"Could not pre-render fallback line: {e!r}")
+        logger.info(
+            f"Pre-rendered {len(self._prerendered)}/{len(self.generic)} fallback lines"
+        )
+
+    def start(self) -> None:
+        """Pre-render in the background, so startup does not wait on TTS."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.warm_up())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self.templates),
+            "generic": len(self.generic),
+            "prerendered": len(self._prerendered),
+            "templated_served": self.templated,
+            "generic_served": self.generic_served,
+        }
+
+
+dj_fallbacks = FallbackLibrary(DJ_FALLBACK_TEMPLATES, DJ_GENERIC_LINES)
@@ -0,0 +1,113 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.dj_commentary import DJCommentaryPool
+from app.utils.logger import logger
+from app.utils.models import RoomState, Track
+
+# (track uuid, uuid of the track queued after it)
+ClipKey = Tuple[Optional[str], Optional[str]]
+CommentaryGenerator = Callable[
+    [str, Track, Optional[Track]], Awaitable[Optional[Dict[str, Any]]]
+]
+
+
+def clip_key(track: Track, next_song: Optional[Track]) -> ClipKey:
+    return (track.uuid, next_song.uuid if next_song else None)
+
+
+class DJPregenerator:
+    """
+    Prepares DJ commentary for the room's next queued track while the
+    current one plays, so it can be emitted the moment that track starts.
+
+    Commentary mentions the song after it too, so a clip is keyed by both
+    track uuids. Any queue change that alters either one discards the clip
+    and cancels its generation.
+    """
+
+    def __init__(self, generate: CommentaryGenerator, concurrency: int = 2):
+        self.generate = generate
+        self._pool = DJCommentaryPool(self._run, concurrency=concurrency, queue_size=1)
+        # room_id -> (key, track, next_song) being prepared or ready
+        self._wanted: Dict[str, Tuple[ClipKey, Track, Optional[Track]]] = {}
+        # room_id -> (key, dj_commentary payload)
+        self._ready: Dict[str, Tuple[ClipKey, Dict[str, Any]]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def refresh(self, room_id: str, room: RoomState) -> None:
+        """
+        Make sure commentary is being prepared for the room's next track,
+        discarding anything prepared for a queue that has since changed.
+        """
+        if not room.ai_mode_enabled or not room.queue:
+            self.forget(room_id)
+            return
+
+        track = room.queue[0]
+        next_song = room.queue[1] if len(room.queue) > 1 else None
+        key = clip_key(track, next_song)
+
+        wanted = self._wanted.get(room_id)
+        if wanted and wanted[0] == key:
+            return
+        if wanted:
+            self.invalidated += 1
+
+        self._ready.pop(room_id, None)
+        self._wanted[room_id] = (key, track, next_song)
+        # Supersedes any generation still running for the old queue
+        self._pool.submit(room_id, track)
+
+    def take(
+        self, room_id: str, track: Track, next_song: Optional[Track]
+    ) -> Optional[Dict[str, Any]]:
+        """Return and consume the commentary prepared for the track, if ready."""
+        ready = self._ready.get(room_id)
+        if ready and ready[0] == clip_key(track, next_song):
+            del self._ready[room_id]
+            self._wanted.pop(room_id, None)
+            self.hits += 1
+            return ready[1]
+
+        self.misses += 1
+        return None
+
+    def forget(self, room_id: str) -> None:
+        if self._wanted.pop(room_id, None):
+            self.invalidated += 1
+        self._ready.pop(room_id, None)
+        self._pool.cancel(room_id)
+
+    async def _run(self, room_id: str, track: Track) -> None:
+        wanted = self._wanted.get(room_id)
+        if not wanted or wanted[1] is not track:
+            return
+        key, _, next_song = wanted
+
+        payload = await self.generate(room_id, track, next_song)
+        if payload and self._wanted.get(room_id) is wanted:
+            self._ready[room_id] = (key, payload)
+            logger.debug(f"Pre-generated DJ commentary for {track.name}")
+
+    async def wait(self, room_id: Optional[str] = None) -> None:
+        """Wait until pending pre-generation has finished."""
+        await self._pool.wait(room_id)
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+        self._wanted.clear()
+        self._ready.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self._pool.stats()
+        return {
+            "ready": len(self._ready),
+            "pending": pool["active"] + pool["queued"],
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "failed": pool["failed"],
+        }
@@ -1,39 +1,146 @@
+import asyncio
+import functools
+import inspect
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from app.core.config import Settings
-from app.prompts.dj_persona import DJ_SYSTEM_PROMPT
+from app.prompts.dj_persona import (
+    DJ_BATCH_PROMPT,
+    DJ_BATCH_REQUEST,
+    DJ_SYSTEM_PROMPT,
+)
+from app.services.dj_fallbacks import dj_fallbacks
+from app.utils.batcher import MicroBatcher
+from app.utils.circuit_breaker import CircuitBreakers
 from app.utils.exceptions import LLMGenerationError
+from app.utils.sentences import split_sentences
 from google import genai
 
 logger = logging.getLogger(__name__)
 
+_settings = Settings.get_settings()
+
+# One circuit per provider, shared by every client of that provider
+llm_breakers = CircuitBreakers(
+    failure_threshold=_settings.llm_breaker_threshold,
+    reset_timeout=_settings.llm_breaker_reset,
+)
+
+
+def circuit_guarded(method):
+    """
+    Run a provider call through the provider's circuit breaker, so calls
+    fail fast with CircuitOpenError while the provider is down.
+    """
+    if inspect.isasyncgenfunction(method):
+
+        @functools.wraps(method)
+        async def guarded_stream(self, *args, **kwargs):
+            breaker = llm_breakers.get(self.provider)
+            async for chunk in breaker.stream(method(self, *args, **kwargs)):
+                yield chunk
+
+        return guarded_stream
+
+    @functools.wraps(method)
+    async def guarded(self, *args, **kwargs):
+        breaker = llm_breakers.get(self.provider)
+        return await breaker.call(lambda: method(self, *args, **kwargs))
+
+    return guarded
+
 
 class LLMClient(ABC):
     """Abstract base class for LLM providers."""
 
+    # Names the provider in errors and circuit breaker metrics
+    provider = "Unknown"
+
     @abstractmethod
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> str:
         """
         Generate text from the LLM provider.
+        max_tokens raises or lowers the provider's default response length.
 
         Raises:
             LLMGenerationError: If generation fails.
         """
         pass
 
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        """
+        Yield the response in pieces as the provider produces them.
+        Providers without streaming yield the whole response at once.
+
+        Raises:
+            LLMGenerationError: If generation fails.
+        """
+        yield await self.generate(system_prompt, user_prompt)
 
-class OpenAIClient(LLMClient):
+    async def warm_up(self) -> None:
+        """Open connections (and load the model) before the first request."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+        pass
+
+
+class HTTPLLMClient(LLMClient):
+    """
+    Base for providers called over plain HTTP.
+    All requests share one pooled httpx client, so TCP/TLS connections to
+    the provider stay open between generations.
+    """
+
+    def __init__(self) -> None:
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            settings = Settings.get_settings()
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                )
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class OpenAIClient(HTTPLLMClient):
     """Client for OpenAI Chat Completion API."""
 
+    provider = "OpenAI"
+
     def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+        super().__init__()
         self.api_key = api_key
         self.model = model
         self.url = "https://api.openai.com/v1/chat/completions"
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        stream: bool,
+        max_tokens: Optional[int] = None,
+    ):
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -45,73 +152,221 @@ class OpenAIClient(LLMClient):
                 {"role": "user", "content": user_prompt},
             ],
             "temperature": 0.7,
-            "max_tokens": 150,
+            "max_tokens": max_tokens or 150,
         }
+        if stream:
+            data["stream"] = True
+        return headers, data
+
+    @circuit_guarded
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> str:
+        headers, data = self._request(
+            system_prompt, user_prompt, stream=False, max_tokens=max_tokens
+        )
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.url, headers=headers, json=data, timeout=10.0
-                )
+        try:
+            response = await self.http.post(
+                self.url, headers=headers, json=data, timeout=10.0
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            # logger.error is handled inside Exception init but we can pass provider
+            raise LLMGenerationError(str(e), provider="OpenAI") from e
+
+    @circuit_guarded
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        headers, data = self._request(system_prompt, user_prompt, stream=True)
+
+        try:
+            async with self.http.stream(
+                "POST", self.url, headers=headers, json=data, timeout=10.0
+            ) as response:
                 response.raise_for_status()
-                return response.json()["choices"][0]["message"]["content"].strip()
-            except Exception as e:
-                # logger.error is handled inside Exception init but we can pass provider
-                raise LLMGenerationError(str(e), provider="OpenAI") from e
+                # Server-sent events: "data: {...}" lines, then "data: [DONE]"
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:") :].strip()
+                    if payload == "[DONE]":
+                        break
+                    delta = json.loads(payload)["choices"][0]["delta"]
+                    if delta.get("content"):
+                        yield delta["content"]
+        except Exception as e:
+            raise LLMGenerationError(str(e), provider="OpenAI") from e
+
+    async def warm_up(self) -> None:
+        await self.http.get(
+            f"https://api.openai.com/v1/models/{self.model}",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
 
 
-class OllamaClient(LLMClient):
+class OllamaClient(HTTPLLMClient):
     """Client for local Ollama instance."""
 
+    provider = "Ollama"
+
     def __init__(self, base_url: str, model: str = "llama2"):
+        super().__init__()
         self.base_url = base_url
         self.model = model
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        stream: bool,
+        max_tokens: Optional[int] = None,
+    ):
         # Ollama often works best with a combined prompt if strictly using the /api/generate endpoint.
         full_prompt = f"System: {system_prompt}\nUser: {user_prompt}\nAssistant:"
 
         url = f"{self.base_url}/api/generate"
-        data = {"model": self.model, "prompt": full_prompt, "stream": False}
+        data = {"model": self.model, "prompt": full_prompt, "stream": stream}
+        if max_tokens:
+            data["options"] = {"num_predict": max_tokens}
+        return url, data
+
+    @circuit_guarded
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> str:
+        url, data = self._request(
+            system_prompt, user_prompt, stream=False, max_tokens=max_tokens
+        )
+
+        try:
+            response = await self.http.post(url, json=data, timeout=5.0)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+        except Exception as e:
+            raise LLMGenerationError(str(e), provider="Ollama") from e
+
+    @circuit_guarded
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        url, data = self._request(system_prompt, user_prompt, stream=True)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, json=data, timeout=5.0)
+        try:
+            async with self.http.stream(
+                "POST", url, json=data, timeout=5.0
+            ) as response:
                 response.raise_for_status()
-                return response.json().get("response", "").strip()
-            except Exception as e:
-                raise LLMGenerationError(str(e), provider="Ollama") from e
+                # One JSON object per line, the last one with "done": true
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    part = json.loads(line)
+                    if part.get("response"):
+                        yield part["response"]
+                    if part.get("done"):
+                        break
+        except Exception as e:
+            raise LLMGenerationError(str(e), provider="Ollama") from e
+
+    async def warm_up(self) -> None:
+        # A request without a prompt just loads the model into memory
+        await self.http.post(
+            f"{self.base_url}/api/generate", json={"model": self.model}, timeout=None
+        )
 
 
 class GeminiClient(LLMClient):
     """Client for Google Gemini API."""
 
+    provider = "Gemini"
+
     def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
         self.client = genai.Client(api_key=api_key)
         self.model = model
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    @circuit_guarded
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> str:
         full_text = f"{system_prompt}\n\n{user_prompt}"
+        # Gemini responses are not length-limited by default
+        config = {"max_output_tokens": max_tokens} if max_tokens else None
 
         try:
             response = await self.client.aio.models.generate_content(
-                model=self.model, contents=full_text
+                model=self.model, contents=full_text, config=config
             )
             return response.text.strip()
         except Exception as e:
             raise LLMGenerationError(str(e), provider="Gemini") from e
 
+    @circuit_guarded
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        full_text = f"{system_prompt}\n\n{user_prompt}"
+
+        try:
+            chunks = await self.client.aio.models.generate_content_stream(
+                model=self.model, contents=full_text
+            )
+            async for chunk in chunks:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            raise LLMGenerationError(str(e), provider="Gemini") from e
+
+    async def warm_up(self) -> None:
+        await self.client.aio.models.get(model=self.model)
+
+    async def aclose(self) -> None:
+        # Older google-genai releases have no async close
+        aclose = getattr(self.client.aio, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+DJ_INSTRUCTION = "You are DJ HAL. Short, punchy, charismatic intros only."
+# Response budget per intro in a batched request
+DJ_SCRIPT_TOKENS = 100
 
-def get_llm_client() -> LLMClient:
-    """Factory to return the configured LLM client."""
-    settings = Settings.get_settings()
 
-    if settings.gemini_api_key:
+def _provider_names(settings: Settings) -> List[str]:
+    """Configured providers, in order of preference."""
+    if settings.llm_providers:
+        return list(settings.llm_providers)
+    names = [
+        name
+        for name, key in (
+            ("gemini", settings.gemini_api_key),
+            ("openai", settings.openai_api_key),
+        )
+        if key
+    ]
+    return names or ["ollama"]
+
+
+def _provider_key(name: str, settings: Settings) -> Tuple[Optional[str], ...]:
+    """Identify a provider's configuration, so a config change gets a new client."""
+    if name == "gemini":
+        return ("gemini", settings.gemini_api_key, settings.gemini_model)
+    if name == "openai":
+        return ("openai", settings.openai_api_key, settings.openai_model)
+    if name == "ollama":
+        return ("ollama", settings.ollama_url, settings.ollama_model)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def _build_llm_client(name: str, settings: Settings) -> LLMClient:
+    if name == "gemini":
         return GeminiClient(
             api_key=settings.gemini_api_key, model=settings.gemini_model
         )
 
-    if settings.openai_api_key:
+    if name == "openai":
         return OpenAIClient(
             api_key=settings.openai_api_key, model=settings.openai_model
         )
@@ -122,9 +377,163 @@ def get_llm_client() -> LLMClient:
     )
 
 
+class LLMRegistry:
+    """
+    Process-wide LLM clients, built once per provider configuration and
+    reused by every generation. With several providers configured, get()
+    returns an LLMRouter over them. Warmed up on startup and closed on
+    shutdown by the application lifespan.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[Tuple[Optional[str], ...], LLMClient] = {}
+        self._routers: Dict[Tuple[Tuple[Optional[str], ...], ...], LLMClient] = {}
+
+    def _client(self, name: str, settings: Settings) -> LLMClient:
+        key = _provider_key(name, settings)
+        client = self._clients.get(key)
+        if client is None:
+            client = _build_llm_client(name, settings)
+            self._clients[key] = client
+        return client
+
+    def get(self) -> LLMClient:
+        settings = Settings.get_settings()
+        names = _provider_names(settings)
+        if len(names) == 1:
+            return self._client(names[0], settings)
+
+        key = tuple(_provider_key(name, settings) for name in names)
+        router = self._routers.get(key)
+        if router is None:
+            from app.services.llm_router import LLMRouter
+
+            router = LLMRouter(
+                {name: self._client(name, settings) for name in names},
+                hedging=settings.llm_hedging,
+                hedge_delay=settings.llm_hedge_delay,
+                window=settings.llm_latency_window,
+                max_error_rate=settings.llm_max_error_rate,
+            )
+            self._routers[key] = router
+        return router
+
+    async def warm_up(self, timeout: float) -> None:
+        """Best effort: a provider that is slow or down only logs a warning."""
+        client = self.get()
+        try:
+            await asyncio.wait_for(client.warm_up(), timeout)
+            logger.info(f"{type(client).__name__} warmed up")
+        except Exception as e:
+            logger.warning(f"LLM warm-up skipped: {e!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing stats, empty with a single provider."""
+        client = self.get()
+        return client.stats() if hasattr(client, "stats") else {}
+
+    async def aclose(self) -> None:
+        # Routers only borrow the clients, which are closed here
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._routers.clear()
+        for client in clients:
+            await client.aclose()
+
+
+llm_registry = LLMRegistry()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the shared client for the configured LLM provider."""
+    return llm_registry.get()
+
+
+async def _generate_one_dj_script(context: Dict[str, Any]) -> str:
+    client = get_llm_client()
+    user_prompt = DJ_SYSTEM_PROMPT.format(**context)
+
+    try:
+        return await client.generate(
+            system_prompt=DJ_INSTRUCTION, user_prompt=user_prompt
+        )
+    except Exception:
+        # Fallback if the provider fails
+        logger.warning("LLM generation failed, using fallback.")
+        return dj_fallbacks.line(context)
+
+
+def _parse_batch(text: str, count: int) -> List[Optional[str]]:
+    """
+    Pull the intros out of a batched answer: a JSON array of strings,
+    possibly inside a code fence. Missing or invalid entries come back None.
+    """
+    start, end = text.find("["), text.rfind("]")
+    try:
+        items = json.loads(text[start : end + 1]) if 0 <= start < end else []
+    except json.JSONDecodeError:
+        items = []
+    if not isinstance(items, list):
+        items = []
+
+    scripts: List[Optional[str]] = []
+    for item in items[:count]:
+        scripts.append(item.strip() if isinstance(item, str) and item.strip() else None)
+    return scripts + [None] * (count - len(scripts))
+
+
+async def _generate_dj_scripts(contexts: List[Dict[str, Any]]) -> List[str]:
+    """
+    Generate one DJ script per context with a single LLM call.
+    A batch of one uses the regular prompt; entries the LLM leaves out fall
+    back to library lines.
+    """
+    if len(contexts) == 1:
+        return [await _generate_one_dj_script(contexts[0])]
+
+    client = get_llm_client()
+    user_prompt = DJ_BATCH_PROMPT.format(
+        count=len(contexts),
+        requests="\n".join(
+            DJ_BATCH_REQUEST.format(index=i, **context)
+            for i, context in enumerate(contexts, start=1)
+        ),
+    )
+
+    try:
+        text = await client.generate(
+            system_prompt=DJ_INSTRUCTION,
+            user_prompt=user_prompt,
+            max_tokens=DJ_SCRIPT_TOKENS * len(contexts),
+        )
+        scripts = _parse_batch(text, len(contexts))
+    except Exception:
+        logger.warning("Batched LLM generation failed, using fallbacks.")
+        scripts = [None] * len(contexts)
+
+    missing = scripts.count(None)
+    if missing and missing < len(contexts):
+        logger.warning(f"LLM batch left out {missing} of {len(contexts)} scripts")
+    return [
+        script or dj_fallbacks.line(context)
+        for script, context in zip(scripts, contexts)
+    ]
+
+
+# DJ script requests from all rooms, sent to the LLM in micro-batches
+dj_script_batcher = MicroBatcher(
+    _generate_dj_scripts,
+    window=_settings.dj_batch_window,
+    max_size=_settings.dj_batch_max_size,
+)
+
+
 async def generate_dj_script(context: Dict[str, Any]) -> str:
     """
     Generate a DJ script using the configured LLM provider.
+    Sent straight away when no batch is running; requests from rooms that
+    arrive while one is running, within DJ_BATCH_WINDOW, share the next
+    LLM call.
 
     Args:
         context: A dictionary containing track and user info for the prompt.
@@ -132,15 +541,37 @@ async def generate_dj_script(context: Dict[str, Any]) -> str:
     Returns:
         str: The generated text script.
     """
+    if dj_script_batcher.window <= 0:
+        return await _generate_one_dj_script(context)
+    return await dj_script_batcher.submit(context)
+
+
+async def stream_dj_script(context: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Generate a DJ script sentence by sentence, so speech can start on the
+    first sentence while the rest is still being written.
+
+    Args:
+        context: A dictionary containing track and user info for the prompt.
+
+    Yields:
+        str: Each complete sentence of the script.
+    """
     client = get_llm_client()
     user_prompt = DJ_SYSTEM_PROMPT.format(**context)
-    system_instruction = "You are DJ HAL. Short, punchy, charismatic intros only."
+    chunks = client.generate_stream(
+        system_prompt=DJ_INSTRUCTION, user_prompt=user_prompt
+    )
 
+    produced = False
     try:
-        return await client.generate(
-            system_prompt=system_instruction, user_prompt=user_prompt
-        )
+        async for sentence in split_sentences(chunks):
+            produced = True
+            yield sentence
     except Exception:
-        # Fallback if the provider fails
+        if produced:
+            # Keep what was already said rather than switching lines mid-way
+            logger.warning("LLM stream broke off, ending the script early.")
+            return
         logger.warning("LLM generation failed, using fallback.")
-        return "Hey everyone, keep the vibe going! Coming up next is a great track."
+        yield dj_fallbacks.line(context)
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.llm import LLMClient
+from app.utils.exceptions import CircuitOpenError, LLMGenerationError
+
+logger = logging.getLogger(__name__)
+
+# Samples needed before a provider's percentiles and error rate are trusted
+MIN_SAMPLES = 5
+
+
+class ProviderStats:
+    """Rolling latency and error window for one LLM provider."""
+
+    def __init__(self, window: int = 50):
+        self.latencies: "deque[float]" = deque(maxlen=window)
+        self.outcomes: "deque[bool]" = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        # Lost a hedge race or abandoned by the caller; no latency sample
+        self.cancelled = 0
+
+    def record(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.requests += 1
+
+    def record_error(self) -> None:
+        self.outcomes.append(False)
+        self.requests += 1
+        self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[round(q * (len(ordered) - 1))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self, max_error_rate: float) -> bool:
+        return len(self.outcomes) < MIN_SAMPLES or self.error_rate <= max_error_rate
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+class LLMRouter(LLMClient):
+    """
+    Spreads generations over several LLM providers.
+
+    Each call goes to the fastest healthy provider by rolling p50 latency;
+    providers above max_error_rate are only tried after the healthy ones.
+    With hedging on, a second provider gets the same request once the first
+    has been running longer than its own p95 (hedge_delay until it has
+    enough samples). The first answer wins and the other call is cancelled.
+    A provider that fails, or whose circuit breaker is open, hands over to
+    the next one straight away.
+
+    For streams the race is decided by the first chunk.
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, LLMClient],
+        hedging: bool = True,
+        hedge_delay: float = 2.0,
+        window: int = 50,
+        max_error_rate: float = 0.5,
+    ):
+        self.clients = clients
+        self.hedging = hedging
+        self.hedge_delay = hedge_delay
+        self.max_error_rate = max_error_rate
+        self._order = list(clients)
+        self._stats = {name: ProviderStats(window) for name in clients}
+
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def ranked(self) -> List[str]:
+        """Provider names, best first."""
+
+        def key(name: str) -> Tuple[bool, float, int]:
+            stats = self._stats[name]
+            # Providers without samples yet go first, so every one gets measured
+            p50 = stats.percentile(0.5) or 0.0
+            return (
+                not stats.healthy(self.max_error_rate),
+                p50,
+                self._order.index(name),
+            )
+
+        return sorted(self._order, key=key)
+
+    def _hedge_after(self, name: str) -> float:
+        p95 = self._stats[name].percentile(0.95)
+        return p95 if p95 is not None else self.hedge_delay
+
+    async def _attempt(self, name: str, call: Callable[[LLMClient], Awaitable[Any]]):
+        stats = self._stats[name]
+        start = time.monotonic()
+        try:
+            result = await call(self.clients[name])
+        except asyncio.CancelledError:
+            # Says nothing about how long the provider would have taken
+            stats.cancelled += 1
+            raise
+        except CircuitOpenError:
+            # Rejected without calling the provider; nothing to measure
+            raise
+        except Exception:
+            stats.record_error()
+            raise
+        stats.record(time.monotonic() - start)
+        return result
+
+    async def _race(
+        self, call: Callable[[LLMClient], Awaitable[Any]]
+    ) -> Tuple[str, Any]:
+        """Run call against the ranked providers; return the winner and its result."""
+        waiting = self.ranked()
+        primary = waiting[0]
+        pending: Dict[asyncio.Task, str] = {}
+        errors: List[str] = []
+        hedged = False
+
+        def launch() -> None:
+            name = waiting.pop(0)
+            pending[asyncio.create_task(self._attempt(name, call))] = name
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedging and not hedged and waiting:
+                    timeout = self._hedge_after(primary)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    self.hedged += 1
+                    logger.info(f"LLM {primary} is slow, hedging to {waiting[0]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        if hedged and name != primary:
+                            self.hedge_wins += 1
+                        return name, task.result()
+                    errors.append(f"{name}: {task.exception()}")
+
+                if not pending and waiting:
+                    self.failovers += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMGenerationError("; ".join(errors), provider="Router")
+
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> str:
+        _, text = await self._race(
+            lambda client: client.generate(
+                system_prompt, user_prompt, max_tokens=max_tokens
+            )
+        )
+        return text
+
+    async def _open_stream(
+        self, client: LLMClient, system_prompt: str, user_prompt: str
+    ) -> Tuple[asyncio.Task, asyncio.Queue, Optional[str]]:
+        """
+        Start reading a stream in its own task and wait for its first chunk.
+        The task pushes chunks, then None at the end or the error it hit.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for chunk in client.generate_stream(system_prompt, user_prompt):
+                    queue.put_nowait(chunk)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(pump())
+        try:
+            first = await queue.get()
+        except BaseException:
+            task.cancel()
+            raise
+        if isinstance(first, Exception):
+            raise first
+        return task, queue, first
+
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        name, (task, queue, chunk) = await self._race(
+            lambda client: self._open_stream(client, system_prompt, user_prompt)
+        )
+        try:
+            while chunk is not None:
+                if isinstance(chunk, Exception):
+                    self._stats[name].record_error()
+                    raise chunk
+                yield chunk
+                chunk = await queue.get()
+        finally:
+            task.cancel()
+
+    async def warm_up(self) -> None:
+        async def warm(name: str, client: LLMClient) -> None:
+            try:
+                await client.warm_up()
+            except Exception as e:
+                logger.warning(f"LLM warm-up of {name} skipped: {e!r}")
+
+        await asyncio.gather(
+            *(warm(name, client) for name, client in self.clients.items())
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ranking": self.ranked(),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "providers": {name: s.stats() for name, s in self._stats.items()},
+        }
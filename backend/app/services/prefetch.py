@@ -0,0 +1,191 @@
+import asyncio
+import uuid
+from typing import Dict, List, Optional, Set
+
+from app.core.config import Settings
+from app.logic.candidate_pool import CandidatePool, vibe_key
+from app.services.recommendations import get_recommendations
+from app.utils.logger import logger
+from app.utils.models import RoomState, Track
+
+
+def build_seeds(room: RoomState) -> Dict[str, List[str]]:
+    """
+    Build recommendation seeds from the playing track, or the last played one.
+    """
+    seeds = {}
+    seed_track = room.current_track
+    if not seed_track and room.history:
+        seed_track = room.history[0]
+
+    if seed_track and seed_track.uri and "spotify:track:" in seed_track.uri:
+        track_id = seed_track.uri.split(":")[-1].strip()
+        if track_id:
+            seeds["seed_tracks"] = [track_id]
+
+    return seeds
+
+
+def recommendation_to_track(rec: dict) -> Track:
+    """Convert a Spotify search result into an auto-queued Track."""
+    artist_name = rec["artists"][0]["name"] if rec.get("artists") else "Unknown"
+    images = rec.get("album", {}).get("images")
+    image_url = images[0]["url"] if images else None
+
+    return Track(
+        uri=rec["uri"],
+        name=rec["name"],
+        artist=artist_name,
+        image=image_url,
+        duration_ms=rec["duration_ms"],
+        uuid=str(uuid.uuid4()),
+        added_by="system",
+        added_by_name="DJ AI",
+    )
+
+
+def _room_uris(room: RoomState) -> Set[str]:
+    """URIs already queued, playing or recently played in the room."""
+    uris = {t.uri for t in room.queue}
+    uris.update(t.uri for t in room.history)
+    if room.current_track:
+        uris.add(room.current_track.uri)
+    return uris
+
+
+class QueuePrefetcher:
+    """
+    Keeps a per-room pool of recommended tracks warm in the background,
+    so skipping can take the next auto-queued track without waiting on
+    the recommendation pipeline. The pool is only refilled once it drains
+    below the low watermark.
+    """
+
+    def __init__(
+        self, capacity: int = 40, low_watermark: int = 6, max_age: float = 1800.0
+    ):
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.max_age = max_age
+        self._pools: Dict[str, CandidatePool] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _pool(self, room_id: str) -> CandidatePool:
+        pool = self._pools.get(room_id)
+        if pool is None:
+            pool = CandidatePool(capacity=self.capacity, max_age=self.max_age)
+            self._pools[room_id] = pool
+        return pool
+
+    def buffered(self, room_id: str) -> int:
+        pool = self._pools.get(room_id)
+        if pool is None:
+            return 0
+        pool.prune()
+        return len(pool)
+
+    def schedule(self, room_id: str, room: RoomState, token: Optional[str]) -> None:
+        """
+        Start a background refill for the room if its pool is below the low
+        watermark and no refill is already running.
+        """
+        if not token or self.buffered(room_id) >= self.low_watermark:
+            return
+
+        task = self._tasks.get(room_id)
+        if task and not task.done():
+            return
+
+        self._tasks[room_id] = asyncio.create_task(self._fill(room_id, room, token))
+
+    async def wait(self, room_id: str) -> None:
+        """
+        Wait for an in-flight refill of the room, if any.
+        Returns normally when the refill is cancelled by invalidate(), so the
+        caller carries on with whatever the pool holds.
+        """
+        task = self._tasks.get(room_id)
+        if task and not task.done():
+            # Unlike awaiting the task, wait() does not re-raise its cancellation
+            await asyncio.wait({task})
+
+    def take(self, room_id: str, room: RoomState, count: int) -> List[Track]:
+        """
+        Pop up to count candidates for the room's current vibe that are not
+        already queued, playing or in recent history.
+        """
+        pool = self._pools.get(room_id)
+        if pool is None:
+            return []
+        pool.set_vibe(vibe_key(room.vibe_profile.active_mood))
+        return pool.take(count, _room_uris(room))
+
+    def put_back(self, room_id: str, room: RoomState, tracks: List[Track]) -> None:
+        """Return taken candidates the room ended up not queueing."""
+        pool = self._pools.get(room_id)
+        if pool is None or not tracks:
+            return
+        pool.put_back(tracks, _room_uris(room), vibe_key(room.vibe_profile.active_mood))
+
+    def invalidate(self, room_id: str, room: RoomState) -> None:
+        """
+        Age out candidates picked for an older vibe and cancel any running
+        refill, e.g. when the room vibe changes.
+        """
+        self._pool(room_id).set_vibe(vibe_key(room.vibe_profile.active_mood))
+        task = self._tasks.pop(room_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def _fill(self, room_id: str, room: RoomState, token: str) -> None:
+        try:
+            vibe = vibe_key(room.vibe_profile.active_mood)
+            pool = self._pool(room_id)
+            pool.set_vibe(vibe)
+
+            seeds = build_seeds(room)
+            logger.debug(f"Prefetching recommendations for room {room_id}: {seeds}")
+            recs = await get_recommendations(
+                token, seeds, room.history[:5], room.vibe_profile.active_mood
+            )
+
+            added = pool.add(
+                (recommendation_to_track(r) for r in recs if r.get("uri")),
+                _room_uris(room),
+                vibe,
+            )
+            logger.debug(
+                f"Candidate pool for room {room_id}: +{added}, {len(pool)} total"
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Prefetch failed for room {room_id}: {e}")
+        finally:
+            # A newer refill may have replaced this one after invalidate()
+            if self._tasks.get(room_id) is asyncio.current_task():
+                del self._tasks[room_id]
+
+    def forget(self, room_id: str) -> None:
+        """Drop the room's pool and cancel its refill, e.g. once it empties."""
+        self._pools.pop(room_id, None)
+        task = self._tasks.pop(room_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def aclose(self) -> None:
+        """Cancel running refills and wait for them to finish."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+settings = Settings.get_settings()
+
+prefetcher = QueuePrefetcher(
+    capacity=settings.candidate_pool_size,
+    low_watermark=settings.candidate_pool_low_watermark,
+    max_age=settings.candidate_max_age,
+)
@@ -1,6 +1,7 @@
+import asyncio
 import random
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Tuple, Type
 
 from app.services.spotify_client import SpotifyService
 from app.utils.logger import logger
@@ -13,15 +14,32 @@ class StrategyContext:
         self.queries = []
         self.seed_artist_id = None
         self.seed_artist_name = None
+        self._seed_task: Optional[asyncio.Future] = None
 
     def add_query(self, query: str):
         if query and query not in self.queries:
             self.queries.append(query)
 
     async def resolve_seed_artist(self):
+        """
+        Resolve the seed artist once per context.
+        Concurrent callers share the same lookup.
+        """
         if self.seed_artist_id:
             return
 
+        # Shield so one cancelled strategy does not cancel the shared lookup
+        await asyncio.shield(self.start_seed_resolution())
+
+    def start_seed_resolution(self) -> asyncio.Future:
+        """
+        Start the seed artist lookup in the background if not already running.
+        """
+        if self._seed_task is None:
+            self._seed_task = asyncio.ensure_future(self._resolve_seed_artist())
+        return self._seed_task
+
+    async def _resolve_seed_artist(self):
         # Check explicit seed
         if self.seeds.get("seed_artists"):
             self.seed_artist_id = self.seeds["seed_artists"][0]
@@ -39,8 +57,17 @@ class StrategyContext:
             except Exception as e:
                 logger.warning(f"Failed to resolve seed artist: {e}")
 
+    def cancel_pending(self):
+        if self._seed_task and not self._seed_task.done():
+            self._seed_task.cancel()
+
 
 class RecommendationStrategy(ABC):
+    # Strategies whose queries must be in the context before this one runs.
+    depends_on: Tuple[Type["RecommendationStrategy"], ...] = ()
+    # Whether the strategy reads the resolved seed artist.
+    needs_seed_artist: bool = False
+
     @abstractmethod
     async def execute(self, ctx: StrategyContext):
         pass
@@ -56,6 +83,8 @@ class GenreSeedStrategy(RecommendationStrategy):
 
 
 class ArtistDerivedGenreStrategy(RecommendationStrategy):
+    needs_seed_artist = True
+
     async def execute(self, ctx: StrategyContext):
         await ctx.resolve_seed_artist()
         if not ctx.seed_artist_id:
@@ -79,6 +108,10 @@ class ArtistDerivedGenreStrategy(RecommendationStrategy):
 
 
 class RelatedArtistStrategy(RecommendationStrategy):
+    # Needs the query count from the genre strategies to decide if it runs
+    depends_on = (GenreSeedStrategy, ArtistDerivedGenreStrategy)
+    needs_seed_artist = True
+
     async def execute(self, ctx: StrategyContext):
         # Only run if we need more variety
         if len(ctx.queries) >= 2:
@@ -108,6 +141,9 @@ class RelatedArtistStrategy(RecommendationStrategy):
 
 
 class SeedArtistFallbackStrategy(RecommendationStrategy):
+    depends_on = (GenreSeedStrategy, ArtistDerivedGenreStrategy, RelatedArtistStrategy)
+    needs_seed_artist = True
+
     async def execute(self, ctx: StrategyContext):
         # Last resort if no other queries exist
         if ctx.queries:
@@ -124,3 +160,78 @@ class DefaultFallbackStrategy(RecommendationStrategy):
         if not ctx.queries:
             ctx.add_query("genre:pop")
             logger.debug("Strategy: Default Fallback (Pop)")
+
+
+class StrategyRunner:
+    """
+    Runs a strategy pipeline as a dependency graph.
+    Strategies with no pending dependencies run concurrently, the seed artist
+    is resolved once and shared, and the whole graph is bounded by a deadline.
+    The fallback strategy always runs last, even if the deadline was hit.
+    """
+
+    def __init__(
+        self,
+        strategies: Sequence[RecommendationStrategy],
+        fallback: Optional[RecommendationStrategy] = None,
+        deadline: Optional[float] = None,
+    ):
+        self.strategies = list(strategies)
+        self.fallback = fallback
+        self.deadline = deadline
+        self.stages = self._build_stages()
+
+    def _build_stages(self) -> List[List[RecommendationStrategy]]:
+        """
+        Group strategies into stages; each stage only depends on earlier ones.
+        Dependencies on strategies not in the pipeline are ignored.
+        """
+        present = {type(s) for s in self.strategies}
+        done = set()
+        remaining = list(self.strategies)
+        stages = []
+
+        while remaining:
+            stage = [
+                s
+                for s in remaining
+                if all(d in done or d not in present for d in s.depends_on)
+            ]
+            if not stage:
+                names = [s.__class__.__name__ for s in remaining]
+                raise ValueError(f"Circular strategy dependencies: {names}")
+            stages.append(stage)
+            done.update(type(s) for s in stage)
+            remaining = [s for s in remaining if s not in stage]
+
+        return stages
+
+    async def _run_one(self, strategy: RecommendationStrategy, ctx: StrategyContext):
+        try:
+            if strategy.needs_seed_artist:
+                await ctx.resolve_seed_artist()
+            await strategy.execute(ctx)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Strategy {strategy.__class__.__name__} failed: {e}")
+
+    async def _run_stages(self, ctx: StrategyContext):
+        for stage in self.stages:
+            await asyncio.gather(*(self._run_one(s, ctx) for s in stage))
+
+    async def run(self, ctx: StrategyContext):
+        if any(s.needs_seed_artist for s in self.strategies):
+            ctx.start_seed_resolution()
+        try:
+            await asyncio.wait_for(self._run_stages(ctx), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Strategy pipeline hit {self.deadline}s deadline with "
+                f"{len(ctx.queries)} queries"
+            )
+        finally:
+            ctx.cancel_pending()
+
+        if self.fallback:
+            await self._run_one(self.fallback, ctx)
@@ -14,6 +14,7 @@ async def get_recommendations(
     import asyncio
     import random
 
+    from app.core.config import Settings
     from app.services.recommendation_strategies import (
         ArtistDerivedGenreStrategy,
         DefaultFallbackStrategy,
@@ -21,27 +22,27 @@ async def get_recommendations(
         RelatedArtistStrategy,
         SeedArtistFallbackStrategy,
         StrategyContext,
+        StrategyRunner,
     )
     from app.utils.logger import logger
 
     # 1. Initialize Context
     ctx = StrategyContext(seeds, token)
 
-    # 2. Define Strategy Pipeline
-    strategies = [
-        GenreSeedStrategy(),
-        ArtistDerivedGenreStrategy(),
-        RelatedArtistStrategy(),
-        SeedArtistFallbackStrategy(),
-        DefaultFallbackStrategy(),
-    ]
-
-    # 3. Execute Strategies Sequentially
-    for strategy in strategies:
-        try:
-            await strategy.execute(ctx)
-        except Exception as e:
-            logger.error(f"Strategy {strategy.__class__.__name__} failed: {e}")
+    # 2. Define Strategy Pipeline (ordering comes from each strategy's depends_on)
+    runner = StrategyRunner(
+        [
+            GenreSeedStrategy(),
+            ArtistDerivedGenreStrategy(),
+            RelatedArtistStrategy(),
+            SeedArtistFallbackStrategy(),
+        ],
+        fallback=DefaultFallbackStrategy(),
+        deadline=Settings.get_settings().recommendation_deadline,
+    )
+
+    # 3. Execute Strategies, running independent ones concurrently
+    await runner.run(ctx)
 
     # 4. Prepare Parallel Search Tasks
     queries = ctx.queries
@@ -0,0 +1,249 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.core.config import Settings
+from app.utils.exceptions import RoomConflictError
+from app.utils.logger import logger
+from app.utils.models import RoomState
+
+T = TypeVar("T")
+
+# Persisted per room; version is stored alongside as its own hash field
+ROOM_FIELDS = tuple(f for f in RoomState.model_fields if f != "version")
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RoomStore(ABC):
+    """
+    Abstract room state storage.
+
+    Rooms are loaded, changed and saved back. Every save bumps the room
+    version, and saving a room that changed since it was loaded raises
+    RoomConflictError. update() retries a mutation until it applies cleanly.
+    """
+
+    def __init__(self, max_retries: int = 5):
+        self.max_retries = max_retries
+
+    @abstractmethod
+    async def get(self, room_id: str) -> Optional[RoomState]:
+        pass
+
+    @abstractmethod
+    async def get_or_create(self, room_id: str) -> RoomState:
+        pass
+
+    @abstractmethod
+    async def save(self, room_id: str, room: RoomState) -> None:
+        """
+        Persist the room and bump its version.
+
+        Raises:
+            RoomConflictError: If the stored room is not at room.version.
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, room_id: str) -> None:
+        pass
+
+    async def exists(self, room_id: str) -> bool:
+        return await self.get(room_id) is not None
+
+    async def update(
+        self,
+        room_id: str,
+        mutate: Callable[[RoomState], T],
+        create: bool = False,
+    ) -> Tuple[Optional[RoomState], Optional[T]]:
+        """
+        Apply mutate to the latest room state and save it, reloading and
+        re-applying on conflict. Returns (room, mutate result), or
+        (None, None) if the room does not exist and create is False.
+        mutate must be synchronous; do network I/O before calling update.
+        """
+        for _ in range(self.max_retries):
+            room = await (self.get_or_create(room_id) if create else self.get(room_id))
+            if room is None:
+                return None, None
+
+            result = mutate(room)
+            try:
+                await self.save(room_id, room)
+                return room, result
+            except RoomConflictError:
+                continue
+
+        raise RoomConflictError(room_id, room.version)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class InMemoryRoomStore(RoomStore):
+    """
+    Single-process store. Rooms are live objects, so changes are visible
+    immediately and saves cannot conflict. Rooms can also be read and
+    seeded by subscription, e.g. store[room_id] = RoomState().
+    """
+
+    def __init__(self, max_retries: int = 5):
+        super().__init__(max_retries=max_retries)
+        self._rooms: Dict[str, RoomState] = {}
+
+    def __getitem__(self, room_id: str) -> RoomState:
+        return self._rooms[room_id]
+
+    def __setitem__(self, room_id: str, room: RoomState) -> None:
+        self._rooms[room_id] = room
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._rooms
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    async def get(self, room_id: str) -> Optional[RoomState]:
+        return self._rooms.get(room_id)
+
+    async def get_or_create(self, room_id: str) -> RoomState:
+        return self._rooms.setdefault(room_id, RoomState())
+
+    async def save(self, room_id: str, room: RoomState) -> None:
+        stored = self._rooms.get(room_id)
+        if stored is not None and stored is not room:
+            raise RoomConflictError(room_id, room.version)
+        room.version += 1
+        self._rooms[room_id] = room
+
+    async def delete(self, room_id: str) -> None:
+        self._rooms.pop(room_id, None)
+
+    async def exists(self, room_id: str) -> bool:
+        return room_id in self._rooms
+
+
+class RedisRoomStore(RoomStore):
+    """
+    Store shared by every worker, one Redis hash per room.
+    Each room field is a JSON-encoded hash field, so a save only writes the
+    fields that changed. Saves run in a WATCH/MULTI transaction that checks
+    the version field before writing.
+    """
+
+    def __init__(
+        self, client: Any, prefix: str = "vibesync:room:", max_retries: int = 5
+    ):
+        super().__init__(max_retries=max_retries)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisRoomStore":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), **kwargs)
+
+    def _key(self, room_id: str) -> str:
+        return f"{self.prefix}{room_id}"
+
+    @staticmethod
+    def _encode(room: RoomState) -> Dict[str, str]:
+        data = room.model_dump(mode="json", include=set(ROOM_FIELDS))
+        return {field: json.dumps(data[field]) for field in ROOM_FIELDS}
+
+    @staticmethod
+    def _decode(raw: Dict) -> RoomState:
+        raw = {_text(k): _text(v) for k, v in raw.items()}
+        persisted = {f: raw[f] for f in ROOM_FIELDS if f in raw}
+        data = {f: json.loads(v) for f, v in persisted.items()}
+        room = RoomState.model_validate({**data, "version": int(raw["version"])})
+        room._persisted = persisted
+        return room
+
+    async def get(self, room_id: str) -> Optional[RoomState]:
+        raw = await self.client.hgetall(self._key(room_id))
+        if not raw:
+            return None
+        return self._decode(raw)
+
+    async def get_or_create(self, room_id: str) -> RoomState:
+        room = await self.get(room_id)
+        if room is not None:
+            return room
+
+        from redis.exceptions import WatchError
+
+        room = RoomState(version=1)
+        encoded = self._encode(room)
+        key = self._key(room_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.exists(key):
+                    await pipe.reset()
+                    return await self.get(room_id)
+                pipe.multi()
+                pipe.hset(key, mapping={**encoded, "version": room.version})
+                await pipe.execute()
+            except WatchError:
+                # Another worker created it first
+                return await self.get(room_id)
+
+        room._persisted = encoded
+        return room
+
+    async def save(self, room_id: str, room: RoomState) -> None:
+        from redis.exceptions import WatchError
+
+        encoded = self._encode(room)
+        changed = {f: v for f, v in encoded.items() if room._persisted.get(f) != v}
+        if not changed:
+            return
+
+        key = self._key(room_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                stored = await pipe.hget(key, "version")
+                if stored is None and room.version:
+                    # Deleted since it was loaded
+                    raise RoomConflictError(room_id, room.version)
+                if stored is not None and int(stored) != room.version:
+                    raise RoomConflictError(room_id, room.version)
+                if stored is None:
+                    changed = encoded
+                pipe.multi()
+                pipe.hset(key, mapping={**changed, "version": room.version + 1})
+                await pipe.execute()
+            except WatchError as e:
+                raise RoomConflictError(room_id, room.version) from e
+
+        room.version += 1
+        room._persisted.update(changed)
+
+    async def delete(self, room_id: str) -> None:
+        await self.client.delete(self._key(room_id))
+
+    async def exists(self, room_id: str) -> bool:
+        return bool(await self.client.exists(self._key(room_id)))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def get_room_store() -> RoomStore:
+    """Factory to return the configured room store."""
+    settings = Settings.get_settings()
+
+    if settings.room_store == "redis":
+        logger.info("Using Redis room store")
+        return RedisRoomStore.from_url(
+            settings.redis_url, max_retries=settings.room_store_max_retries
+        )
+
+    return InMemoryRoomStore(max_retries=settings.room_store_max_retries)
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import socketio
+from app.core.config import Settings
+from app.utils.logger import logger
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+
+class InMemoryPubSubManager(AsyncPubSubManager):
+    """
+    Socket.IO client manager backed by an in-process message bus.
+    Stands in for Redis when several Socket.IO servers share one process,
+    e.g. in tests or local multi-instance experiments.
+    """
+
+    name = "asyncmemory"
+
+    # channel -> one queue per subscribed manager
+    _bus: Dict[str, List[asyncio.Queue]] = {}
+
+    def __init__(
+        self, channel: str = "socketio", write_only: bool = False, logger=None
+    ):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        if not write_only:
+            self._bus.setdefault(channel, []).append(self._queue)
+
+    async def _publish(self, data):
+        message = self.json.dumps(data)
+        for queue in self._bus.get(self.channel, []):
+            if queue is not self._queue:
+                queue.put_nowait(message)
+
+    async def _listen(self):
+        while True:
+            yield await self._queue.get()
+
+    def close(self) -> None:
+        """Unsubscribe from the channel."""
+        subscribers = self._bus.get(self.channel, [])
+        if self._queue in subscribers:
+            subscribers.remove(self._queue)
+
+
+def get_client_manager() -> Optional[socketio.AsyncManager]:
+    """
+    Factory to return the configured Socket.IO client manager.
+    None keeps the default manager, which only reaches local sockets.
+    """
+    settings = Settings.get_settings()
+    url = settings.socketio_message_queue
+    if not url:
+        return None
+
+    if url.startswith("memory://"):
+        logger.info("Socket.IO using in-memory message queue")
+        return InMemoryPubSubManager(channel=settings.socketio_channel)
+
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        logger.info("Socket.IO using Redis message queue")
+        return socketio.AsyncRedisManager(url, channel=settings.socketio_channel)
+
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE: {url}")
@@ -1,8 +1,231 @@
-from typing import Any, List, Optional
+import asyncio
+import importlib.util
+import random
+import re
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
+from app.core.config import Settings
+from app.utils.cache import TTLCache
 from app.utils.exceptions import SpotifyAPIError
 from app.utils.logger import logger
+from app.utils.singleflight import SingleFlight
+
+settings = Settings.get_settings()
+
+# HTTP/2 needs the optional 'h2' package (installed via httpx[http2]).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Catalog endpoints return the same data for every user token, so they are
+# cached by URL. Order matters: related-artists must match before artists.
+CATALOG_ENDPOINTS = (
+    (re.compile(r"^/tracks/[^/]+$"), "track"),
+    (re.compile(r"^/artists/[^/]+/related-artists$"), "related_artists"),
+    (re.compile(r"^/artists/[^/]+$"), "artist"),
+    (re.compile(r"^/search$"), "search"),
+)
+
+# Marker stored in the catalog cache for resources that returned 404.
+_NOT_FOUND = object()
+_MISSING = object()
+
+
+class SpotifyRequestScheduler:
+    """
+    Central gate for all outgoing Spotify requests.
+    Applies an app-wide token bucket and per-user-token concurrency caps,
+    pauses everyone when Spotify answers 429 with Retry-After, and retries
+    transient failures with jittered exponential backoff. A rate of 0
+    turns the token bucket off.
+    """
+
+    RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        per_token_concurrency: int,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_retry_after: float = 30.0,
+    ):
+        if rate < 0:
+            raise ValueError(f"Spotify rate limit must be >= 0, got {rate}")
+        if rate > 0 and burst < 1:
+            raise ValueError(f"Spotify rate burst must be >= 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.per_token_concurrency = per_token_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._token_slots: Dict[str, asyncio.Semaphore] = {}
+        self._token_users: Dict[str, int] = {}
+
+        # Metrics
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+
+    async def _wait_turn(self) -> None:
+        """
+        Wait until the app-wide bucket has a token and no Retry-After pause
+        is active, then consume one token.
+        """
+        throttled = False
+        while True:
+            self._refill()
+            wait = self._blocked_until - time.monotonic()
+            if wait <= 0:
+                if self.rate == 0:
+                    return
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            if not throttled:
+                self.throttled += 1
+                throttled = True
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def _token_slot(self, token: str) -> AsyncIterator[None]:
+        """
+        Cap concurrent in-flight requests per user token.
+        Slots are dropped once no request is using them.
+        """
+        slot = self._token_slots.get(token)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_token_concurrency)
+            self._token_slots[token] = slot
+        self._token_users[token] = self._token_users.get(token, 0) + 1
+
+        try:
+            async with slot:
+                self.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            self._token_users[token] -= 1
+            if self._token_users[token] == 0:
+                del self._token_users[token]
+                del self._token_slots[token]
+
+    async def _send_once(
+        self, token: str, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        self.queue_depth += 1
+        queued = True
+        try:
+            await self._wait_turn()
+            async with self._token_slot(token):
+                self.queue_depth -= 1
+                queued = False
+                return await send()
+        finally:
+            if queued:
+                self.queue_depth -= 1
+
+    def _retry_after(self, response: httpx.Response) -> float:
+        try:
+            return max(float(response.headers.get("Retry-After", "1")), 0.0)
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(delay / 2, delay)
+
+    async def execute(
+        self, token: str, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        Run a request through the scheduler.
+        Returns the final response (which may still be an error status once
+        retries are exhausted). Raises the last transport error if every
+        attempt failed to connect.
+        """
+        self.requests += 1
+        attempt = 0
+
+        while True:
+            try:
+                response = await self._send_once(token, send)
+                error = None
+            except httpx.TransportError as e:
+                response = None
+                error = e
+
+            if response is not None and response.status_code not in (
+                self.RETRYABLE_STATUS
+            ):
+                return response
+
+            if response is not None and response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = self._retry_after(response)
+                if retry_after > self.max_retry_after:
+                    logger.warning(
+                        f"Spotify rate limit Retry-After {retry_after}s exceeds cap. Not retrying."
+                    )
+                    self.failures += 1
+                    return response
+                # Pause every request, not just this one.
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + retry_after
+                )
+                delay = random.uniform(0, self.backoff_base)
+            else:
+                delay = self._backoff(attempt)
+
+            if attempt >= self.max_retries:
+                self.failures += 1
+                if response is not None:
+                    return response
+                raise error
+
+            attempt += 1
+            self.retries += 1
+            logger.debug(
+                f"Retrying Spotify request (attempt {attempt}/{self.max_retries}) in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failures": self.failures,
+            "paused_for": round(max(self._blocked_until - time.monotonic(), 0.0), 2),
+        }
 
 
 class SpotifyService:
@@ -13,30 +236,109 @@ class SpotifyService:
 
     BASE_URL = "https://api.spotify.com/v1"
 
+    # Process-wide pooled client, shared by every request.
+    _client: Optional[httpx.AsyncClient] = None
+
+    # Catalog cache TTLs in seconds, per endpoint kind.
+    CATALOG_TTLS: Dict[str, float] = {
+        "track": 24 * 3600,
+        "artist": 6 * 3600,
+        "related_artists": 24 * 3600,
+        "search": 10 * 60,
+    }
+    _catalog_cache = TTLCache(maxsize=settings.spotify_cache_size)
+
+    # Identical GETs issued concurrently share one upstream request.
+    _inflight = SingleFlight()
+
+    _scheduler = SpotifyRequestScheduler(
+        rate=settings.spotify_rate_limit,
+        burst=settings.spotify_rate_burst,
+        per_token_concurrency=settings.spotify_per_token_concurrency,
+        max_retries=settings.spotify_max_retries,
+        backoff_base=settings.spotify_backoff_base,
+        backoff_max=settings.spotify_backoff_max,
+        max_retry_after=settings.spotify_max_retry_after,
+    )
+
+    @classmethod
+    def _build_client(cls) -> httpx.AsyncClient:
+        """
+        Build a pooled HTTP client using the configured limits and timeouts.
+        """
+        http2 = settings.spotify_http2 and HTTP2_AVAILABLE
+        if settings.spotify_http2 and not HTTP2_AVAILABLE:
+            logger.warning(
+                "HTTP/2 requested but 'h2' is not installed. Using HTTP/1.1."
+            )
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.spotify_max_connections,
+                max_keepalive_connections=settings.spotify_max_keepalive_connections,
+                keepalive_expiry=settings.spotify_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.spotify_timeout, connect=settings.spotify_connect_timeout
+            ),
+        )
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client, creating it on first use.
+        Keeps TCP/TLS connections to Spotify alive across requests.
+        """
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._build_client()
+        return cls._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """
+        Close the shared HTTP client. Called on application shutdown.
+        """
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
     @classmethod
     async def _get(cls, url: str, token: str, allow_404: bool = False) -> Optional[Any]:
         """
         Internal helper for GET requests with error handling.
         """
+        _, data = await cls._get_with_status(url, token, allow_404=allow_404)
+        return data
+
+    @classmethod
+    async def _get_with_status(
+        cls, url: str, token: str, allow_404: bool = False
+    ) -> Tuple[Optional[int], Optional[Any]]:
+        """
+        GET request returning (status_code, json).
+        status_code is None when the request itself failed.
+        """
         headers = {"Authorization": f"Bearer {token}"}
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers)
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 404 and allow_404:
-                    logger.warning(
-                        f"Spotify resource not found (404) for URL: {url[:100]}..."
-                    )
-                    return None
-                else:
-                    logger.error(
-                        f"Spotify API Error [{response.status_code}] for URL {url[:100]}...: {response.text}"
-                    )
-                    return None
-            except Exception as e:
-                logger.error(f"HTTP Request Failed: {e}")
-                return None
+        try:
+            response = await cls._scheduler.execute(
+                token, lambda: cls.get_client().get(url, headers=headers)
+            )
+            if response.status_code == 200:
+                return response.status_code, response.json()
+            elif response.status_code == 404 and allow_404:
+                logger.warning(
+                    f"Spotify resource not found (404) for URL: {url[:100]}..."
+                )
+                return response.status_code, None
+            else:
+                logger.error(
+                    f"Spotify API Error [{response.status_code}] for URL {url[:100]}...: {response.text}"
+                )
+                return response.status_code, None
+        except Exception as e:
+            logger.error(f"HTTP Request Failed: {e}")
+            return None, None
 
     @classmethod
     async def _put(cls, url: str, token: str, payload: Any = None) -> bool:
@@ -47,19 +349,20 @@ class SpotifyService:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.put(url, headers=headers, json=payload)
-                if response.status_code in (200, 204):
-                    return True
-                else:
-                    logger.error(
-                        f"Spotify API PUT Error [{response.status_code}]: {response.text}"
-                    )
-                    return False
-            except Exception as e:
-                logger.error(f"HTTP Request Failed: {e}")
+        try:
+            response = await cls._scheduler.execute(
+                token, lambda: cls.get_client().put(url, headers=headers, json=payload)
+            )
+            if response.status_code in (200, 204):
+                return True
+            else:
+                logger.error(
+                    f"Spotify API PUT Error [{response.status_code}]: {response.text}"
+                )
                 return False
+        except Exception as e:
+            logger.error(f"HTTP Request Failed: {e}")
+            return False
 
     @classmethod
     async def fetch_user_top_items(
@@ -90,8 +393,76 @@ class SpotifyService:
     ) -> Optional[Any]:
         """
         Public wrapper for GET requests.
+        Catalog lookups (tracks, artists, related-artists, search) are served
+        from the catalog cache when possible, and concurrent identical requests
+        are coalesced into a single upstream call.
+        """
+        kind = cls._catalog_kind(url)
+        if kind is None:
+            return await cls._inflight.do(
+                ("user", token, url), lambda: cls._get(url, token, allow_404=allow_404)
+            )
+
+        cached = cls._catalog_cache.get(url, _MISSING)
+        if cached is not _MISSING:
+            return None if cached is _NOT_FOUND else cached
+
+        return await cls._inflight.do(
+            ("catalog", url),
+            lambda: cls._fetch_catalog(url, token, kind, allow_404=allow_404),
+        )
+
+    @classmethod
+    async def _fetch_catalog(
+        cls, url: str, token: str, kind: str, allow_404: bool = False
+    ) -> Optional[Any]:
+        """
+        Fetch a catalog resource and store the result (or its 404) in the cache.
         """
-        return await cls._get(url, token, allow_404=allow_404)
+        status, data = await cls._get_with_status(url, token, allow_404=allow_404)
+        if status == 200 and data is not None:
+            cls._catalog_cache.set(url, data, ttl=cls.CATALOG_TTLS[kind])
+        elif status == 404:
+            cls._catalog_cache.set(
+                url, _NOT_FOUND, ttl=settings.spotify_cache_negative_ttl
+            )
+        return data
+
+    @classmethod
+    def _catalog_kind(cls, url: str) -> Optional[str]:
+        """
+        Return the catalog endpoint kind for a URL, or None if the URL is
+        user-specific and must not be cached.
+        """
+        if not url.startswith(cls.BASE_URL):
+            return None
+
+        path = urllib.parse.urlsplit(url).path[len("/v1") :]
+        for pattern, kind in CATALOG_ENDPOINTS:
+            if pattern.match(path):
+                return kind
+        return None
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """
+        Return hit/miss counters for the catalog cache.
+        """
+        return cls._catalog_cache.stats()
+
+    @classmethod
+    def scheduler_stats(cls) -> Dict[str, Any]:
+        """
+        Return queue depth and throttling counters for the request scheduler.
+        """
+        return cls._scheduler.stats()
+
+    @classmethod
+    def coalescing_stats(cls) -> Dict[str, Any]:
+        """
+        Return counters for coalesced in-flight GET requests.
+        """
+        return cls._inflight.stats()
 
     @classmethod
     async def get_audio_features(cls, token: str, track_ids: List[str]) -> List[dict]:
@@ -107,25 +478,26 @@ class SpotifyService:
         # Audio Features endpoint is deprecated for new apps as of Nov 2024.
         # We must handle 403 specific failures gracefully.
         headers = {"Authorization": f"Bearer {token}"}
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("audio_features", []) if data else []
-                elif response.status_code == 403:
-                    logger.warning(
-                        "Spotify Audio Features API is restricted (403). Using fallback logic."
-                    )
-                    return []
-                else:
-                    logger.warning(
-                        f"Failed to fetch audio features [{response.status_code}]: {response.text}"
-                    )
-                    return []
-            except Exception as e:
-                logger.error(f"HTTP Request Failed: {e}")
+        try:
+            response = await cls._scheduler.execute(
+                token, lambda: cls.get_client().get(url, headers=headers)
+            )
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("audio_features", []) if data else []
+            elif response.status_code == 403:
+                logger.warning(
+                    "Spotify Audio Features API is restricted (403). Using fallback logic."
+                )
+                return []
+            else:
+                logger.warning(
+                    f"Failed to fetch audio features [{response.status_code}]: {response.text}"
+                )
                 return []
+        except Exception as e:
+            logger.error(f"HTTP Request Failed: {e}")
+            return []
 
     @classmethod
     async def set_repeat_mode(cls, token: str, state: str) -> bool:
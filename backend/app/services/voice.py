@@ -1,10 +1,19 @@
+import asyncio
+import hashlib
 import logging
+import os
+import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
 import edge_tts
 from app.core.config import Settings
-from app.utils.exceptions import TTSGenerationError
+from app.services.voice_stream import VoiceStream, VoiceStreamRing
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.exceptions import CircuitOpenError, TTSGenerationError
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +25,303 @@ VOICE_DIR.mkdir(parents=True, exist_ok=True)
 settings = Settings.get_settings()
 BASE_URL = settings.backend_url
 
+# Temporary clip files older than this were left by a crashed process; newer
+# ones may still be written by another worker sharing the directory
+STALE_TMP_AGE = 3600.0
+
+
+def clip_filename(text: str, voice: str) -> str:
+    """Content-addressed file name: the same line in the same voice is one clip."""
+    digest = hashlib.sha256(f"{voice}\n{text}".encode()).hexdigest()
+    return f"{digest[:32]}.mp3"
+
+
+class VoiceClipCache:
+    """
+    Synthesized clips on disk, keyed by hash(text, voice).
+
+    A clip is synthesized once and reused after that. Concurrent requests
+    for the same clip share one synthesis. Once the directory holds more
+    than max_bytes or max_files, the least recently used clips are deleted.
+    Use order survives restarts through file mtimes.
+    """
+
+    def __init__(
+        self, directory: Path, max_bytes: int = 200 * 1024 * 1024, max_files: int = 2000
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        # filename -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._inflight = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load(self) -> None:
+        """Index clips left by earlier runs and clear out failed writes."""
+        self._loaded = True
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        clips = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(".tmp"):
+                if time.time() - stat.st_mtime > STALE_TMP_AGE:
+                    Path(entry.path).unlink(missing_ok=True)
+            elif stat.st_size == 0:
+                Path(entry.path).unlink(missing_ok=True)
+            elif entry.name.endswith(".mp3"):
+                clips.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(clips):
+            self._index[name] = size
+            self._bytes += size
+        self._evict()
+
+    def lookup(self, text: str, voice: str) -> Optional[str]:
+        """Return the file name of the cached clip for text and voice, if any."""
+        if not self._loaded:
+            self._load()
+
+        filename = clip_filename(text, voice)
+        path = self.directory / filename
+        if filename in self._index and path.exists():
+            self._index.move_to_end(filename)
+            os.utime(path)
+            self.hits += 1
+            return filename
+        return None
+
+    async def get_or_create(
+        self, text: str, voice: str, synthesize: Callable[[str], Awaitable[None]]
+    ) -> str:
+        """
+        Return the file name of the clip for text and voice, calling
+        synthesize(path) to write it on a miss.
+        """
+        cached = self.lookup(text, voice)
+        if cached:
+            return cached
+
+        filename = clip_filename(text, voice)
+        self.misses += 1
+        return await self._inflight.do(
+            filename, lambda: self._create(filename, synthesize)
+        )
+
+    async def _create(
+        self, filename: str, synthesize: Callable[[str], Awaitable[None]]
+    ) -> str:
+        # Written under a temporary name so a failed or partial write is never served
+        tmp_path = self.directory / f".{filename}.{uuid.uuid4().hex}.tmp"
+        try:
+            await synthesize(str(tmp_path))
+            os.replace(tmp_path, self.directory / filename)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._add(filename)
+        return filename
+
+    def _add(self, filename: str) -> None:
+        size = (self.directory / filename).stat().st_size
+        self._bytes += size - self._index.pop(filename, 0)
+        self._index[filename] = size
+        self._evict(keep=filename)
+
+    async def store(self, filename: str, data: bytes) -> None:
+        """Save audio assembled elsewhere, e.g. a streamed DJ script, as a clip."""
+        if not self._loaded:
+            self._load()
+
+        tmp_path = self.directory / f".{filename}.{uuid.uuid4().hex}.tmp"
+        try:
+            await asyncio.to_thread(tmp_path.write_bytes, data)
+            os.replace(tmp_path, self.directory / filename)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._add(filename)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        while self._index and (
+            self._bytes > self.max_bytes or len(self._index) > self.max_files
+        ):
+            filename = next(iter(self._index))
+            if filename == keep:
+                break
+            size = self._index.pop(filename)
+            self._bytes -= size
+            (self.directory / filename).unlink(missing_ok=True)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_files": self.max_files,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            **self._inflight.stats(),
+        }
+
+
+voice_cache = VoiceClipCache(
+    VOICE_DIR,
+    max_bytes=int(settings.voice_cache_max_mb * 1024 * 1024),
+    max_files=settings.voice_cache_max_files,
+)
+
+# DJ scripts being streamed, kept in memory for listeners who open them late
+voice_streams = VoiceStreamRing(capacity=settings.voice_stream_buffers)
+
+# Wraps every synthesis; cached clips are still served while it is open
+tts_breaker = CircuitBreaker(
+    "edge-tts",
+    failure_threshold=settings.tts_breaker_threshold,
+    reset_timeout=settings.tts_breaker_reset,
+)
+
+
+async def _synthesize(text: str, voice: str, path: str) -> None:
+    communicate = edge_tts.Communicate(text, voice)
+    await tts_breaker.call(lambda: communicate.save(path))
+    logger.info(f"Generated voice clip for: {text[:40]}")
+
+
+async def _synthesize_streaming(
+    text: str, voice: str, path: str, stream: VoiceStream
+) -> None:
+    """Forward each audio chunk to the stream, then write the clip to path."""
+    communicate = edge_tts.Communicate(text, voice)
+    audio = []
+    async for chunk in tts_breaker.stream(communicate.stream()):
+        if chunk["type"] == "audio":
+            audio.append(chunk["data"])
+            # Finished streams have no readers left; the clip is still cached
+            if not stream.done:
+                stream.append(chunk["data"])
+    await asyncio.to_thread(Path(path).write_bytes, b"".join(audio))
+    logger.info(f"Streamed voice clip for: {text[:40]}")
+
+
+class ScriptSpeech:
+    """
+    A DJ script spoken sentence by sentence while it is still being written.
+
+    Every sentence is synthesized (or taken from the clip cache) as soon as
+    it arrives, and all of them play back to back on one voice stream. If
+    speech fails, the remaining sentences are still collected so the text
+    can be shown instead.
+    """
+
+    def __init__(
+        self, sentences: AsyncIterator[str], voice: str = "en-US-SteffanNeural"
+    ):
+        self.voice = voice
+        self.name = f"{uuid.uuid4().hex}.mp3"
+        self.stream = voice_streams.open(self.name)
+        self.sentences: List[str] = []
+        self._task = asyncio.create_task(self._speak(sentences))
+
+    async def _speak(self, sentences: AsyncIterator[str]) -> str:
+        error = None
+        try:
+            async for sentence in sentences:
+                self.sentences.append(sentence)
+                if error is None:
+                    try:
+                        await self._say(sentence)
+                    except CircuitOpenError as e:
+                        error = e
+                        logger.debug(f"Streaming TTS skipped: {e}")
+                    except Exception as e:
+                        error = e
+                        logger.error(f"Streaming TTS failed: {e}")
+        finally:
+            try:
+                if self.stream.chunks:
+                    # The URL outlives the in-memory stream, so keep the audio
+                    await voice_cache.store(self.name, b"".join(self.stream.chunks))
+            except OSError as e:
+                logger.warning(f"Could not save DJ script audio: {e}")
+            finally:
+                self.stream.finish(error)
+        return " ".join(self.sentences)
+
+    async def _say(self, sentence: str) -> None:
+        before = self.stream.size
+        filename = voice_cache.lookup(sentence, self.voice)
+        if filename is None:
+            filename = await self._synthesize(sentence)
+        if self.stream.size == before:
+            # Cached, or synthesized by a concurrent caller
+            path = voice_cache.directory / filename
+            self.stream.append(await asyncio.to_thread(path.read_bytes))
+
+    async def _synthesize(self, sentence: str) -> str:
+        """
+        Synthesize the sentence into the stream and the clip cache.
+        The cache shields synthesis from its callers, so the synthesis this
+        speech started is cancelled along with it.
+        """
+        started: List[asyncio.Task] = []
+
+        async def synthesize(path: str) -> None:
+            if self.stream.done:
+                # Cancelled before the synthesis got to run
+                raise asyncio.CancelledError()
+            started.append(asyncio.current_task())
+            await _synthesize_streaming(sentence, self.voice, path, self.stream)
+
+        try:
+            return await voice_cache.get_or_create(sentence, self.voice, synthesize)
+        except asyncio.CancelledError:
+            for task in started:
+                task.cancel()
+            raise
+
+    async def audio_url(self) -> Optional[str]:
+        """
+        Wait for the first audio and return the stream URL, or None if the
+        script turned out empty.
+
+        Raises:
+            TTSGenerationError: If speech failed before producing any audio.
+        """
+        try:
+            await self.stream.started()
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise TTSGenerationError(f"Failed to stream DJ script: {e}") from e
+        if not self.stream.chunks:
+            return None
+        return f"{BASE_URL}/voices/stream/{self.name}"
+
+    async def text(self) -> str:
+        """Wait for the whole script and return it."""
+        return await self._task
+
+    def cancel(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+
 
 async def generate_voice_clip(text: str, voice: str = "en-US-SteffanNeural") -> str:
     """
-    Generate a TTS audio clip using EdgeTTS and save it to the static directory.
+    Generate a TTS audio clip using EdgeTTS, or reuse the cached clip for
+    the same text and voice.
 
     Args:
         text: The text to convert to speech.
@@ -30,18 +332,17 @@ async def generate_voice_clip(text: str, voice: str = "en-US-SteffanNeural") ->
 
     Raises:
         TTSGenerationError: If generation fails.
+        CircuitOpenError: If edge-tts is failing and the clip is not cached.
     """
     try:
-        filename = f"{uuid.uuid4()}.mp3"
-        file_path = VOICE_DIR / filename
-
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(str(file_path))
-
-        logger.info(f"Generated voice clip: {file_path}")
+        filename = await voice_cache.get_or_create(
+            text, voice, lambda path: _synthesize(text, voice, path)
+        )
 
         # Ensure the path in URL uses forward slashes
         return f"{BASE_URL}/static/voices/{filename}"
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise TTSGenerationError(f"Failed to generate voice clip: {e}") from e
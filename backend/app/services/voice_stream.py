@@ -0,0 +1,100 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class VoiceStream:
+    """
+    One clip being synthesized, buffered in memory as it arrives.
+    Every reader starts from the first chunk and then follows the live
+    synthesis, so listeners who open the clip late still hear all of it.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, data: bytes) -> None:
+        self.chunks.append(data)
+        self.size += len(data)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def started(self) -> None:
+        """
+        Wait for the first chunk, or for synthesis to end.
+        Raises the synthesis error if it failed before producing any audio.
+        """
+        while not self.chunks and not self.done:
+            await self._changed.wait()
+        if not self.chunks and self.error:
+            raise self.error
+
+    async def read(self) -> AsyncIterator[bytes]:
+        """Yield the clip from its first chunk until synthesis ends."""
+        position = 0
+        while True:
+            changed = self._changed
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class VoiceStreamRing:
+    """
+    The most recent clip streams, keyed by clip name.
+    Once capacity is reached the oldest finished stream is dropped; its clip
+    is then served from the voice cache on disk. Streams still being
+    synthesized are never dropped, so capacity may be exceeded while more
+    than that many are live.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self._streams: "OrderedDict[str, VoiceStream]" = OrderedDict()
+        self.opened = 0
+        self.dropped = 0
+
+    def get(self, name: str) -> Optional[VoiceStream]:
+        return self._streams.get(name)
+
+    def open(self, name: str) -> VoiceStream:
+        stream = VoiceStream()
+        self._streams[name] = stream
+        self._streams.move_to_end(name)
+        self.opened += 1
+
+        excess = len(self._streams) - self.capacity
+        if excess > 0:
+            finished = [n for n, s in self._streams.items() if s.done][:excess]
+            for finished_name in finished:
+                del self._streams[finished_name]
+                self.dropped += 1
+        return stream
+
+    def clear(self) -> None:
+        self._streams.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self._streams),
+            "live": sum(1 for s in self._streams.values() if not s.done),
+            "buffered_bytes": sum(s.size for s in self._streams.values()),
+            "capacity": self.capacity,
+            "opened": self.opened,
+            "dropped": self.dropped,
+        }
@@ -1,11 +1,106 @@
-from typing import Dict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Set, Tuple
 
-from app.utils.models import RoomState
+from app.services.room_store import RoomStore, get_room_store
+from app.utils.keyed_lock import KeyedLock
 
-# Global in-memory state
-# In a real app, use Redis or a DB
+# Global state. Rooms live in the configured store (in-memory or Redis),
+# sockets are tracked per process.
+
+rooms: RoomStore = get_room_store()
+
+
+class SessionRegistry(MutableMapping):
+    """
+    Map socket_id -> user info ({"room_id", "user_id", "token"}), with
+    secondary indexes by room, by (room, user) and by room token holders,
+    so per-room lookups do not scan every socket on the server.
+
+    Session dicts are indexed when assigned; re-assign the session to
+    change its room, user or token.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, dict] = {}
+        self._room_sids: Dict[str, Set[str]] = {}
+        self._user_sids: Dict[Tuple[str, str], Set[str]] = {}
+        # room_id -> {sid: token}, in join order
+        self._room_tokens: Dict[str, Dict[str, str]] = {}
+
+    def __getitem__(self, sid: str) -> dict:
+        return self._sessions[sid]
+
+    def __setitem__(self, sid: str, info: dict) -> None:
+        if sid in self._sessions:
+            self._unindex(sid, self._sessions[sid])
+        self._sessions[sid] = info
+        self._index(sid, info)
+
+    def __delitem__(self, sid: str) -> None:
+        info = self._sessions.pop(sid)
+        self._unindex(sid, info)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _index(self, sid: str, info: dict) -> None:
+        room_id = info.get("room_id")
+        if not room_id:
+            return
+        self._room_sids.setdefault(room_id, set()).add(sid)
+        self._user_sids.setdefault((room_id, info.get("user_id")), set()).add(sid)
+        if info.get("token"):
+            self._room_tokens.setdefault(room_id, {})[sid] = info["token"]
+
+    def _unindex(self, sid: str, info: dict) -> None:
+        room_id = info.get("room_id")
+        if not room_id:
+            return
+        for index, key in (
+            (self._room_sids, room_id),
+            (self._user_sids, (room_id, info.get("user_id"))),
+        ):
+            sids = index.get(key)
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del index[key]
+
+        tokens = self._room_tokens.get(room_id)
+        if tokens is not None:
+            tokens.pop(sid, None)
+            if not tokens:
+                del self._room_tokens[room_id]
+
+    def room_sids(self, room_id: str) -> Set[str]:
+        """Sockets currently in the room."""
+        return set(self._room_sids.get(room_id, ()))
+
+    def user_sids(self, room_id: str, user_id: str) -> Set[str]:
+        """Sockets of one user in the room (a user can have several tabs open)."""
+        return set(self._user_sids.get((room_id, user_id), ()))
+
+    def room_token(
+        self, room_id: str, exclude_sid: Optional[str] = None
+    ) -> Optional[str]:
+        """A Spotify token of any socket in the room, oldest session first."""
+        for sid, token in self._room_tokens.get(room_id, {}).items():
+            if sid != exclude_sid:
+                return token
+        return None
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self._room_sids.clear()
+        self._user_sids.clear()
+        self._room_tokens.clear()
 
-rooms: Dict[str, RoomState] = {}
 
 # Map socket_id -> user info
-sid_map = {}
+sid_map = SessionRegistry()
+
+# Serializes room mutations and the broadcasts that follow them, per room
+room_locks = KeyedLock()
@@ -0,0 +1,112 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect concurrent calls into batches.
+
+    When no batch is running, items are sent at the end of the current loop
+    iteration, so a lone caller does not wait. While a batch is running, the
+    next item starts a window of `window` seconds; everything submitted
+    before it ends is passed to run() as one list, or sooner once max_size
+    items are waiting. run() returns one result per item, in order, and
+    each caller gets its own. Callers that are cancelled while waiting are
+    left out of the batch; if a running batch is cancelled, so are its
+    callers.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[List[T]], Awaitable[List[R]]],
+        window: float = 0.1,
+        max_size: int = 16,
+    ):
+        self.run = run
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[T, "asyncio.Future[R]"]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def submit(self, item: T) -> R:
+        future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            if self._tasks:
+                self._timer = loop.call_later(self.window, self._flush)
+            else:
+                self._timer = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(item, f) for item, f in self._pending if not f.done()]
+        self._pending = []
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        try:
+            results = await self.run([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch of {len(batch)} returned {len(results)} results"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled, e.g. at shutdown; don't leave the callers waiting
+            for _, future in batch:
+                future.cancel()
+            raise
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Send whatever is waiting now and wait for running batches."""
+        self._flush()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waiting": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "largest": self.largest,
+            "avg_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
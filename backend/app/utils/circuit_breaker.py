@@ -0,0 +1,143 @@
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar
+
+from app.utils.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is down.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    raise CircuitOpenError straight away instead of waiting on the provider.
+    Once reset_timeout seconds have passed, a single trial call is let
+    through (half-open): if it succeeds the circuit closes, if it fails the
+    circuit opens again for another reset_timeout.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and (
+            time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+        return self._state
+
+    def acquire(self) -> None:
+        """
+        Reserve a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                trial call already running.
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probing):
+            self.rejected += 1
+            raise CircuitOpenError(self.name)
+        if state == HALF_OPEN:
+            self._probing = True
+
+    def success(self) -> None:
+        if self._state != CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+        self._state = CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+                logger.warning(
+                    f"Circuit {self.name} opened after {self._failures} failures"
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a reservation whose call was abandoned (e.g. cancelled)."""
+        self._probing = False
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() through the breaker."""
+        self.acquire()
+        try:
+            result = await fn()
+        except Exception:
+            self.failure()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.success()
+        return result
+
+    async def stream(self, chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Pass a stream through the breaker; it counts once fully read."""
+        self.acquire()
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception:
+            self.failure()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per provider, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            self._breakers[name] = breaker
+        return breaker
+
+    def clear(self) -> None:
+        self._breakers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: b.stats() for name, b in self._breakers.items()}
@@ -31,6 +31,17 @@ class TTSGenerationError(Exception):
         super().__init__(message)
 
 
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit breaker is open.
+    Not logged: the breaker already logged when it opened.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"Circuit {name} is open")
+
+
 class SpotifyAPIError(Exception):
     """Raised when critical Spotify API calls fail."""
 
@@ -40,6 +51,18 @@ class SpotifyAPIError(Exception):
         super().__init__(self.message)
 
 
+class RoomConflictError(Exception):
+    """Raised when a room was modified by someone else since it was loaded."""
+
+    def __init__(self, room_id: str, expected_version: int):
+        self.room_id = room_id
+        self.expected_version = expected_version
+        logger.warning(
+            f"Room Conflict: {room_id} is no longer at version {expected_version}"
+        )
+        super().__init__(f"Room {room_id} is no longer at version {expected_version}")
+
+
 def validate_environment_settings(settings: "Settings") -> tuple[str, str, str, str]:
     """
     Extracts and validates environment settings.
@@ -0,0 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, List
+
+
+class KeyedLock:
+    """
+    One asyncio.Lock per key, e.g. per room.
+    Work on different keys runs concurrently; work on the same key runs one
+    at a time in arrival order. A key's lock is dropped once nobody holds or
+    waits on it, so idle rooms cost nothing.
+    """
+
+    def __init__(self) -> None:
+        # key -> [lock, holders + waiters]
+        self._locks: Dict[Hashable, List] = {}
+
+    @asynccontextmanager
+    async def __call__(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._locks[key] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(key) is entry:
+                del self._locks[key]
+
+    def locked(self, key: Hashable) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    def __len__(self) -> int:
+        return len(self._locks)
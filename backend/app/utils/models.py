@@ -1,6 +1,6 @@
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class SpotifyImage(BaseModel):
@@ -56,3 +56,18 @@ class RoomState(BaseModel):
     users: List[RoomUser] = Field(default_factory=list)
     vibe_profile: RoomVibeProfile = Field(default_factory=RoomVibeProfile)
     ai_mode_enabled: bool = True
+    # Bumped by the room store on every save, for optimistic concurrency
+    version: int = 0
+
+    # Field encodings as last persisted, so stores only write what changed
+    _persisted: Dict[str, str] = PrivateAttr(default_factory=dict)
+
+
+class ClientRoomState(BaseModel):
+    """What clients render of a room; server-only vibe data stays out."""
+
+    current_track: Optional[Track] = None
+    queue: List[Track] = Field(default_factory=list)
+    history: List[Track] = Field(default_factory=list)
+    is_playing: bool = False
+    users: List[RoomUser] = Field(default_factory=list)
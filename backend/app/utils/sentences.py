@@ -0,0 +1,38 @@
+import re
+from typing import AsyncIterator
+
+# Sentence-ending punctuation, any closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s)")
+
+# Words whose trailing period does not end a sentence, e.g. "Mr. Brightside"
+ABBREVIATIONS = frozenset(
+    {"mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "feat", "ft", "vol", "no"}
+)
+
+
+def _ends_sentence(text: str, end: int) -> bool:
+    words = text[:end].rstrip(".!?\"'”’)]").split()
+    return not (text[end - 1] == "." and words and words[-1].lower() in ABBREVIATIONS)
+
+
+async def split_sentences(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Regroup streamed text into whole sentences, each yielded as soon as the
+    whitespace after it arrives. Whatever is left at the end is yielded last.
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            if not _ends_sentence(buffer, match.end()):
+                continue
+            sentence = buffer[start : match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+
+    rest = buffer.strip()
+    if rest:
+        yield rest
@@ -2,6 +2,7 @@ import os
 import sys
 
 import pytest
+import pytest_asyncio
 
 # Set dummy env vars for testing BEFORE importing app modules to avoid config validation errors
 os.environ.setdefault("CLIENT_ID", "test_client_id")
@@ -18,3 +19,101 @@ def mock_room_state():
     from app.utils.models import RoomState
 
     return RoomState()
+
+
+@pytest.fixture(autouse=True)
+def fresh_room_sync():
+    """Each test starts without broadcast history, so rooms begin at a snapshot."""
+    from unittest.mock import patch
+
+    from app.logic.room_sync import RoomSync
+
+    with patch("app.events.room_sync", RoomSync()):
+        yield
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def fresh_dj_commentary():
+    """Each test gets its own commentary pool; leftover commentary is cancelled."""
+    from unittest.mock import patch
+
+    from app.services.dj_commentary import DJCommentaryPool
+
+    import app.events
+
+    pool = DJCommentaryPool(
+        lambda room_id, track: app.events.trigger_dj_voice(room_id, track)
+    )
+    with patch("app.events.dj_commentary", pool):
+        yield pool
+    await pool.aclose()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def fresh_dj_pregen():
+    """Each test starts without pre-generated commentary."""
+    from unittest.mock import patch
+
+    from app.services.dj_pregen import DJPregenerator
+
+    import app.events
+
+    pregen = DJPregenerator(
+        lambda room_id, track, next_song: app.events.pregenerate_dj_voice(
+            room_id, track, next_song
+        )
+    )
+    with patch("app.events.dj_pregen", pregen):
+        yield pregen
+    await pregen.aclose()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def fresh_llm_registry():
+    """Each test builds its own LLM clients, so patched settings take effect."""
+    from unittest.mock import patch
+
+    from app.services.llm import LLMRegistry
+
+    registry = LLMRegistry()
+    with patch("app.services.llm.llm_registry", registry):
+        yield registry
+    await registry.aclose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_mood_cache():
+    """Moods parsed in one test must not answer another test's LLM call."""
+    from app.logic.mood_parser import mood_cache
+
+    mood_cache.clear()
+    yield mood_cache
+    mood_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    """Failures provoked by one test must not open a circuit for the next."""
+    from unittest.mock import patch
+
+    from app.services.llm import llm_breakers
+    from app.utils.circuit_breaker import CircuitBreaker
+
+    llm_breakers.clear()
+    with patch("app.services.voice.tts_breaker", CircuitBreaker("edge-tts")) as tts:
+        yield tts
+    llm_breakers.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def fresh_dj_script_batcher():
+    """Each test batches DJ scripts on its own event loop."""
+    from unittest.mock import patch
+
+    from app.services.llm import _generate_dj_scripts
+    from app.utils.batcher import MicroBatcher
+
+    batcher = MicroBatcher(_generate_dj_scripts, window=0.01)
+    with patch("app.services.llm.dj_script_batcher", batcher):
+        yield batcher
+    await batcher.aclose()
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from app.logic.candidate_pool import CandidatePool, vibe_key
+from app.utils.models import Track
+
+
+def _track(i):
+    return Track(uri=f"spotify:track:{i}", name=str(i), artist="a", duration_ms=1)
+
+
+def test_vibe_key_is_order_independent():
+    assert vibe_key({"a": 1, "b": 2}) == vibe_key({"b": 2, "a": 1})
+    assert vibe_key({}) == vibe_key(None)
+    assert vibe_key({"a": 1}) != vibe_key({"a": 2})
+
+
+def test_add_deduplicates_and_respects_capacity():
+    pool = CandidatePool(capacity=3)
+    pool.set_vibe("v1")
+
+    added = pool.add([_track(i) for i in range(5)], {"spotify:track:0"}, "v1")
+    assert added == 3
+    assert "spotify:track:0" not in pool
+
+    # Already pooled tracks are not added twice
+    assert pool.add([_track(1)], set(), "v1") == 0
+
+
+def test_add_ignores_batches_for_other_vibes():
+    pool = CandidatePool()
+    pool.set_vibe("v2")
+
+    assert pool.add([_track(1)], set(), "v1") == 0
+    assert len(pool) == 0
+
+
+def test_set_vibe_clears_stale_candidates():
+    pool = CandidatePool()
+    pool.set_vibe("v1")
+    pool.add([_track(1), _track(2)], set(), "v1")
+
+    pool.set_vibe("v1")
+    assert len(pool) == 2
+
+    pool.set_vibe("v2")
+    assert len(pool) == 0
+
+
+def test_take_skips_excluded_in_order():
+    pool = CandidatePool()
+    pool.set_vibe("v1")
+    pool.add([_track(i) for i in range(4)], set(), "v1")
+
+    exclude = {"spotify:track:1"}
+    taken = pool.take(2, exclude)
+
+    assert [t.uri for t in taken] == ["spotify:track:0", "spotify:track:2"]
+    assert "spotify:track:2" in exclude
+    assert len(pool) == 1
+
+
+def test_prune_drops_old_candidates():
+    pool = CandidatePool(max_age=60)
+    pool.set_vibe("v1")
+
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=0.0):
+        pool.add([_track(1)], set(), "v1")
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=50.0):
+        pool.add([_track(2)], set(), "v1")
+
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=70.0):
+        assert pool.prune() == 1
+        assert [t.uri for t in pool.take(5, set())] == ["spotify:track:2"]
+
+
+def test_put_back_returns_candidates_to_the_front():
+    pool = CandidatePool(max_age=60)
+    pool.set_vibe("v1")
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=0.0):
+        pool.add([_track(i) for i in range(4)], set(), "v1")
+        taken = pool.take(3, set())
+
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=30.0):
+        put = pool.put_back(taken, {"spotify:track:2"}, "v1")
+        assert put == 2
+        assert pool.put_back(taken, set(), "v2") == 0
+
+    # Put-back candidates age with the rest of the pool
+    with patch("app.logic.candidate_pool.time.monotonic", return_value=50.0):
+        assert [t.uri for t in pool.take(5, set())] == [
+            "spotify:track:0",
+            "spotify:track:1",
+            "spotify:track:3",
+        ]
@@ -85,3 +85,179 @@ async def test_parse_mood_unknown_fallback():
 
         result = await parse_mood("random string")
         assert result == {}
+
+
+def _counting_client(response='{"seed_genres": ["chill"]}'):
+    calls = []
+
+    async def generate(system_prompt, user_prompt):
+        calls.append(user_prompt)
+        return response
+
+    client = MagicMock()
+    client.generate = generate
+    return client, calls
+
+
+def test_normalize_mood():
+    from app.logic.mood_parser import normalize_mood
+
+    assert normalize_mood("  Chill   Vibes!! ") == "chill"
+    assert normalize_mood("STUDY mode") == "study"
+    # A mood made only of filler words is kept
+    assert normalize_mood("Vibes") == "vibes"
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_cache_exact_hit(fresh_mood_cache):
+    client, calls = _counting_client()
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        first = await parse_mood("Sunset Vibes")
+        second = await parse_mood("sunset!")
+
+    assert first == second == {"seed_genres": ["chill"]}
+    assert len(calls) == 1
+    assert fresh_mood_cache.stats()["exact_hits"] == 1
+
+    # Callers get their own copy
+    second["seed_genres"].append("mutated")
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        assert await parse_mood("sunset") == {"seed_genres": ["chill"]}
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_cache_fuzzy_hit(fresh_mood_cache):
+    client, calls = _counting_client('{"seed_genres": ["lo-fi"]}')
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        await parse_mood("late night coding")
+        # Reordered words and a typo still resolve to the cached mood
+        assert await parse_mood("coding late night") == {"seed_genres": ["lo-fi"]}
+        assert await parse_mood("late nigt coding") == {"seed_genres": ["lo-fi"]}
+        # A different mood goes to the LLM
+        await parse_mood("morning run")
+
+    assert len(calls) == 2
+    stats = fresh_mood_cache.stats()
+    assert stats["fuzzy_hits"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_mood_similarity_needs_the_same_words():
+    from app.logic.mood_parser import mood_similarity
+
+    assert mood_similarity("late night coding", "coding late night") == 1.0
+    assert mood_similarity("late nigt coding", "late night coding") >= 0.85
+    # Numbers and genre names must match exactly
+    assert mood_similarity("90s rock", "80s rock") == 0.0
+    assert mood_similarity("chill folk", "chill rock") == 0.0
+    # Extra or missing words are a different mood
+    assert mood_similarity("rainy day jazz", "rainy day") == 0.0
+
+
+def test_negated_moods_skip_the_fuzzy_tier():
+    from app.logic.mood_parser import MoodCache, normalize_mood
+
+    cache = MoodCache()
+    cache.set(
+        normalize_mood("upbeat indie rock for a long road trip"),
+        {"seed_genres": ["indie"]},
+    )
+    negated = normalize_mood("not upbeat indie rock for a long road trip")
+
+    assert cache.get(negated) is None
+    cache.set(negated, {"seed_genres": ["ambient"]})
+    assert cache.get(negated) == {"seed_genres": ["ambient"]}
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_different_decade_goes_to_llm(fresh_mood_cache):
+    client, calls = _counting_client('{"seed_genres": ["rock"]}')
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        await parse_mood("80s rock")
+        await parse_mood("90s rock")
+
+    assert len(calls) == 2
+    assert fresh_mood_cache.stats()["fuzzy_hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_does_not_cache_fallback(fresh_mood_cache):
+    async def fail(*args, **kwargs):
+        raise Exception("Fail")
+
+    client = MagicMock()
+    client.generate = fail
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        await parse_mood("random string")
+
+    ok, calls = _counting_client('{"seed_genres": ["focus"]}')
+    with patch("app.logic.mood_parser.get_llm_client", return_value=ok):
+        assert await parse_mood("random string") == {"seed_genres": ["focus"]}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_cache_expires(fresh_mood_cache):
+    client, calls = _counting_client()
+    with patch("app.logic.mood_parser.get_llm_client", return_value=client):
+        with patch("app.utils.cache.time.monotonic", return_value=0.0):
+            await parse_mood("sunset")
+        with patch("app.utils.cache.time.monotonic", return_value=10**6):
+            await parse_mood("sunset")
+
+    assert len(calls) == 2
+
+
+def test_classifier_answers_clear_moods_locally():
+    from app.logic.mood_parser import MoodClassifier
+
+    classifier = MoodClassifier(threshold=0.8)
+
+    assert classifier.resolve("I want study mode") == {
+        "seed_genres": ["classical", "ambient", "study"]
+    }
+    assert classifier.resolve("Let's party hard!") == {
+        "seed_genres": ["pop", "dance", "house"],
+        "target_popularity": 80,
+    }
+    assert classifier.resolve("chill vibes") == {
+        "seed_genres": ["acoustic", "chill", "indie-pop"]
+    }
+    # Named genres lead, topped up by the mood
+    assert classifier.resolve("chill jazz") == {
+        "seed_genres": ["jazz", "acoustic", "chill"]
+    }
+    assert classifier.resolve("some hip hop and r&b") == {
+        "seed_genres": ["hip-hop", "r-n-b"]
+    }
+    # Longest phrase wins: "wind down" is sleep, not sad
+    assert classifier.resolve("time to wind down")["seed_genres"][0] == "sleep"
+    assert classifier.stats()["local"] == 6
+
+
+def test_classifier_escalates_ambiguous_moods():
+    from app.logic.mood_parser import MoodClassifier
+
+    classifier = MoodClassifier(threshold=0.8)
+
+    # Unknown words
+    assert classifier.classify("Generate high energy music") == (None, 0.0)
+    assert classifier.resolve("Generate high energy music") is None
+    # Partly understood
+    _, confidence = classifier.classify("chill but kind of nostalgic")
+    assert 0 < confidence < 0.8
+    # Conflicting moods
+    _, confidence = classifier.classify("sad party")
+    assert confidence == 0.5
+    # Negation
+    assert classifier.resolve("not chill") is None
+    assert classifier.stats()["escalated"] == 2
+
+
+@pytest.mark.asyncio
+async def test_parse_mood_skips_llm_for_clear_moods():
+    with patch("app.logic.mood_parser.get_llm_client") as mock_get_client:
+        result = await parse_mood("Lazy Sunday vibes")
+
+    mock_get_client.assert_not_called()
+    assert result == {"seed_genres": ["acoustic", "chill", "indie-pop"]}
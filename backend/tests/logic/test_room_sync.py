@@ -0,0 +1,184 @@
+import copy
+
+from unittest.mock import patch
+
+from app.logic.room_sync import LIST_FIELDS, VALUE_FIELDS, RoomSync, diff_list
+from app.utils.models import (
+    ClientRoomState,
+    RoomState,
+    RoomUser,
+    Track,
+    UserVibeData,
+    VibeTrack,
+)
+
+
+def _track(i):
+    return Track(
+        uri=f"spotify:track:{i}", name=str(i), artist="a", duration_ms=1, uuid=str(i)
+    )
+
+
+def _apply(state, ops):
+    """Reference client: apply JSON-patch ops to a dumped room state."""
+    state = copy.deepcopy(state)
+    for op in ops:
+        parts = op["path"].split("/")[1:]
+        if len(parts) == 1:
+            state[parts[0]] = op["value"]
+            continue
+        items, index = state[parts[0]], int(parts[1])
+        if op["op"] == "add":
+            items.insert(index, op["value"])
+        elif op["op"] == "remove":
+            items.pop(index)
+        else:
+            items[index] = op["value"]
+    return state
+
+
+def test_diff_list_head_pop_and_append_are_single_ops():
+    old = [_track(1), _track(2), _track(3)]
+
+    assert diff_list("queue", old, old[1:]) == [{"op": "remove", "path": "/queue/0"}]
+    assert diff_list("queue", old, old + [_track(4)]) == [
+        {"op": "add", "path": "/queue/3", "value": _track(4).model_dump()}
+    ]
+
+
+def test_diff_list_replaces_changed_items_in_place():
+    old = [_track(1), _track(2)]
+    changed = _track(2)
+    changed.added_by_name = "Alice"
+
+    assert diff_list("queue", old, [_track(1), changed]) == [
+        {"op": "replace", "path": "/queue/1", "value": changed.model_dump()}
+    ]
+
+
+def test_first_update_is_snapshot_then_patches():
+    sync = RoomSync()
+    room = RoomState()
+
+    event, payload = sync.update("r1", room)
+    assert event == "room_state"
+    assert payload["seq"] == 1
+
+    # Nothing changed, nothing to send
+    assert sync.update("r1", room) is None
+
+    room.users.append(RoomUser(id="u1", name="Alice"))
+    event, payload = sync.update("r1", room)
+    assert event == "room_patch"
+    assert payload["seq"] == 2
+    assert payload["base"] == 1
+    assert payload["ops"] == [
+        {
+            "op": "add",
+            "path": "/users/0",
+            "value": {"id": "u1", "name": "Alice", "image": None},
+        }
+    ]
+
+
+def test_patches_reproduce_room_state():
+    sync = RoomSync()
+    room = RoomState(queue=[_track(i) for i in range(5)])
+    _, client = sync.update("r1", room)
+
+    # Skip: current goes to history, head of queue starts playing
+    room.current_track = room.queue.pop(0)
+    room.is_playing = True
+    room.history.insert(0, _track(99))
+    room.queue.append(_track(7))
+    room.vibe_profile.active_mood = {"seed_genres": ["jazz"]}
+
+    _, patch = sync.update("r1", room)
+    client = _apply(client, patch["ops"])
+    client["seq"] = patch["seq"]
+
+    assert client == sync.snapshot("r1", room)
+
+
+def test_periodic_snapshot():
+    sync = RoomSync(snapshot_interval=2)
+    room = RoomState()
+    sync.update("r1", room)
+
+    room.is_playing = True
+    assert sync.update("r1", room)[0] == "room_patch"
+
+    room.is_playing = False
+    event, payload = sync.update("r1", room)
+    assert event == "room_state"
+    assert payload["seq"] == 3
+    assert payload["is_playing"] is False
+
+
+def test_forget_restarts_with_snapshot():
+    sync = RoomSync()
+    room = RoomState()
+    sync.update("r1", room)
+
+    sync.forget("r1")
+    assert sync.seq("r1") == 0
+    assert sync.update("r1", room)[0] == "room_state"
+
+
+def test_fields_follow_client_room_state():
+    assert LIST_FIELDS == ("queue", "history", "users")
+    assert VALUE_FIELDS == ("current_track", "is_playing")
+
+
+def test_snapshot_is_lean_client_state():
+
+    sync = RoomSync()
+    room = RoomState(queue=[_track(1)], users=[RoomUser(id="u1")])
+    room.vibe_profile.users_data["u1"] = UserVibeData(
+        top_tracks=[VibeTrack(id="v", name="v", artist="a", uri="spotify:track:v")]
+    )
+
+    _, payload = sync.update("r1", room)
+
+    expected = ClientRoomState.model_validate(room.model_dump()).model_dump()
+    assert payload == {**expected, "seq": 1}
+    assert "vibe_profile" not in payload
+
+    # Server-only changes are not broadcast at all
+    room.vibe_profile.active_mood = {"seed_genres": ["jazz"]}
+    assert sync.update("r1", room) is None
+
+
+def test_tracks_are_serialized_once():
+    sync = RoomSync()
+    room = RoomState(queue=[_track(i) for i in range(3)])
+
+    with patch.object(Track, "model_dump", autospec=True) as mock_dump:
+        mock_dump.side_effect = lambda self: {"uri": self.uri}
+        sync.update("r1", room)
+        room.queue.append(_track(3))
+        sync.update("r1", room)
+        sync.snapshot("r1", room)
+        sync.snapshot("r1", room)
+
+    assert mock_dump.call_count == 4
+
+
+def test_seq_follows_room_version_across_workers():
+    worker_a, worker_b = RoomSync(), RoomSync()
+    room = RoomState(version=3)
+
+    assert worker_a.update("r1", room)[1]["seq"] == 3
+
+    # Worker B saves and broadcasts the next change
+    room.is_playing = True
+    room.version = 4
+    assert worker_b.update("r1", room)[1]["seq"] == 4
+
+    # Worker A's next patch is based on the state it last sent, so clients
+    # that already saw version 4 from B detect the gap and resync
+    room.queue.append(_track(1))
+    room.version = 5
+    event, payload = worker_a.update("r1", room)
+    assert event == "room_patch"
+    assert (payload["base"], payload["seq"]) == (3, 5)
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from app.services.dj_commentary import DJCommentaryPool
+from app.utils.models import Track
+
+
+def _track(i):
+    return Track(uri=f"spotify:track:{i}", name=str(i), artist="a", duration_ms=1)
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately_and_runs_in_background():
+    done = []
+
+    async def worker(room_id, track):
+        await asyncio.sleep(0.01)
+        done.append((room_id, track.uri))
+
+    pool = DJCommentaryPool(worker)
+    pool.submit("r1", _track(1))
+    assert done == []
+
+    await pool.wait()
+    assert done == [("r1", "spotify:track:1")]
+    assert pool.stats()["completed"] == 1
+    assert pool.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_newer_track_cancels_stale_commentary():
+    started = []
+    done = []
+
+    async def worker(room_id, track):
+        started.append(track.uri)
+        await asyncio.sleep(0.05)
+        done.append(track.uri)
+
+    pool = DJCommentaryPool(worker)
+    pool.submit("r1", _track(1))
+    await asyncio.sleep(0.01)
+    assert started == ["spotify:track:1"]
+
+    pool.submit("r1", _track(2))
+    await pool.wait("r1")
+
+    assert done == ["spotify:track:2"]
+    assert pool.stats()["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_across_rooms():
+    active = 0
+    peak = 0
+
+    async def worker(room_id, track):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    pool = DJCommentaryPool(worker, concurrency=2)
+    for i in range(5):
+        pool.submit(f"r{i}", _track(i))
+    await pool.wait()
+
+    assert peak == 2
+    assert pool.stats()["completed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_room_queue_is_bounded():
+    done = []
+    release = asyncio.Event()
+
+    async def worker(room_id, track):
+        await release.wait()
+        done.append(track.uri)
+
+    pool = DJCommentaryPool(worker, queue_size=2)
+    pool.submit("r1", _track(0))
+    await asyncio.sleep(0)  # 0 is now running
+
+    for i in range(1, 4):
+        pool.submit("r1", _track(i), supersede=False)
+    assert pool.stats()["queued"] == 2
+
+    release.set()
+    await pool.wait("r1")
+
+    # Oldest queued entry was dropped to stay within the bound
+    assert done == ["spotify:track:0", "spotify:track:2", "spotify:track:3"]
+    assert pool.stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_do_not_stop_the_room():
+    done = []
+
+    async def worker(room_id, track):
+        if track.uri.endswith("1"):
+            raise RuntimeError("tts down")
+        done.append(track.uri)
+
+    pool = DJCommentaryPool(worker)
+    pool.submit("r1", _track(1), supersede=False)
+    pool.submit("r1", _track(2), supersede=False)
+    await pool.wait()
+
+    assert done == ["spotify:track:2"]
+    assert pool.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_aclose_cancels_running_commentary():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def worker(room_id, track):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    pool = DJCommentaryPool(worker)
+    pool.submit("r1", _track(1))
+    await started.wait()
+
+    await pool.aclose()
+    assert cancelled.is_set()
+    assert pool.stats()["active"] == 0
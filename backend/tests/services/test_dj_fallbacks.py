@@ -0,0 +1,59 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.dj_fallbacks import FallbackLibrary
+
+TEMPLATES = [
+    "Here's {current_song_name}!",
+    "Thanks {added_by_user}!",
+]
+GENERIC = ["Keep it going!", "Another one!"]
+
+
+@pytest.fixture
+def context():
+    return {
+        "current_song_name": "Song",
+        "current_song_artist": "Artist",
+        "next_song_name": "Next Song",
+        "next_song_artist": "Next Artist",
+        "added_by_user": "Alice",
+        "vibe_description": "keeping it fresh",
+    }
+
+
+def test_lines_do_not_repeat_within_a_round(context):
+    library = FallbackLibrary(TEMPLATES, GENERIC)
+
+    dealt = [library.line(context) for _ in range(4)]
+    assert sorted(dealt) == sorted(
+        ["Here's Song!", "Thanks Alice!", "Keep it going!", "Another one!"]
+    )
+
+    # Consecutive lines differ across rounds too
+    dealt += [library.line(context) for _ in range(40)]
+    assert all(a != b for a, b in zip(dealt, dealt[1:]))
+
+
+def test_templates_with_unknown_fields_are_skipped(context):
+    library = FallbackLibrary(TEMPLATES, GENERIC)
+    context["added_by_user"] = "someone"
+
+    dealt = {library.line(context) for _ in range(20)}
+    assert "Thanks someone!" not in dealt
+    assert "Here's Song!" in dealt
+    assert library.lines(context) == ["Here's Song!", *GENERIC]
+
+
+@pytest.mark.asyncio
+async def test_generic_lines_are_prerendered():
+    library = FallbackLibrary(TEMPLATES, GENERIC)
+    clip = AsyncMock(side_effect=["http://clip/1", Exception("TTS down")])
+
+    with patch("app.services.voice.generate_voice_clip", clip):
+        library.start()
+        await library._task
+
+    assert [c.args[0] for c in clip.call_args_list] == GENERIC
+    assert library.stats()["prerendered"] == 1
+    await library.aclose()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from app.services.dj_pregen import DJPregenerator
+from app.utils.models import RoomState, Track
+
+
+def _track(i):
+    return Track(
+        uri=f"spotify:track:{i}", name=str(i), artist="a", duration_ms=1, uuid=str(i)
+    )
+
+
+@pytest.mark.asyncio
+async def test_clip_is_keyed_by_track_and_the_song_after_it():
+    async def generate(room_id, track, next_song):
+        return {"text": f"{track.name} then {next_song.name if next_song else '-'}"}
+
+    pregen = DJPregenerator(generate)
+    t1, t2, t3 = _track(1), _track(2), _track(3)
+    pregen.refresh("r1", RoomState(queue=[t1, t2]))
+    await pregen.wait()
+
+    # Played with a different song queued after it: the clip does not fit
+    assert pregen.take("r1", t1, t3) is None
+    assert pregen.take("r1", t1, t2) == {"text": "1 then 2"}
+    # Consumed
+    assert pregen.take("r1", t1, t2) is None
+    assert pregen.stats()["hits"] == 1
+    assert pregen.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_change_cancels_stale_generation():
+    started = []
+
+    async def generate(room_id, track, next_song):
+        started.append(track.name)
+        await asyncio.sleep(0.05)
+        return {"text": track.name}
+
+    pregen = DJPregenerator(generate)
+    t1, t2 = _track(1), _track(2)
+    pregen.refresh("r1", RoomState(queue=[t1]))
+    await asyncio.sleep(0.01)
+
+    pregen.refresh("r1", RoomState(queue=[t2]))
+    await pregen.wait()
+
+    assert started == ["1", "2"]
+    assert pregen.take("r1", t1, None) is None
+    assert pregen.take("r1", t2, None) == {"text": "2"}
+    assert pregen.stats()["invalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unchanged_queue_is_not_regenerated():
+    calls = 0
+
+    async def generate(room_id, track, next_song):
+        nonlocal calls
+        calls += 1
+        return {"text": track.name}
+
+    pregen = DJPregenerator(generate)
+    t1, t2 = _track(1), _track(2)
+    pregen.refresh("r1", RoomState(queue=[t1, t2]))
+    await pregen.wait()
+    # Appending past the second slot does not affect the clip
+    pregen.refresh("r1", RoomState(queue=[t1, t2, _track(3)]))
+    await pregen.wait()
+
+    assert calls == 1
+
+    # Turning AI mode off drops it
+    pregen.refresh("r1", RoomState(queue=[t1, t2], ai_mode_enabled=False))
+    assert pregen.take("r1", t1, t2) is None
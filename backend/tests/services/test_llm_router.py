@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+from app.services.llm import LLMClient
+from app.services.llm_router import LLMRouter, ProviderStats
+from app.utils.exceptions import LLMGenerationError
+
+
+class FakeClient(LLMClient):
+    """Answers after a delay, or fails."""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, system_prompt, user_prompt, max_tokens=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise LLMGenerationError("down", provider=self.name)
+        return self.name
+
+    async def generate_stream(self, system_prompt, user_prompt):
+        text = await self.generate(system_prompt, user_prompt)
+        for word in text.split("-"):
+            yield word
+
+
+def test_provider_stats_percentiles():
+    stats = ProviderStats(window=10)
+    for ms in range(1, 11):
+        stats.record(ms / 1000)
+    stats.record_error()
+
+    assert stats.percentile(0.5) == pytest.approx(0.005)
+    assert stats.percentile(0.95) == pytest.approx(0.010)
+    assert stats.error_rate == pytest.approx(0.1)
+    assert stats.stats()["p95_ms"] == 10
+
+
+def test_ranking_prefers_fast_healthy_providers():
+    router = LLMRouter({"a": FakeClient("a"), "b": FakeClient("b")})
+    # Unmeasured providers keep their configured order
+    assert router.ranked() == ["a", "b"]
+
+    for _ in range(5):
+        router._stats["a"].record(0.5)
+        router._stats["b"].record(0.1)
+    assert router.ranked() == ["b", "a"]
+
+    for _ in range(10):
+        router._stats["b"].record_error()
+    assert router.ranked() == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_is_hedged_and_cancelled():
+    slow, fast = FakeClient("slow", delay=10), FakeClient("fast", delay=0.01)
+    router = LLMRouter({"slow": slow, "fast": fast}, hedge_delay=0.05)
+
+    assert await router.generate("Sys", "User") == "fast"
+    await asyncio.sleep(0)
+
+    assert slow.cancelled == 1
+    assert router.hedged == 1
+    assert router.hedge_wins == 1
+    # The loser is counted, but leaves no latency sample or error behind
+    assert router._stats["slow"].cancelled == 1
+    assert router._stats["slow"].requests == 0
+    assert not router._stats["slow"].latencies
+
+
+@pytest.mark.asyncio
+async def test_fast_provider_is_not_hedged():
+    primary, backup = FakeClient("a"), FakeClient("b")
+    router = LLMRouter({"a": primary, "b": backup}, hedge_delay=0.05)
+
+    assert await router.generate("Sys", "User") == "a"
+    assert backup.calls == 0
+    assert router.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_hedging_can_be_disabled():
+    slow, fast = FakeClient("slow", delay=0.1), FakeClient("fast")
+    router = LLMRouter({"slow": slow, "fast": fast}, hedging=False, hedge_delay=0)
+
+    assert await router.generate("Sys", "User") == "slow"
+    assert fast.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_provider_fails_over():
+    down, up = FakeClient("down", fail=True), FakeClient("up")
+    router = LLMRouter({"down": down, "up": up}, hedge_delay=10)
+
+    assert await router.generate("Sys", "User") == "up"
+    assert router.failovers == 1
+    assert router._stats["down"].errors == 1
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_raises():
+    router = LLMRouter(
+        {"a": FakeClient("a", fail=True), "b": FakeClient("b", fail=True)}
+    )
+
+    with pytest.raises(LLMGenerationError):
+        await router.generate("Sys", "User")
+
+
+@pytest.mark.asyncio
+async def test_stream_race_is_decided_by_first_chunk():
+    slow = FakeClient("slow", delay=10)
+    fast = FakeClient("fast-stream", delay=0.01)
+    router = LLMRouter({"slow": slow, "fast": fast}, hedge_delay=0.05)
+
+    chunks = [c async for c in router.generate_stream("Sys", "User")]
+    await asyncio.sleep(0.01)
+
+    assert chunks == ["fast", "stream"]
+    assert slow.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_error_after_first_chunk_is_raised():
+    class Broken(FakeClient):
+        async def generate_stream(self, system_prompt, user_prompt):
+            yield "Hey"
+            raise LLMGenerationError("cut off", provider=self.name)
+
+    router = LLMRouter({"a": Broken("a"), "b": FakeClient("b")})
+    chunks = []
+
+    with pytest.raises(LLMGenerationError):
+        async for chunk in router.generate_stream("Sys", "User"):
+            chunks.append(chunk)
+
+    assert chunks == ["Hey"]
+    assert router._stats["a"].errors == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_is_skipped_without_counting_as_error():
+    from app.utils.exceptions import CircuitOpenError
+
+    class Open(FakeClient):
+        async def generate(self, system_prompt, user_prompt, max_tokens=None):
+            raise CircuitOpenError(self.name)
+
+    router = LLMRouter({"a": Open("a"), "b": FakeClient("b")})
+
+    assert await router.generate("Sys", "User") == "b"
+    assert router._stats["a"].requests == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_do_not_skew_latency():
+    slow = FakeClient("slow", delay=5)
+    router = LLMRouter({"slow": slow}, hedging=False)
+
+    for _ in range(5):
+        call = asyncio.create_task(router.generate("Sys", "User"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    stats = router._stats["slow"].stats()
+    assert stats["cancelled"] == 5
+    assert stats["p50_ms"] is None
+    assert stats["requests"] == 0
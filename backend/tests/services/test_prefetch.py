@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.prefetch import QueuePrefetcher, build_seeds
+from app.utils.models import RoomState, Track
+
+
+def _rec(i):
+    return {
+        "uri": f"spotify:track:r{i}",
+        "name": f"Rec {i}",
+        "artists": [{"name": "A"}],
+        "album": {"images": [{"url": "img"}]},
+        "duration_ms": 1000,
+    }
+
+
+def test_build_seeds_uses_current_track():
+    room = RoomState()
+    room.current_track = Track(
+        uri="spotify:track:abc", name="1", artist="a", duration_ms=1
+    )
+
+    assert build_seeds(room) == {"seed_tracks": ["abc"]}
+    assert build_seeds(RoomState()) == {}
+
+
+@pytest.mark.asyncio
+async def test_schedule_fills_pool_in_background():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=1)
+    room = RoomState()
+    room.queue = [Track(uri="spotify:track:r0", name="q", artist="a", duration_ms=1)]
+
+    with patch(
+        "app.services.prefetch.get_recommendations", new_callable=AsyncMock
+    ) as mock_recs:
+        mock_recs.return_value = [_rec(i) for i in range(5)]
+
+        prefetcher.schedule("r1", room, "tok")
+        await prefetcher.wait("r1")
+
+        # r0 is already queued, so it is skipped; the surplus is retained
+        assert prefetcher.buffered("r1") == 4
+        mock_recs.assert_called_once()
+
+        room.history = [
+            Track(uri="spotify:track:r1", name="h", artist="a", duration_ms=1)
+        ]
+        taken = prefetcher.take("r1", room, 2)
+        assert [t.uri for t in taken] == ["spotify:track:r2", "spotify:track:r3"]
+        assert all(t.added_by == "system" for t in taken)
+
+        # Still above the low watermark, so no refill is started
+        prefetcher.schedule("r1", room, "tok")
+        await prefetcher.wait("r1")
+        mock_recs.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_schedule_requires_token():
+    prefetcher = QueuePrefetcher()
+    prefetcher.schedule("r1", RoomState(), None)
+    assert prefetcher.buffered("r1") == 0
+    await prefetcher.wait("r1")
+
+
+@pytest.mark.asyncio
+async def test_invalidate_ages_out_old_vibe():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=2)
+    room = RoomState()
+
+    with patch(
+        "app.services.prefetch.get_recommendations", new_callable=AsyncMock
+    ) as mock_recs:
+        mock_recs.return_value = [_rec(1)]
+        prefetcher.schedule("r1", room, "tok")
+        await prefetcher.wait("r1")
+
+    # Same vibe keeps candidates
+    prefetcher.invalidate("r1", room)
+    assert prefetcher.buffered("r1") == 1
+
+    room.vibe_profile.active_mood = {"seed_genres": ["jazz"]}
+    prefetcher.invalidate("r1", room)
+    assert prefetcher.buffered("r1") == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_survives_refill_cancelled_by_invalidate():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=2)
+    room = RoomState()
+    started = asyncio.Event()
+
+    async def slow_recs(*args):
+        started.set()
+        await asyncio.sleep(10)
+        return [_rec(1)]
+
+    with patch("app.services.prefetch.get_recommendations", side_effect=slow_recs):
+        prefetcher.schedule("r1", room, "tok")
+        waiter = asyncio.create_task(prefetcher.wait("r1"))
+        await started.wait()
+
+        # A vibe change cancels the refill the skip was waiting on
+        room.vibe_profile.active_mood = {"seed_genres": ["jazz"]}
+        prefetcher.invalidate("r1", room)
+
+        await asyncio.wait_for(waiter, timeout=1)
+        assert prefetcher.take("r1", room, 3) == []
+
+
+@pytest.mark.asyncio
+async def test_finished_refills_are_released():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=1)
+
+    with patch(
+        "app.services.prefetch.get_recommendations", new_callable=AsyncMock
+    ) as mock_recs:
+        mock_recs.return_value = [_rec(1)]
+        prefetcher.schedule("r1", RoomState(), "tok")
+        await prefetcher.wait("r1")
+
+    assert prefetcher._tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_forget_drops_pool_and_cancels_refill():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=20)
+    started = asyncio.Event()
+
+    async def slow_recs(*args):
+        started.set()
+        await asyncio.sleep(10)
+        return []
+
+    with patch(
+        "app.services.prefetch.get_recommendations", new_callable=AsyncMock
+    ) as mock_recs:
+        mock_recs.return_value = [_rec(1)]
+        prefetcher.schedule("r1", RoomState(), "tok")
+        await prefetcher.wait("r1")
+        assert prefetcher.buffered("r1") == 1
+
+    with patch("app.services.prefetch.get_recommendations", side_effect=slow_recs):
+        prefetcher.schedule("r1", RoomState(), "tok")
+        task = prefetcher._tasks["r1"]
+        await started.wait()
+
+        prefetcher.forget("r1")
+        await asyncio.wait({task})
+
+    assert task.cancelled()
+    assert prefetcher.buffered("r1") == 0
+    assert "r1" not in prefetcher._pools
+
+
+@pytest.mark.asyncio
+async def test_aclose_cancels_running_refills():
+    prefetcher = QueuePrefetcher(capacity=10, low_watermark=1)
+    started = asyncio.Event()
+
+    async def slow_recs(*args):
+        started.set()
+        await asyncio.sleep(10)
+        return []
+
+    with patch("app.services.prefetch.get_recommendations", side_effect=slow_recs):
+        prefetcher.schedule("r1", RoomState(), "tok")
+        prefetcher.schedule("r2", RoomState(), "tok")
+        tasks = list(prefetcher._tasks.values())
+        await started.wait()
+
+        await asyncio.wait_for(prefetcher.aclose(), timeout=1)
+
+    assert all(task.cancelled() for task in tasks)
+    assert prefetcher._tasks == {}
@@ -0,0 +1,163 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.recommendation_strategies import (
+    ArtistDerivedGenreStrategy,
+    DefaultFallbackStrategy,
+    GenreSeedStrategy,
+    RecommendationStrategy,
+    RelatedArtistStrategy,
+    SeedArtistFallbackStrategy,
+    StrategyContext,
+    StrategyRunner,
+)
+
+
+def test_runner_builds_stages_from_dependencies():
+    runner = StrategyRunner(
+        [
+            SeedArtistFallbackStrategy(),
+            RelatedArtistStrategy(),
+            GenreSeedStrategy(),
+            ArtistDerivedGenreStrategy(),
+        ]
+    )
+
+    stage_types = [{type(s) for s in stage} for stage in runner.stages]
+    assert stage_types == [
+        {GenreSeedStrategy, ArtistDerivedGenreStrategy},
+        {RelatedArtistStrategy},
+        {SeedArtistFallbackStrategy},
+    ]
+
+
+def test_runner_rejects_cycles():
+    class A(RecommendationStrategy):
+        async def execute(self, ctx):
+            pass
+
+    class B(RecommendationStrategy):
+        depends_on = (A,)
+
+        async def execute(self, ctx):
+            pass
+
+    A.depends_on = (B,)
+
+    with pytest.raises(ValueError):
+        StrategyRunner([A(), B()])
+
+
+@pytest.mark.asyncio
+async def test_runner_runs_independent_strategies_concurrently():
+    running = 0
+    peak = 0
+
+    class Slow(RecommendationStrategy):
+        async def execute(self, ctx):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    class SlowToo(Slow):
+        pass
+
+    await StrategyRunner([Slow(), SlowToo()]).run(StrategyContext({}, "tok"))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_seed_artist_resolved_once():
+    track_data = {"artists": [{"id": "a1", "name": "Seed Artist"}]}
+
+    with patch(
+        "app.services.spotify_client.SpotifyService.get_request",
+        new_callable=AsyncMock,
+    ) as mock_get:
+
+        def side_effect(url, token, allow_404=False):
+            if "/tracks/" in url:
+                return track_data
+            return None
+
+        mock_get.side_effect = side_effect
+
+        ctx = StrategyContext({"seed_tracks": ["t1"]}, "tok")
+        runner = StrategyRunner(
+            [
+                ArtistDerivedGenreStrategy(),
+                RelatedArtistStrategy(),
+                SeedArtistFallbackStrategy(),
+            ]
+        )
+        await runner.run(ctx)
+
+        track_calls = [c for c in mock_get.call_args_list if "/tracks/" in c.args[0]]
+        assert len(track_calls) == 1
+        assert ctx.seed_artist_id == "a1"
+        assert ctx.queries == ['artist:"Seed Artist"']
+
+
+def _spotify(artist_genres):
+    def side_effect(url, token, allow_404=False):
+        if "/tracks/" in url:
+            return {"artists": [{"id": "a1", "name": "Seed Artist"}]}
+        if url.endswith("/related-artists"):
+            return {"artists": [{"id": "a2", "name": "Related"}]}
+        if "/artists/" in url:
+            return {"name": "Seed Artist", "genres": artist_genres}
+        return None
+
+    return side_effect
+
+
+@pytest.mark.parametrize(
+    "artist_genres, related_calls",
+    [
+        (["house", "techno"], 0),  # Enough variety; the stage is skipped
+        ([], 1),
+    ],
+)
+@pytest.mark.asyncio
+async def test_related_artists_fetched_only_when_stage_runs(
+    artist_genres, related_calls
+):
+    with patch(
+        "app.services.spotify_client.SpotifyService.get_request",
+        new_callable=AsyncMock,
+        side_effect=_spotify(artist_genres),
+    ) as mock_get:
+        ctx = StrategyContext({"seed_tracks": ["t1"]}, "tok")
+        runner = StrategyRunner(
+            [
+                GenreSeedStrategy(),
+                ArtistDerivedGenreStrategy(),
+                RelatedArtistStrategy(),
+            ]
+        )
+        await runner.run(ctx)
+
+    urls = [c.args[0] for c in mock_get.call_args_list]
+    assert sum(u.endswith("/related-artists") for u in urls) == related_calls
+    # One lookup each for the seed track and the seed artist
+    assert len(urls) == 2 + related_calls
+
+
+@pytest.mark.asyncio
+async def test_runner_deadline_still_runs_fallback():
+    class Hanging(RecommendationStrategy):
+        async def execute(self, ctx):
+            await asyncio.sleep(10)
+
+    ctx = StrategyContext({}, "tok")
+    runner = StrategyRunner(
+        [Hanging()], fallback=DefaultFallbackStrategy(), deadline=0.01
+    )
+
+    await runner.run(ctx)
+
+    assert ctx.queries == ["genre:pop"]
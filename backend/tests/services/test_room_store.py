@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from app.services.room_store import InMemoryRoomStore, RedisRoomStore
+from app.utils.exceptions import RoomConflictError
+from app.utils.models import RoomUser, Track, UserVibeData
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _track(i):
+    return Track(uri=f"spotify:track:{i}", name=str(i), artist="a", duration_ms=1)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryRoomStore()
+    return RedisRoomStore(fakeredis.FakeAsyncRedis())
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_and_update(store):
+    assert await store.get("r1") is None
+    assert not await store.exists("r1")
+
+    room = await store.get_or_create("r1")
+    assert await store.exists("r1")
+    version = room.version
+
+    room, result = await store.update("r1", lambda r: r.queue.append(_track(1)))
+    assert result is None
+    assert room.version == version + 1
+
+    loaded = await store.get("r1")
+    assert [t.uri for t in loaded.queue] == ["spotify:track:1"]
+    assert loaded.version == room.version
+
+
+@pytest.mark.asyncio
+async def test_update_missing_room(store):
+    assert await store.update("nope", lambda r: r.queue.clear()) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_update_returns_mutate_result(store):
+    await store.get_or_create("r1")
+    await store.update("r1", lambda r: r.queue.extend([_track(1), _track(2)]))
+
+    _, popped = await store.update("r1", lambda r: r.queue.pop(0))
+    assert popped.uri == "spotify:track:1"
+    assert [t.uri for t in (await store.get("r1")).queue] == ["spotify:track:2"]
+
+
+@pytest.mark.asyncio
+async def test_delete(store):
+    await store.get_or_create("r1")
+    await store.delete("r1")
+    assert await store.get("r1") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_stale_save_conflicts():
+    store = RedisRoomStore(fakeredis.FakeAsyncRedis())
+    await store.get_or_create("r1")
+
+    first = await store.get("r1")
+    second = await store.get("r1")
+
+    first.is_playing = True
+    await store.save("r1", first)
+
+    second.queue.append(_track(1))
+    with pytest.raises(RoomConflictError):
+        await store.save("r1", second)
+
+    # update() reloads and re-applies instead
+    await store.update("r1", lambda r: r.queue.append(_track(1)))
+    room = await store.get("r1")
+    assert room.is_playing is True
+    assert [t.uri for t in room.queue] == ["spotify:track:1"]
+
+
+@pytest.mark.asyncio
+async def test_redis_concurrent_updates_all_apply():
+    store = RedisRoomStore(fakeredis.FakeAsyncRedis(), max_retries=50)
+    await store.get_or_create("r1")
+
+    tracks = [_track(i) for i in range(10)]
+    await asyncio.gather(
+        *(store.update("r1", lambda r, t=t: r.queue.append(t)) for t in tracks)
+    )
+
+    room = await store.get("r1")
+    assert sorted(t.uri for t in room.queue) == sorted(
+        f"spotify:track:{i}" for i in range(10)
+    )
+
+
+@pytest.mark.asyncio
+async def test_redis_only_writes_changed_fields():
+    client = fakeredis.FakeAsyncRedis()
+    store = RedisRoomStore(client)
+    room = await store.get_or_create("r1")
+    room.users.append(RoomUser(id="u1"))
+    room.vibe_profile.users_data["u1"] = UserVibeData()
+    await store.save("r1", room)
+
+    # Overwrite a field behind the store's back; an unrelated save must not
+    # write it again
+    await client.hset("vibesync:room:r1", "vibe_profile", '{"users_data": {}}')
+    room.is_playing = True
+    await store.save("r1", room)
+
+    loaded = await store.get("r1")
+    assert loaded.is_playing is True
+    assert loaded.vibe_profile.users_data == {}
+    assert [u.id for u in loaded.users] == ["u1"]
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+import pytest
+import socketio
+from app.core.config import Settings
+from app.services.socket_manager import InMemoryPubSubManager, get_client_manager
+
+
+def _configured(url: str, channel: str = "vibesync"):
+    settings = Settings.get_settings()
+    return patch.multiple(
+        settings, socketio_message_queue=url, socketio_channel=channel
+    )
+
+
+def test_no_message_queue_keeps_default_manager():
+    with _configured(""):
+        assert get_client_manager() is None
+
+
+def test_memory_backend():
+    with _configured("memory://", "chan-memory"):
+        manager = get_client_manager()
+    try:
+        assert isinstance(manager, InMemoryPubSubManager)
+        assert manager.channel == "chan-memory"
+    finally:
+        manager.close()
+
+
+def test_redis_backend():
+    pytest.importorskip("redis")
+    with _configured("redis://cache:6379/2", "chan-redis"):
+        manager = get_client_manager()
+
+    # Nothing connects until a server starts using the manager
+    assert isinstance(manager, socketio.AsyncRedisManager)
+    assert manager.redis_url == "redis://cache:6379/2"
+    assert manager.channel == "chan-redis"
+
+
+def test_unsupported_message_queue():
+    with _configured("kafka://broker:9092"):
+        with pytest.raises(ValueError, match="SOCKETIO_MESSAGE_QUEUE"):
+            get_client_manager()
@@ -1,7 +1,19 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
-from app.services.spotify_client import SpotifyService
+from app.services.spotify_client import SpotifyRequestScheduler, SpotifyService
+
+
+@pytest.fixture(autouse=True)
+def fast_scheduler():
+    """Scheduler without throttling or backoff delays so tests stay fast."""
+    scheduler = SpotifyRequestScheduler(
+        rate=1000, burst=1000, per_token_concurrency=4, backoff_base=0, backoff_max=0
+    )
+    with patch.object(SpotifyService, "_scheduler", scheduler):
+        yield scheduler
 
 
 @pytest.mark.asyncio
@@ -15,11 +27,11 @@ async def test_get_request_success():
     mock_response.status_code = 200
     mock_response.json.return_value = mock_json
 
-    # Mock httpx.AsyncClient
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    # Mock the shared httpx.AsyncClient
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.get.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await SpotifyService.get_request(url, token)
 
@@ -36,10 +48,10 @@ async def test_get_request_failure():
     mock_response.status_code = 400
     mock_response.text = "Error"
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.get.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         # Should log error and return None
         result = await SpotifyService.get_request(url, token)
@@ -52,10 +64,10 @@ async def test_get_request_exception():
     token = "valid_token"
     url = "https://api.spotify.com/v1/error"
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.get.side_effect = Exception("Connection error")
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await SpotifyService.get_request(url, token)
         assert result is None
@@ -70,11 +82,11 @@ async def test_put_request_success():
     mock_response = MagicMock()
     mock_response.status_code = 204
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         # Mock put
         mock_client.put.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await SpotifyService._put(url, token, payload)
         assert result is True
@@ -89,10 +101,10 @@ async def test_put_request_failure():
     mock_response.status_code = 500
     mock_response.text = "Error"
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.put.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await SpotifyService._put(url, token)
         assert result is False
@@ -100,10 +112,10 @@ async def test_put_request_failure():
 
 @pytest.mark.asyncio
 async def test_put_request_exception():
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.put.side_effect = Exception("Net error")
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await SpotifyService._put("url", "token")
         assert result is False
@@ -121,10 +133,10 @@ async def test_get_audio_features_chunking():
     mock_response.status_code = 200
     mock_response.json.return_value = mock_json
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.get.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         features = await SpotifyService.get_audio_features(token, ids)
 
@@ -145,10 +157,10 @@ async def test_get_audio_features_403_graceful():
     mock_response.status_code = 403
     mock_response.text = "Forbidden"
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
         mock_client = AsyncMock()
         mock_client.get.return_value = mock_response
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         features = await SpotifyService.get_audio_features(token, ids)
 
@@ -173,3 +185,220 @@ async def test_fetch_user_top_items():
         items = await SpotifyService.fetch_user_top_items("tok")
         assert len(items) == 1
         assert items[0]["name"] == "Song"
+
+
+def test_get_client_is_shared():
+    with patch.object(SpotifyService, "_client", None):
+        with patch("app.services.spotify_client.httpx.AsyncClient") as mock_client_cls:
+            mock_client_cls.return_value.is_closed = False
+
+            first = SpotifyService.get_client()
+            second = SpotifyService.get_client()
+
+            assert first is second
+            mock_client_cls.assert_called_once()
+            kwargs = mock_client_cls.call_args.kwargs
+            assert isinstance(kwargs["limits"], httpx.Limits)
+            assert isinstance(kwargs["timeout"], httpx.Timeout)
+
+
+@pytest.mark.asyncio
+async def test_aclose_resets_client():
+    mock_client = AsyncMock()
+    with patch.object(SpotifyService, "_client", mock_client):
+        await SpotifyService.aclose()
+
+        mock_client.aclose.assert_called_once()
+        assert SpotifyService._client is None
+
+
+@pytest.fixture
+def clear_catalog_cache():
+    SpotifyService._catalog_cache.clear()
+    yield
+    SpotifyService._catalog_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_request_caches_catalog_lookups(clear_catalog_cache):
+    url = f"{SpotifyService.BASE_URL}/artists/a1"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"name": "Artist"}
+
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
+        mock_client = AsyncMock()
+        mock_client.get.return_value = mock_response
+        mock_get_client.return_value = mock_client
+
+        # Different tokens share the same catalog entry
+        first = await SpotifyService.get_request(url, "token_a")
+        second = await SpotifyService.get_request(url, "token_b")
+
+        assert first == second == {"name": "Artist"}
+        mock_client.get.assert_called_once()
+        assert SpotifyService.cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_request_negative_caches_404(clear_catalog_cache):
+    url = f"{SpotifyService.BASE_URL}/artists/a1/related-artists"
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
+        mock_client = AsyncMock()
+        mock_client.get.return_value = mock_response
+        mock_get_client.return_value = mock_client
+
+        assert await SpotifyService.get_request(url, "tok", allow_404=True) is None
+        assert await SpotifyService.get_request(url, "tok", allow_404=True) is None
+        mock_client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_request_skips_cache_for_user_endpoints(clear_catalog_cache):
+    url = f"{SpotifyService.BASE_URL}/me/top/tracks"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"items": []}
+
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
+        mock_client = AsyncMock()
+        mock_client.get.return_value = mock_response
+        mock_get_client.return_value = mock_client
+
+        await SpotifyService.get_request(url, "tok")
+        await SpotifyService.get_request(url, "tok")
+
+        assert mock_client.get.call_count == 2
+
+
+def test_catalog_kind():
+    base = SpotifyService.BASE_URL
+    assert SpotifyService._catalog_kind(f"{base}/tracks/t1") == "track"
+    assert SpotifyService._catalog_kind(f"{base}/artists/a1") == "artist"
+    assert (
+        SpotifyService._catalog_kind(f"{base}/artists/a1/related-artists")
+        == "related_artists"
+    )
+    assert SpotifyService._catalog_kind(f"{base}/search?q=x&type=track") == "search"
+    assert SpotifyService._catalog_kind(f"{base}/me/player/repeat") is None
+
+
+def _response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_after_429(fast_scheduler):
+    send = AsyncMock(side_effect=[_response(429, {"Retry-After": "0"}), _response(200)])
+
+    response = await fast_scheduler.execute("tok", send)
+
+    assert response.status_code == 200
+    assert send.call_count == 2
+    stats = fast_scheduler.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_on_long_retry_after(fast_scheduler):
+    send = AsyncMock(return_value=_response(429, {"Retry-After": "3600"}))
+
+    response = await fast_scheduler.execute("tok", send)
+
+    assert response.status_code == 429
+    send.assert_called_once()
+    assert fast_scheduler.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_transport_errors(fast_scheduler):
+    send = AsyncMock(side_effect=httpx.ConnectError("down"))
+
+    with pytest.raises(httpx.ConnectError):
+        await fast_scheduler.execute("tok", send)
+
+    assert send.call_count == fast_scheduler.max_retries + 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_per_token_concurrency():
+    scheduler = SpotifyRequestScheduler(rate=1000, burst=1000, per_token_concurrency=1)
+    active = 0
+    peak = 0
+
+    async def send():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _response(200)
+
+    await asyncio.gather(*(scheduler.execute("tok", send) for _ in range(3)))
+
+    assert peak == 1
+    assert scheduler.stats()["queue_depth"] == 0
+    assert scheduler.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_token_bucket_throttles():
+    scheduler = SpotifyRequestScheduler(rate=100, burst=1, per_token_concurrency=4)
+    send = AsyncMock(return_value=_response(200))
+
+    await asyncio.gather(*(scheduler.execute(f"tok{i}", send) for i in range(3)))
+
+    assert send.call_count == 3
+    assert scheduler.stats()["throttled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rate_zero_disables_token_bucket():
+    scheduler = SpotifyRequestScheduler(rate=0, burst=0, per_token_concurrency=4)
+    send = AsyncMock(return_value=_response(200))
+
+    await asyncio.wait_for(
+        asyncio.gather(*(scheduler.execute(f"tok{i}", send) for i in range(5))),
+        timeout=1,
+    )
+
+    assert send.call_count == 5
+    assert scheduler.stats()["throttled"] == 0
+
+
+def test_scheduler_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        SpotifyRequestScheduler(rate=-1, burst=10, per_token_concurrency=4)
+    with pytest.raises(ValueError):
+        SpotifyRequestScheduler(rate=10, burst=0, per_token_concurrency=4)
+
+
+@pytest.mark.asyncio
+async def test_get_request_coalesces_concurrent_lookups(clear_catalog_cache):
+    url = f"{SpotifyService.BASE_URL}/tracks/t1"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"id": "t1"}
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return mock_response
+
+    with patch.object(SpotifyService, "get_client") as mock_get_client:
+        mock_client = AsyncMock()
+        mock_client.get.side_effect = slow_get
+        mock_get_client.return_value = mock_client
+
+        results = await asyncio.gather(
+            *(SpotifyService.get_request(url, f"tok{i}") for i in range(4))
+        )
+
+        assert all(r == {"id": "t1"} for r in results)
+        mock_client.get.assert_called_once()
@@ -1,7 +1,10 @@
+import asyncio
+import os
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.services.voice import generate_voice_clip
+from app.services.voice import VoiceClipCache, clip_filename, generate_voice_clip
 from app.utils.exceptions import TTSGenerationError
 
 
@@ -12,34 +15,49 @@ def mock_settings():
         yield mock
 
 
+@pytest.fixture
+def voice_cache(tmp_path):
+    # Point the clip cache at a temp dir so we don't spam the real fs
+    cache = VoiceClipCache(tmp_path)
+    with patch("app.services.voice.voice_cache", cache):
+        yield cache
+
+
+async def _write_mp3(path, data=b"mp3"):
+    Path(path).write_bytes(data)
+
+
 @pytest.mark.asyncio
-async def test_generate_voice_clip_success(mock_settings, tmp_path):
+async def test_generate_voice_clip_success(mock_settings, voice_cache, tmp_path):
     """Test successful voice clip generation."""
     # Mock EdgeTTS Communicate
     with patch("app.services.voice.edge_tts.Communicate") as mock_communicate_cls:
         mock_communicate = mock_communicate_cls.return_value
         # Mock save method to be async
-        mock_communicate.save = AsyncMock()
+        mock_communicate.save = AsyncMock(side_effect=_write_mp3)
 
-        # We need to mock the VOICE_DIR to point to a temp dir so we don't spam the real fs
-        with patch("app.services.voice.VOICE_DIR", tmp_path):
-            result = await generate_voice_clip("Hello world", "en-US-test")
+        result = await generate_voice_clip("Hello world", "en-US-test")
 
-            # Check URL format
-            assert result.startswith("http://localhost:8000/static/voices/")
-            assert result.endswith(".mp3")
+        # Check URL format
+        assert result.startswith("http://localhost:8000/static/voices/")
+        assert result.endswith(".mp3")
 
-            # Verify edge_tts was called
-            mock_communicate_cls.assert_called_with("Hello world", "en-US-test")
-            mock_communicate.save.assert_called_once()
+        # Verify edge_tts was called
+        mock_communicate_cls.assert_called_with("Hello world", "en-US-test")
+        mock_communicate.save.assert_called_once()
 
-            # Check file path passed to save
-            save_call_args = mock_communicate.save.call_args[0]
-            assert str(tmp_path) in save_call_args[0]
+        # Check file path passed to save
+        save_call_args = mock_communicate.save.call_args[0]
+        assert str(tmp_path) in save_call_args[0]
+
+        # The same line is served from the cache
+        assert await generate_voice_clip("Hello world", "en-US-test") == result
+        mock_communicate.save.assert_called_once()
+        assert voice_cache.stats()["hits"] == 1
 
 
 @pytest.mark.asyncio
-async def test_generate_voice_clip_failure(mock_settings):
+async def test_generate_voice_clip_failure(mock_settings, voice_cache, tmp_path):
     """Test voice clip generation failure."""
     with patch("app.services.voice.edge_tts.Communicate") as mock_communicate_cls:
         mock_communicate = mock_communicate_cls.return_value
@@ -47,3 +65,110 @@ async def test_generate_voice_clip_failure(mock_settings):
 
         with pytest.raises(TTSGenerationError):
             await generate_voice_clip("Fail", "en-US-test")
+
+    # No partial file is left behind to be served later
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_tts_outage_fails_fast_but_serves_cached_clips(
+    mock_settings, voice_cache, fresh_circuit_breakers
+):
+    """While edge-tts is down, new clips fail fast; cached ones still play."""
+    from app.utils.exceptions import CircuitOpenError
+
+    with patch("app.services.voice.edge_tts.Communicate") as mock_communicate_cls:
+        mock_communicate = mock_communicate_cls.return_value
+        mock_communicate.save = AsyncMock(side_effect=_write_mp3)
+        cached = await generate_voice_clip("Cached line", "en-US-test")
+
+        mock_communicate.save = AsyncMock(side_effect=Exception("TTS Error"))
+        for i in range(fresh_circuit_breakers.failure_threshold):
+            with pytest.raises(TTSGenerationError):
+                await generate_voice_clip(f"Line {i}", "en-US-test")
+
+        with pytest.raises(CircuitOpenError):
+            await generate_voice_clip("Another line", "en-US-test")
+        assert (
+            mock_communicate.save.call_count == fresh_circuit_breakers.failure_threshold
+        )
+
+        assert await generate_voice_clip("Cached line", "en-US-test") == cached
+
+
+@pytest.mark.asyncio
+async def test_clip_is_keyed_by_text_and_voice(tmp_path):
+    cache = VoiceClipCache(tmp_path)
+    synthesize = AsyncMock(side_effect=_write_mp3)
+
+    a = await cache.get_or_create("Hi", "voice-a", synthesize)
+    b = await cache.get_or_create("Hi", "voice-b", synthesize)
+    again = await cache.get_or_create("Hi", "voice-a", synthesize)
+
+    assert a == clip_filename("Hi", "voice-a") == again
+    assert a != b
+    assert synthesize.call_count == 2
+    assert cache.stats()["hit_rate"] == 0.333
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_synthesis(tmp_path):
+    cache = VoiceClipCache(tmp_path)
+
+    async def slow_write(path):
+        await asyncio.sleep(0.01)
+        await _write_mp3(path)
+
+    synthesize = AsyncMock(side_effect=slow_write)
+    results = await asyncio.gather(
+        *(cache.get_or_create("Same line", "v", synthesize) for _ in range(3))
+    )
+
+    assert len(set(results)) == 1
+    synthesize.assert_called_once()
+    assert cache.stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_clips_are_evicted(tmp_path):
+    cache = VoiceClipCache(tmp_path, max_bytes=10)
+
+    async def write(path):
+        await _write_mp3(path, b"x" * 4)
+
+    synthesize = AsyncMock(side_effect=write)
+
+    first = await cache.get_or_create("one", "v", synthesize)
+    second = await cache.get_or_create("two", "v", synthesize)
+    # Touch the first clip so the second becomes the oldest
+    await cache.get_or_create("one", "v", synthesize)
+    third = await cache.get_or_create("three", "v", synthesize)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([first, third])
+    assert not (tmp_path / second).exists()
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["files"] == 2
+    assert stats["bytes"] == 8
+
+
+@pytest.mark.asyncio
+async def test_existing_clips_are_indexed_on_startup(tmp_path):
+    old = tmp_path / "old.mp3"
+    old.write_bytes(b"x" * 4)
+    os.utime(old, (1, 1))
+    (tmp_path / "kept.mp3").write_bytes(b"x" * 4)
+    (tmp_path / "empty.mp3").write_bytes(b"")
+    stale = tmp_path / ".partial.mp3.abc.tmp"
+    stale.write_bytes(b"x")
+    os.utime(stale, (1, 1))
+    # Possibly still being written by another worker
+    (tmp_path / ".writing.mp3.def.tmp").write_bytes(b"x")
+
+    cache = VoiceClipCache(tmp_path, max_files=2)
+    synthesize = AsyncMock(side_effect=_write_mp3)
+    new = await cache.get_or_create("new", "v", synthesize)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [".writing.mp3.def.tmp", "kept.mp3", new]
+    )
@@ -0,0 +1,183 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from app.routers.voice import router
+from app.services.voice import ScriptSpeech, VoiceClipCache, clip_filename
+from app.services.voice_stream import VoiceStream, VoiceStreamRing
+from app.utils.exceptions import TTSGenerationError
+from fastapi import FastAPI
+
+
+async def _collect(stream):
+    return b"".join([chunk async for chunk in stream.read()])
+
+
+@pytest.mark.asyncio
+async def test_late_reader_starts_from_the_beginning():
+    stream = VoiceStream()
+    early = asyncio.create_task(_collect(stream))
+
+    stream.append(b"a")
+    stream.append(b"b")
+    await asyncio.sleep(0)
+    late = asyncio.create_task(_collect(stream))
+    stream.append(b"c")
+    stream.finish()
+
+    assert await early == b"abc"
+    assert await late == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_started_raises_when_nothing_was_produced():
+    stream = VoiceStream()
+    stream.finish(RuntimeError("no audio"))
+
+    with pytest.raises(RuntimeError):
+        await stream.started()
+
+
+def test_ring_drops_oldest_finished_stream():
+    ring = VoiceStreamRing(capacity=2)
+    ring.open("a")
+    ring.open("b").finish()
+    ring.open("c")
+
+    # "a" is still live, so the finished "b" goes instead
+    assert ring.get("a") is not None
+    assert ring.get("b") is None
+    assert ring.get("c") is not None
+    assert ring.stats()["dropped"] == 1
+
+    # With every stream live, none is dropped
+    ring.open("d")
+    assert ring.stats()["streams"] == 3
+
+
+class FakeCommunicate:
+    """edge_tts.Communicate whose audio is released chunk by chunk."""
+
+    chunks = [b"ID3", b"frame1", b"frame2"]
+
+    def __init__(self, text, voice):
+        self.release = FakeCommunicate.release
+
+    async def stream(self):
+        yield {"type": "WordBoundary"}
+        for chunk in self.chunks:
+            yield {"type": "audio", "data": chunk}
+            await self.release.wait()
+
+
+@pytest.fixture
+def voice_env(tmp_path):
+    cache = VoiceClipCache(tmp_path)
+    ring = VoiceStreamRing()
+    FakeCommunicate.release = asyncio.Event()
+    with (
+        patch("app.services.voice.voice_cache", cache),
+        patch("app.services.voice.voice_streams", ring),
+        patch("app.routers.voice.voice_cache", cache),
+        patch("app.routers.voice.voice_streams", ring),
+        patch("app.services.voice.BASE_URL", "http://test"),
+        patch("app.services.voice.edge_tts.Communicate", FakeCommunicate),
+    ):
+        yield cache, ring
+
+
+async def _sentences(*sentences):
+    for sentence in sentences:
+        yield sentence
+
+
+@pytest.mark.asyncio
+async def test_script_url_is_ready_after_first_chunk(voice_env):
+    cache, ring = voice_env
+
+    speech = ScriptSpeech(_sentences("Hello."), "v")
+    url = await speech.audio_url()
+
+    # Returned while synthesis is still running
+    assert url == f"http://test/voices/stream/{speech.name}"
+    stream = ring.get(speech.name)
+    assert stream.chunks == [b"ID3"]
+    assert not stream.done
+
+    FakeCommunicate.release.set()
+    assert await _collect(stream) == b"ID3frame1frame2"
+    assert await speech.text() == "Hello."
+
+    # Each sentence is written through to the clip cache
+    filename = clip_filename("Hello.", "v")
+    assert (cache.directory / filename).read_bytes() == b"ID3frame1frame2"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_script_stops_synthesis(voice_env, fresh_circuit_breakers):
+    cache, ring = voice_env
+
+    speech = ScriptSpeech(_sentences("Hello."), "v")
+    await speech.audio_url()
+    stream = ring.get(speech.name)
+
+    speech.cancel()
+    await asyncio.wait({speech._task})
+    FakeCommunicate.release.set()
+    await asyncio.sleep(0.01)
+
+    # Nothing is appended after the stream finished, and no partial clip is kept
+    assert stream.done
+    assert stream.chunks == [b"ID3"]
+    files = {p.name for p in cache.directory.iterdir()}
+    assert files == {speech.name}
+    assert fresh_circuit_breakers.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_serves_buffer_then_disk(voice_env):
+    cache, ring = voice_env
+    FakeCommunicate.release.set()
+    speech = ScriptSpeech(_sentences("Hello.", "Bye."), "v")
+    path = (await speech.audio_url()).removeprefix("http://test")
+    await speech.text()
+
+    app = FastAPI()
+    app.include_router(router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(path)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert response.content == b"ID3frame1frame2" * 2
+
+        # Once out of the in-memory ring, the whole script is served from disk
+        ring.clear()
+        response = await client.get(path)
+        assert response.status_code == 200
+        assert response.content == b"ID3frame1frame2" * 2
+
+        response = await client.get("/voices/stream/..%2F..%2Fsecret.mp3")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_script_failure_before_audio_raises(voice_env):
+    class Broken:
+        def __init__(self, text, voice):
+            pass
+
+        async def stream(self):
+            raise ConnectionError("offline")
+            yield
+
+    with patch("app.services.voice.edge_tts.Communicate", Broken):
+        speech = ScriptSpeech(_sentences("Hello.", "Bye."), "v")
+        with pytest.raises(TTSGenerationError):
+            await speech.audio_url()
+        # The text is still collected
+        assert await speech.text() == "Hello. Bye."
+
+    cache, _ = voice_env
+    assert list(cache.directory.iterdir()) == []
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -6,16 +7,20 @@ from app.events import (
     disconnect,
     join_room,
     remove_from_queue,
+    request_room_state,
     set_vibe,
     skip_song,
     toggle_playback,
 )
-from app.utils.models import RoomState, Track
+from app.services.prefetch import QueuePrefetcher
+from app.services.room_store import InMemoryRoomStore
+from app.state import SessionRegistry
+from app.utils.models import RoomState, RoomUser, Track
 
 
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_add_to_queue(mock_rooms, mock_sid_map, mock_sio):
     # Setup state
@@ -51,8 +56,8 @@ async def test_add_to_queue(mock_rooms, mock_sid_map, mock_sio):
 
 @patch("app.events.SpotifyService.fetch_user_top_items")
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_join_room_new(mock_rooms, mock_sid_map, mock_sio, mock_fetch_top):
     # Setup
@@ -98,8 +103,8 @@ async def test_join_room_new(mock_rooms, mock_sid_map, mock_sio, mock_fetch_top)
 
 
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_skip_song(mock_rooms, mock_sid_map, mock_sio):
     room_id = "r1"
@@ -131,8 +136,8 @@ async def test_skip_song(mock_rooms, mock_sid_map, mock_sio):
 
 
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_disconnect_leave(mock_rooms, mock_sid_map, mock_sio):
     room_id = "r1"
@@ -154,8 +159,52 @@ async def test_disconnect_leave(mock_rooms, mock_sid_map, mock_sio):
 
 
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_disconnect_keeps_user_with_other_session(
+    mock_rooms, mock_sid_map, mock_sio
+):
+    room = RoomState(users=[RoomUser(id="u1"), RoomUser(id="u2")])
+    mock_rooms["r1"] = room
+    mock_sid_map["tab1"] = {"room_id": "r1", "user_id": "u1"}
+    mock_sid_map["tab2"] = {"room_id": "r1", "user_id": "u1"}
+
+    await disconnect("tab1")
+    assert [u.id for u in room.users] == ["u1", "u2"]
+
+    await disconnect("tab2")
+    assert [u.id for u in room.users] == ["u2"]
+    assert mock_sid_map.room_sids("r1") == set()
+
+
+@patch("app.events.prefetcher", new_callable=QueuePrefetcher)
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_last_session_leaving_drops_candidate_pool(
+    mock_rooms, mock_sid_map, mock_sio, mock_prefetcher
+):
+    mock_rooms["r1"] = RoomState()
+    mock_sid_map["tab1"] = {"room_id": "r1", "user_id": "u1"}
+    mock_sid_map["tab2"] = {"room_id": "r1", "user_id": "u2"}
+    pool = mock_prefetcher._pool("r1")
+    pool.set_vibe("v")
+    pool.add(
+        [Track(uri="spotify:track:1", name="1", artist="a", duration_ms=1)], set(), "v"
+    )
+
+    await disconnect("tab1")
+    assert mock_prefetcher.buffered("r1") == 1
+
+    await disconnect("tab2")
+    assert "r1" not in mock_prefetcher._pools
+
+
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_toggle_playback(mock_rooms, mock_sid_map, mock_sio):
     room_id = "r1"
@@ -171,8 +220,8 @@ async def test_toggle_playback(mock_rooms, mock_sid_map, mock_sio):
 
 
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_remove_from_queue(mock_rooms, mock_sid_map, mock_sio):
     room_id = "r1"
@@ -189,8 +238,8 @@ async def test_remove_from_queue(mock_rooms, mock_sid_map, mock_sio):
 
 @patch("app.events.parse_mood", new_callable=AsyncMock)
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_set_vibe(mock_rooms, mock_sid_map, mock_sio, mock_parse_mood):
     room_id = "r1"
@@ -221,3 +270,247 @@ async def test_set_vibe(mock_rooms, mock_sid_map, mock_sio, mock_parse_mood):
         },
         room=room_id,
     )
+
+
+@patch(
+    "app.events.prefetcher",
+    new_callable=lambda: QueuePrefetcher(capacity=4, low_watermark=4),
+)
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_skip_song_auto_queues_from_prefetch(
+    mock_rooms, mock_sid_map, mock_sio, mock_prefetcher
+):
+    room_id = "r1"
+    mock_rooms[room_id] = RoomState()
+    room = mock_rooms[room_id]
+    room.ai_mode_enabled = False
+    room.current_track = Track(
+        uri="spotify:track:1", name="1", artist="a", duration_ms=1
+    )
+    mock_sid_map["sid"] = {"room_id": room_id, "user_id": "u1", "token": "tok"}
+
+    recs = [
+        {
+            "uri": f"spotify:track:rec{i}",
+            "name": f"Rec {i}",
+            "artists": [{"name": "A"}],
+            "album": {"images": []},
+            "duration_ms": 1000,
+        }
+        for i in range(5)
+    ]
+
+    with patch(
+        "app.services.prefetch.get_recommendations", new_callable=AsyncMock
+    ) as mock_recs:
+        mock_recs.return_value = recs
+
+        # Cold start: skip waits for the first batch
+        await skip_song("sid", {"room_id": room_id})
+        assert room.current_track.uri == "spotify:track:rec0"
+        assert len(room.queue) == 2
+        assert mock_recs.call_count == 1
+
+        # Background refill after play tops the buffer back up
+        await mock_prefetcher.wait(room_id)
+        assert mock_prefetcher.buffered(room_id) == 2
+
+        # Warm: queue drops below 2 and is topped up from the buffer
+        await skip_song("sid", {"room_id": room_id})
+        await skip_song("sid", {"room_id": room_id})
+        assert room.current_track.uri == "spotify:track:rec2"
+        assert [t.uri for t in room.queue] == [
+            "spotify:track:rec3",
+            "spotify:track:rec4",
+        ]
+
+
+@patch("app.events.prefetcher", new_callable=QueuePrefetcher)
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_cold_start_skip_survives_vibe_change(
+    mock_rooms, mock_sid_map, mock_sio, mock_prefetcher
+):
+    room_id = "r1"
+    mock_rooms[room_id] = RoomState()
+    room = mock_rooms[room_id]
+    room.ai_mode_enabled = False
+    room.current_track = Track(
+        uri="spotify:track:1", name="1", artist="a", duration_ms=1
+    )
+    mock_sid_map["sid"] = {"room_id": room_id, "user_id": "u1", "token": "tok"}
+    fetching = asyncio.Event()
+
+    async def slow_recs(*args):
+        fetching.set()
+        await asyncio.sleep(10)
+        return []
+
+    with patch("app.services.prefetch.get_recommendations", side_effect=slow_recs):
+        skip = asyncio.create_task(skip_song("sid", {"room_id": room_id}))
+        await fetching.wait()
+
+        # set_vibe cancels the refill the cold-start skip is waiting on
+        mock_prefetcher.invalidate(room_id, room)
+        await asyncio.wait_for(skip, timeout=1)
+
+    # The skip still went through, with nothing left to play
+    assert room.current_track is None
+    assert room.history[0].uri == "spotify:track:1"
+    mock_sio.emit.assert_any_call("stop_player", room=room_id)
+
+
+@patch(
+    "app.events.prefetcher",
+    new_callable=lambda: QueuePrefetcher(capacity=10, low_watermark=2),
+)
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_skip_keeps_candidates_it_did_not_queue(
+    mock_rooms, mock_sid_map, mock_sio, mock_prefetcher
+):
+    room_id = "r1"
+    mock_rooms[room_id] = RoomState()
+    room = mock_rooms[room_id]
+    room.ai_mode_enabled = False
+    room.current_track = Track(
+        uri="spotify:track:1", name="1", artist="a", duration_ms=1
+    )
+    mock_sid_map["sid"] = {"room_id": room_id, "user_id": "u1", "token": "tok"}
+    fetching = asyncio.Event()
+    release = asyncio.Event()
+    recs = [
+        {
+            "uri": f"spotify:track:rec{i}",
+            "name": f"Rec {i}",
+            "artists": [{"name": "A"}],
+            "album": {"images": []},
+            "duration_ms": 1000,
+        }
+        for i in range(5)
+    ]
+
+    async def slow_recs(*args):
+        fetching.set()
+        await release.wait()
+        return recs
+
+    with patch("app.services.prefetch.get_recommendations", side_effect=slow_recs):
+        skip = asyncio.create_task(skip_song("sid", {"room_id": room_id}))
+        await fetching.wait()
+
+        # Users fill the queue while the cold-start skip waits
+        room.queue = [
+            Track(uri=f"spotify:track:q{i}", name="q", artist="a", duration_ms=1)
+            for i in range(2)
+        ]
+        release.set()
+        await asyncio.wait_for(skip, timeout=1)
+
+    assert room.current_track.uri == "spotify:track:q0"
+    assert [t.uri for t in room.queue] == ["spotify:track:q1"]
+
+    # Nothing was auto-queued, so every candidate is still in the pool
+    assert mock_prefetcher.buffered(room_id) == 5
+    taken = mock_prefetcher.take(room_id, room, 3)
+    assert [t.uri for t in taken] == [f"spotify:track:rec{i}" for i in range(3)]
+
+
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_room_state_is_sent_as_patches(mock_rooms, mock_sid_map, mock_sio):
+    await join_room("sid1", {"room_id": "r1"})
+    mock_sio.emit.reset_mock()
+
+    # Second joiner: existing members get a patch, the joiner a full snapshot
+    profile = {"id": "u2", "display_name": "User 2"}
+    await join_room("sid2", {"room_id": "r1", "user_profile": profile})
+
+    patch_call, snapshot_call = mock_sio.emit.call_args_list
+    assert patch_call.args[0] == "room_patch"
+    assert patch_call.kwargs == {"room": "r1", "skip_sid": "sid2"}
+    assert patch_call.args[1]["base"] == 1
+    assert patch_call.args[1]["ops"] == [
+        {
+            "op": "add",
+            "path": "/users/0",
+            "value": {"id": "u2", "name": "User 2", "image": None},
+        }
+    ]
+    assert snapshot_call.args[0] == "room_state"
+    assert snapshot_call.kwargs == {"room": "sid2"}
+    assert snapshot_call.args[1]["seq"] == 2
+
+    # A client that fell behind asks for a resync
+    mock_sio.emit.reset_mock()
+    await request_room_state("sid1", {})
+    mock_sio.emit.assert_called_once()
+    event, payload = mock_sio.emit.call_args.args
+    assert event == "room_state"
+    assert payload["seq"] == 2
+    assert [u["id"] for u in payload["users"]] == ["u2"]
+
+
+@patch("app.events.pregenerate_dj_voice", new_callable=AsyncMock, return_value=None)
+@patch("app.events.trigger_dj_voice", new_callable=AsyncMock)
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_concurrent_skips_are_serialized(
+    mock_rooms,
+    mock_sid_map,
+    mock_sio,
+    mock_dj_voice,
+    mock_pregen,
+    fresh_dj_commentary,
+):
+    from app.events import room_locks
+
+    room = RoomState()
+    room.current_track = Track(uri="0", name="0", artist="a", duration_ms=1)
+    room.queue = [
+        Track(uri=str(i), name=str(i), artist="a", duration_ms=1, uuid=str(i))
+        for i in range(1, 5)
+    ]
+    mock_rooms["r1"] = room
+
+    played = []
+
+    async def emit(event, data=None, **kwargs):
+        if event == "play_track":
+            # Room updates and their broadcasts happen under the room lock
+            assert room_locks.locked("r1")
+            played.append((data["uri"], room.current_track.uri))
+        await asyncio.sleep(0)
+
+    announced = []
+
+    async def dj_voice(room_id, track):
+        # Slow LLM and TTS work
+        await asyncio.sleep(0.05)
+        announced.append(track.uri)
+
+    mock_sio.emit.side_effect = emit
+    mock_dj_voice.side_effect = dj_voice
+
+    await asyncio.gather(*(skip_song("sid", {"room_id": "r1"}) for _ in range(2)))
+
+    # Each announced track is the one the room was playing at that moment
+    assert played == [("1", "1"), ("2", "2")]
+    assert [t.uri for t in room.history] == ["1", "0"]
+
+    # Handlers return before commentary; the stale intro for "1" is dropped
+    assert announced == []
+    await fresh_dj_commentary.wait("r1")
+    assert announced == ["2"]
+    assert fresh_dj_commentary.stats()["cancelled"] == 1
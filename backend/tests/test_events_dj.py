@@ -1,17 +1,22 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from app.events import add_to_queue
-from app.utils.models import RoomState, RoomUser
+from app.events import add_to_queue, remove_from_queue, skip_song
+from app.services.room_store import InMemoryRoomStore
+from app.state import SessionRegistry
+from app.utils.models import RoomState, RoomUser, Track
 
 
+# Whole script, then whole clip; the streaming path is covered below
+@patch("app.events.settings.voice_streaming", False)
 @patch("app.events.generate_dj_script")
 @patch("app.events.sio", new_callable=AsyncMock)
-@patch("app.events.sid_map", new_callable=dict)
-@patch("app.events.rooms", new_callable=dict)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
 @pytest.mark.asyncio
 async def test_dj_commentary_on_play(
-    mock_rooms, mock_sid_map, mock_sio, mock_generate_script
+    mock_rooms, mock_sid_map, mock_sio, mock_generate_script, fresh_dj_commentary
 ):
     # Setup state
     room_id = "test_room_dj"
@@ -54,6 +59,9 @@ async def test_dj_commentary_on_play(
         # Action: add_to_queue (will trigger play since queue empty)
         await add_to_queue(sid, data)
 
+        # Commentary is generated in the background
+        await fresh_dj_commentary.wait(room_id)
+
         # Check if generate_dj_script was called
         assert mock_generate_script.called
 
@@ -71,3 +79,229 @@ async def test_dj_commentary_on_play(
                 break
 
         assert found
+
+
+def _queued(i):
+    return Track(
+        uri=f"spotify:track:{i}",
+        name=f"Song {i}",
+        artist="Artist",
+        duration_ms=1000,
+        uuid=str(i),
+    )
+
+
+@patch("app.services.voice.generate_voice_clip", new_callable=AsyncMock)
+@patch("app.events.generate_dj_script")
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_pregenerated_commentary_is_emitted_on_play(
+    mock_rooms,
+    mock_sid_map,
+    mock_sio,
+    mock_generate_script,
+    mock_voice,
+    fresh_dj_commentary,
+    fresh_dj_pregen,
+):
+    room_id = "r1"
+    mock_rooms[room_id] = RoomState(current_track=_queued(0), queue=[_queued(1)])
+    mock_generate_script.side_effect = ["Intro for 1", "Intro for 2"]
+    mock_voice.return_value = "http://test-url/voice.mp3"
+
+    # Queueing a track prepares the next intro while song 0 plays
+    data = {"room_id": room_id, "track": _queued(2).model_dump()}
+    await add_to_queue("sid", data)
+    await fresh_dj_pregen.wait(room_id)
+
+    context = mock_generate_script.call_args.args[0]
+    assert context["current_song_name"] == "Song 1"
+    assert context["next_song_name"] == "Song 2"
+
+    mock_sio.emit.reset_mock()
+    await skip_song("sid", {"room_id": room_id})
+
+    events = [c.args[0] for c in mock_sio.emit.call_args_list]
+    assert events[:2] == ["play_track", "dj_commentary"]
+    assert mock_sio.emit.call_args_list[1].args[1] == {
+        "text": "Intro for 1",
+        "audio_url": "http://test-url/voice.mp3",
+    }
+    # Nothing left to generate for the track that just started
+    assert fresh_dj_commentary.stats()["submitted"] == 0
+    assert fresh_dj_pregen.stats()["hits"] == 1
+
+
+@patch("app.services.voice.generate_voice_clip", new_callable=AsyncMock)
+@patch("app.events.generate_dj_script")
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_pregenerated_commentary_follows_queue_changes(
+    mock_rooms,
+    mock_sid_map,
+    mock_sio,
+    mock_generate_script,
+    mock_voice,
+    fresh_dj_commentary,
+    fresh_dj_pregen,
+):
+    room_id = "r1"
+    mock_rooms[room_id] = RoomState(current_track=_queued(0), queue=[_queued(1)])
+    mock_generate_script.side_effect = ["Up next: 2", "Up next: nothing"]
+    mock_voice.return_value = None
+
+    await add_to_queue("sid", {"room_id": room_id, "track": _queued(2).model_dump()})
+    await fresh_dj_pregen.wait(room_id)
+
+    # The prepared intro mentions the removed track, so it is redone
+    queued = (await mock_rooms.get(room_id)).queue
+    await remove_from_queue("sid", {"room_id": room_id, "track_uuid": queued[1].uuid})
+    await fresh_dj_pregen.wait(room_id)
+
+    assert mock_generate_script.call_count == 2
+    context = mock_generate_script.call_args.args[0]
+    assert context["next_song_name"] == "nothing queued"
+    assert fresh_dj_pregen.stats()["invalidated"] == 1
+
+    mock_sio.emit.reset_mock()
+    await skip_song("sid", {"room_id": room_id})
+
+    commentary = [
+        c.args[1] for c in mock_sio.emit.call_args_list if c.args[0] == "dj_commentary"
+    ]
+    assert commentary == [{"text": "Up next: nothing", "audio_url": None}]
+
+
+class FakeCommunicate:
+    """edge_tts.Communicate that speaks the text back as bytes."""
+
+    def __init__(self, text, voice):
+        self.text = text
+
+    async def stream(self):
+        yield {"type": "audio", "data": self.text.encode()}
+
+
+@pytest.fixture
+def voice_env(tmp_path):
+    from app.services.voice import VoiceClipCache
+    from app.services.voice_stream import VoiceStreamRing
+
+    ring = VoiceStreamRing()
+    with (
+        patch("app.services.voice.voice_cache", VoiceClipCache(tmp_path)),
+        patch("app.services.voice.voice_streams", ring),
+        patch("app.services.voice.BASE_URL", "http://test"),
+        patch("app.services.voice.edge_tts.Communicate", FakeCommunicate),
+    ):
+        yield ring
+
+
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_streamed_commentary_starts_on_first_sentence(
+    mock_rooms, mock_sio, voice_env
+):
+    from app.events import trigger_dj_voice
+
+    mock_rooms["r1"] = RoomState()
+    finish_script = asyncio.Event()
+
+    async def generate_stream(system_prompt, user_prompt):
+        yield "Yo! Big tune"
+        await finish_script.wait()
+        yield " from Song 1. Enjoy it."
+
+    client = AsyncMock()
+    client.generate_stream = generate_stream
+
+    with patch("app.services.llm.get_llm_client", return_value=client):
+        task = asyncio.create_task(trigger_dj_voice("r1", _queued(1)))
+        while not mock_sio.emit.called:
+            await asyncio.sleep(0.01)
+
+        # Emitted while the LLM is still writing the rest
+        event, payload = mock_sio.emit.call_args.args
+        assert event == "dj_commentary"
+        assert payload["text"] == "Yo!"
+        assert payload["audio_url"].startswith("http://test/voices/stream/")
+
+        finish_script.set()
+        await task
+
+    event, payload = mock_sio.emit.call_args.args
+    assert event == "dj_commentary_text"
+    assert payload == {"text": "Big tune from Song 1. Enjoy it."}
+
+    # One stream carries every sentence in order
+    audio_url = mock_sio.emit.call_args_list[0].args[1]["audio_url"]
+    stream = voice_env.get(audio_url.rsplit("/", 1)[1])
+    assert stream.done
+    assert b"".join(stream.chunks) == b"Yo!Big tune from Song 1.Enjoy it."
+
+
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_streamed_commentary_falls_back_to_text(mock_rooms, mock_sio, voice_env):
+    from app.events import trigger_dj_voice
+
+    mock_rooms["r1"] = RoomState()
+
+    async def generate_stream(system_prompt, user_prompt):
+        yield "Yo! Big tune."
+
+    client = AsyncMock()
+    client.generate_stream = generate_stream
+
+    class Offline(FakeCommunicate):
+        async def stream(self):
+            raise ConnectionError("offline")
+            yield
+
+    with (
+        patch("app.services.llm.get_llm_client", return_value=client),
+        patch("app.services.voice.edge_tts.Communicate", Offline),
+    ):
+        await trigger_dj_voice("r1", _queued(1))
+
+    mock_sio.emit.assert_called_once_with(
+        "dj_commentary", {"text": "Yo! Big tune.", "audio_url": None}, room="r1"
+    )
+
+
+@patch("app.events.sio", new_callable=AsyncMock)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_open_tts_circuit_is_not_logged_as_error(
+    mock_rooms, mock_sio, voice_env, fresh_circuit_breakers
+):
+    from app.events import trigger_dj_voice
+
+    mock_rooms["r1"] = RoomState()
+    for _ in range(fresh_circuit_breakers.failure_threshold):
+        fresh_circuit_breakers.failure()
+
+    async def generate_stream(system_prompt, user_prompt):
+        yield "Yo! Big tune."
+
+    client = AsyncMock()
+    client.generate_stream = generate_stream
+
+    with (
+        patch("app.services.llm.get_llm_client", return_value=client),
+        patch("app.events.logger") as events_logger,
+        patch("app.services.voice.logger") as voice_logger,
+    ):
+        await trigger_dj_voice("r1", _queued(1))
+
+    mock_sio.emit.assert_called_once_with(
+        "dj_commentary", {"text": "Yo! Big tune.", "audio_url": None}, room="r1"
+    )
+    events_logger.error.assert_not_called()
+    voice_logger.error.assert_not_called()
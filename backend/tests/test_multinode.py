@@ -0,0 +1,116 @@
+"""
+Two Socket.IO server instances sharing the configured message queue, each
+served by its own uvicorn server, with real clients connected to different
+instances.
+"""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+import socketio
+from app.core.config import Settings
+from app.events import add_to_queue, join_room
+from app.services.room_store import InMemoryRoomStore
+from app.services.socket_manager import get_client_manager
+from app.state import SessionRegistry
+
+uvicorn = pytest.importorskip("uvicorn")
+pytest.importorskip("aiohttp")
+
+
+async def _start_instance():
+    manager = get_client_manager()
+    sio = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+
+    config = uvicorn.Config(
+        socketio.ASGIApp(sio), host="127.0.0.1", port=0, log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return sio, server, task, manager, f"http://127.0.0.1:{port}"
+
+
+@pytest_asyncio.fixture
+async def instances():
+    settings = Settings.get_settings()
+    with (
+        patch.object(settings, "socketio_message_queue", "memory://"),
+        patch.object(settings, "socketio_channel", f"test-{uuid.uuid4().hex}"),
+    ):
+        started = [await _start_instance() for _ in range(2)]
+    yield [(sio, url) for sio, _, _, _, url in started]
+
+    for _, server, task, manager, _ in started:
+        server.should_exit = True
+        await task
+        manager.close()
+
+
+async def _client(url: str, *events: str):
+    client = socketio.AsyncClient()
+    received = asyncio.Queue()
+    for event in events:
+        client.on(event, lambda data, event=event: received.put_nowait((event, data)))
+    await client.connect(url, transports=["websocket"])
+    return client, received
+
+
+async def _next(inbox: asyncio.Queue, event: str):
+    while True:
+        name, data = await asyncio.wait_for(inbox.get(), 2)
+        if name == event:
+            return data
+
+
+@patch("app.events.pregenerate_dj_voice", new_callable=AsyncMock, return_value=None)
+@patch("app.events.trigger_dj_voice", new_callable=AsyncMock)
+@patch("app.events.sid_map", new_callable=SessionRegistry)
+@patch("app.events.rooms", new_callable=InMemoryRoomStore)
+@pytest.mark.asyncio
+async def test_queue_change_reaches_other_instance(
+    mock_rooms, mock_sid_map, mock_dj_voice, mock_pregen, instances
+):
+    (node_a, url_a), (node_b, url_b) = instances
+
+    # Node A runs the app's handlers; they emit through app.events.sio
+    node_a.on("join_room", join_room)
+    node_a.on("add_to_queue", add_to_queue)
+
+    # Node B only puts its sockets in rooms, so every event they get from
+    # the handlers above crossed the message queue
+    @node_b.on("join_room")
+    async def join_on_b(sid, data):
+        await node_b.enter_room(sid, data["room_id"])
+        return True
+
+    alice, alice_inbox = await _client(url_a, "room_state", "play_track")
+    bob, bob_inbox = await _client(url_b, "play_track")
+    eve, eve_inbox = await _client(url_b, "play_track")
+
+    try:
+        with patch("app.events.sio", node_a):
+            await alice.emit("join_room", {"room_id": "r1"})
+            await _next(alice_inbox, "room_state")
+            assert await bob.call("join_room", {"room_id": "r1"})
+            assert await eve.call("join_room", {"room_id": "other"})
+
+            track = {"uri": "spotify:track:1", "name": "One", "artist": "A"}
+            await alice.emit("add_to_queue", {"room_id": "r1", "track": track})
+
+            played = await _next(bob_inbox, "play_track")
+            assert played["uri"] == "spotify:track:1"
+            assert (await _next(alice_inbox, "play_track"))["uri"] == played["uri"]
+
+            # Other rooms on either instance stay untouched
+            await asyncio.sleep(0.1)
+            assert eve_inbox.empty()
+    finally:
+        for client in (alice, bob, eve):
+            await client.disconnect()
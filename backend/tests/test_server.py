@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.server import app, lifespan
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_producers_before_the_services_they_use():
+    closed = []
+
+    def closer(name):
+        return AsyncMock(side_effect=lambda: closed.append(name))
+
+    with (
+        patch("app.server.SpotifyService.get_client", MagicMock()),
+        patch("app.server.SpotifyService.aclose", closer("spotify")),
+        patch("app.server.llm_registry.warm_up", AsyncMock()),
+        patch("app.server.llm_registry.aclose", closer("llm")),
+        patch("app.server.dj_script_batcher.aclose", closer("batcher")),
+        patch("app.server.dj_fallbacks.aclose", closer("fallbacks")),
+        patch("app.server.prefetcher.aclose", closer("prefetcher")),
+        patch("app.server.settings.dj_fallback_prerender", False),
+        patch("app.events.dj_commentary.aclose", closer("commentary")),
+        patch("app.events.dj_pregen.aclose", closer("pregen")),
+        patch("app.state.rooms.aclose", closer("rooms")),
+    ):
+        async with lifespan(app):
+            pass
+
+    assert closed == [
+        "commentary",
+        "pregen",
+        "prefetcher",
+        "fallbacks",
+        "batcher",
+        "llm",
+        "spotify",
+        "rooms",
+    ]
@@ -0,0 +1,46 @@
+from app.state import SessionRegistry
+
+
+def test_registry_indexes_sessions():
+    registry = SessionRegistry()
+    registry["s1"] = {"room_id": "r1", "user_id": "u1", "token": "t1"}
+    registry["s2"] = {"room_id": "r1", "user_id": "u1", "token": None}
+    registry["s3"] = {"room_id": "r2", "user_id": "anonymous"}
+
+    assert registry["s1"]["token"] == "t1"
+    assert len(registry) == 3
+    assert registry.room_sids("r1") == {"s1", "s2"}
+    assert registry.user_sids("r1", "u1") == {"s1", "s2"}
+    assert registry.user_sids("r2", "u1") == set()
+    assert registry.room_token("r1") == "t1"
+    assert registry.room_token("r1", exclude_sid="s1") is None
+    assert registry.room_token("r2") is None
+
+
+def test_registry_reindexes_on_reassign_and_delete():
+    registry = SessionRegistry()
+    registry["s1"] = {"room_id": "r1", "user_id": "u1", "token": "t1"}
+
+    # Same socket joins another room
+    registry["s1"] = {"room_id": "r2", "user_id": "u1", "token": "t2"}
+    assert registry.room_sids("r1") == set()
+    assert registry.room_token("r1") is None
+    assert registry.room_token("r2") == "t2"
+
+    del registry["s1"]
+    assert "s1" not in registry
+    assert registry.room_sids("r2") == set()
+    assert registry.user_sids("r2", "u1") == set()
+    assert registry.room_token("r2") is None
+    # Empty index entries are dropped rather than left behind
+    assert not registry._room_sids and not registry._user_sids
+    assert not registry._room_tokens
+
+
+def test_registry_token_fallback_keeps_join_order():
+    registry = SessionRegistry()
+    registry["s1"] = {"room_id": "r1", "user_id": "u1", "token": "t1"}
+    registry["s2"] = {"room_id": "r1", "user_id": "u2", "token": "t2"}
+
+    del registry["s1"]
+    assert registry.room_token("r1") == "t2"
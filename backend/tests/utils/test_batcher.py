@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from app.utils.batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_items_share_a_batch():
+    batches = []
+
+    async def run(items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run, window=0.01)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert results == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+    assert batcher.stats()["largest"] == 3
+
+
+@pytest.mark.asyncio
+async def test_lone_item_is_sent_without_waiting():
+    async def run(items):
+        return items
+
+    batcher = MicroBatcher(run, window=10)
+    assert await asyncio.wait_for(batcher.submit(1), timeout=1) == 1
+
+
+@pytest.mark.asyncio
+async def test_items_arriving_during_a_batch_share_the_next():
+    batches = []
+    release = asyncio.Event()
+
+    async def run(items):
+        batches.append(items)
+        await release.wait()
+        return items
+
+    batcher = MicroBatcher(run, window=0.01)
+    first = asyncio.create_task(batcher.submit(0))
+    await asyncio.sleep(0.001)
+    assert batches == [[0]]
+
+    rest = [asyncio.create_task(batcher.submit(i)) for i in (1, 2)]
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await asyncio.gather(first, *rest) == [0, 1, 2]
+    assert batches == [[0], [1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting():
+    batches = []
+
+    async def run(items):
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(run, window=10, max_size=2)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+    )
+
+    assert results == [0, 1, 2, 3]
+    assert batches == [[0, 1], [2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    async def run(items):
+        raise ConnectionError("down")
+
+    batcher = MicroBatcher(run, window=0.01)
+    results = await asyncio.gather(
+        batcher.submit(1), batcher.submit(2), return_exceptions=True
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_short_result_list_fails_instead_of_hanging():
+    async def run(items):
+        return items[:1]
+
+    batcher = MicroBatcher(run, window=0.01)
+    with pytest.raises(ValueError):
+        await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_are_left_out():
+    batches = []
+
+    async def run(items):
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(run, window=0.01)
+    gone = asyncio.create_task(batcher.submit("gone"))
+    await asyncio.sleep(0)
+    gone.cancel()
+
+    assert await batcher.submit("kept") == "kept"
+    assert batches == [["kept"]]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_releases_its_callers():
+    started = asyncio.Event()
+
+    async def run(items):
+        started.set()
+        await asyncio.sleep(10)
+        return items
+
+    batcher = MicroBatcher(run, window=0.01)
+    callers = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+    await started.wait()
+
+    for task in list(batcher._tasks):
+        task.cancel()
+    results = await asyncio.wait_for(
+        asyncio.gather(*callers, return_exceptions=True), timeout=1
+    )
+
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
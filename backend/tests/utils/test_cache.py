@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+from app.utils.cache import TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Touch 'a' so 'b' becomes least recently used
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+
+
+def test_cache_expiry():
+    cache = TTLCache(maxsize=10, default_ttl=5)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+
+    with patch("app.utils.cache.time.monotonic", return_value=110.0):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+def test_cache_stats():
+    cache = TTLCache(maxsize=10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_items_skip_expired_entries():
+    cache = TTLCache(maxsize=4)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("old", 1, ttl=5)
+        cache.set("new", 2, ttl=50)
+
+    with patch("app.utils.cache.time.monotonic", return_value=110.0):
+        assert list(cache.items()) == [("new", 2)]
+
+    # Iterating is not a lookup
+    assert cache.hits == 0
+    assert cache.misses == 0
@@ -0,0 +1,115 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from app.utils.circuit_breaker import CircuitBreaker, CircuitBreakers
+from app.utils.exceptions import CircuitOpenError
+
+
+async def _fail():
+    raise ConnectionError("down")
+
+
+async def _ok():
+    return "ok"
+
+
+async def _trip(breaker, times):
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+
+
+@pytest.mark.asyncio
+async def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+
+    await _trip(breaker, 2)
+    assert await breaker.call(_ok) == "ok"
+    # A success resets the count
+    await _trip(breaker, 2)
+    assert breaker.state == "closed"
+
+    await _trip(breaker, 1)
+    assert breaker.state == "open"
+
+    calls = []
+
+    async def tracked():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(tracked)
+    assert calls == []
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_call():
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=100.0):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+        await _trip(breaker, 1)
+
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=131.0):
+        assert breaker.state == "half_open"
+
+        # A failed trial opens the circuit again
+        await _trip(breaker, 1)
+        assert breaker.state == "open"
+
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=162.0):
+        assert await breaker.call(_ok) == "ok"
+        assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_one_trial_at_a_time():
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=100.0):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+        await _trip(breaker, 1)
+
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    with patch("app.utils.circuit_breaker.time.monotonic", return_value=131.0):
+        trial = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(_ok)
+
+        # A cancelled trial frees the slot
+        trial.cancel()
+        await asyncio.sleep(0)
+        assert await breaker.call(_ok) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_stream_counts_once_read():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    async def chunks():
+        yield 1
+        raise ConnectionError("cut off")
+
+    with pytest.raises(ConnectionError):
+        async for _ in breaker.stream(chunks()):
+            pass
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        async for _ in breaker.stream(chunks()):
+            pass
+
+
+def test_breakers_are_per_provider():
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=5)
+
+    assert breakers.get("a") is breakers.get("a")
+    assert breakers.get("a") is not breakers.get("b")
+    assert breakers.get("b").failure_threshold == 2
+    assert set(breakers.stats()) == {"a", "b"}
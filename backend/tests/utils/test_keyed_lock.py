@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from app.utils.keyed_lock import KeyedLock
+
+
+@pytest.mark.asyncio
+async def test_same_key_runs_one_at_a_time():
+    locks = KeyedLock()
+    active = 0
+    peak = 0
+    order = []
+
+    async def work(i):
+        nonlocal active, peak
+        async with locks("r1"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001)
+            order.append(i)
+            active -= 1
+
+    await asyncio.gather(*(work(i) for i in range(5)))
+
+    assert peak == 1
+    assert order == [0, 1, 2, 3, 4]
+    # Idle keys are forgotten
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_concurrently():
+    locks = KeyedLock()
+    inside = asyncio.Event()
+
+    async def hold_r1():
+        async with locks("r1"):
+            await inside.wait()
+
+    task = asyncio.create_task(hold_r1())
+    await asyncio.sleep(0)
+    assert locks.locked("r1")
+
+    async with locks("r2"):
+        assert locks.locked("r2")
+        inside.set()
+
+    await task
+    assert not locks.locked("r1")
+
+
+@pytest.mark.asyncio
+async def test_lock_released_on_error():
+    locks = KeyedLock()
+
+    with pytest.raises(RuntimeError):
+        async with locks("r1"):
+            raise RuntimeError("boom")
+
+    assert not locks.locked("r1")
+    assert len(locks) == 0
@@ -0,0 +1,44 @@
+import pytest
+from app.utils.sentences import split_sentences
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _split(*parts):
+    return [s async for s in split_sentences(_chunks(*parts))]
+
+
+@pytest.mark.asyncio
+async def test_sentences_are_yielded_once_complete():
+    sentences = split_sentences(
+        _chunks("Hey there", "! Next up", " is Song 2. ", "Enjoy")
+    )
+
+    # The first sentence is ready before the rest of the text arrives
+    assert await anext(sentences) == "Hey there!"
+    assert [s async for s in sentences] == ["Next up is Song 2.", "Enjoy"]
+
+
+@pytest.mark.asyncio
+async def test_sentence_end_needs_following_whitespace():
+    assert await _split("Version 2.5 ", "is out. ") == ["Version 2.5 is out."]
+    # Quotes and brackets stay with their sentence
+    assert await _split('He said "wow!" then left.') == ['He said "wow!"', "then left."]
+
+
+@pytest.mark.asyncio
+async def test_abbreviations_do_not_split():
+    assert await _split("Mr. Brightside by The Killers! Feat. ", "Dr. Dre. Go") == [
+        "Mr. Brightside by The Killers!",
+        "Feat. Dr. Dre.",
+        "Go",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_empty_stream():
+    assert await _split() == []
+    assert await _split("  ") == []
@@ -15,6 +15,7 @@ import VibeCheck from './components/VibeCheck'
 
 
 import { logger } from './utils/logger'
+import { applyRoomPatch } from './utils/roomPatch'
 import { VERSION } from './version'
 
 // Connect to the backend
@@ -55,6 +56,8 @@ function App() {
 
 
   const searchTimeout = useRef(null)
+  // Last room_state/room_patch applied, so patches can be checked against their base seq
+  const roomSync = useRef({ seq: null, state: null })
 
   useEffect(() => {
     // Check for token in URL or LocalStorage
@@ -157,7 +160,7 @@ function App() {
       addLog('Disconnected')
     }
 
-    function onRoomState(state) {
+    function applyRoomState(state) {
       setCurrentTrack(state.current_track)
       setIsPlaying(state.is_playing)
       setQueue(state.queue)
@@ -171,6 +174,27 @@ function App() {
       }
     }
 
+    function onRoomState(state) {
+      roomSync.current = { seq: state.seq ?? null, state }
+      applyRoomState(state)
+    }
+
+    function onRoomPatch(patch) {
+      const { seq, state } = roomSync.current
+      if (!state) return // Not in a room (yet); the join snapshot brings us up to date
+
+      if (patch.base !== seq) {
+        // Missed an update; ask for a full snapshot instead
+        logger.warn(`Room state out of sync (have ${seq}, patch base ${patch.base}), resyncing`)
+        socket.emit('request_room_state', {})
+        return
+      }
+
+      const next = applyRoomPatch(state, patch.ops)
+      roomSync.current = { seq: patch.seq, state: next }
+      applyRoomState(next)
+    }
+
     function onUserListUpdated(users) {
       setUsersInRoom(users)
     }
@@ -275,9 +299,15 @@ function App() {
       }
     }
 
+    // Rest of a streamed script; its audio is already playing
+    function onDJCommentaryText(data) {
+      if (data?.text) addLog(`DJ HAL: ${data.text}`)
+    }
+
     socket.on('connect', onConnect) // Need to bind connect explicitly if late bind
     socket.on('disconnect', onDisconnect)
     socket.on('room_state', onRoomState)
+    socket.on('room_patch', onRoomPatch)
     socket.on('user_list_updated', onUserListUpdated)
     socket.on('play_track', onPlayTrack)
     socket.on('queue_updated', onQueueUpdated)
@@ -286,6 +316,7 @@ function App() {
     socket.on('stop_player', onStopPlayer)
     socket.on('repeat_mode_changed', onRepeatModeChanged)
     socket.on('dj_commentary', onDJCommentary) // NEW LISTENER
+    socket.on('dj_commentary_text', onDJCommentaryText)
 
     // Check initial connection
     if (socket.connected) setIsConnected(true)
@@ -294,6 +325,7 @@ function App() {
       socket.off('connect', onConnect)
       socket.off('disconnect', onDisconnect)
       socket.off('room_state', onRoomState)
+      socket.off('room_patch', onRoomPatch)
       socket.off('user_list_updated', onUserListUpdated)
       socket.off('play_track', onPlayTrack)
       socket.off('queue_updated', onQueueUpdated)
@@ -302,6 +334,7 @@ function App() {
       socket.off('stop_player', onStopPlayer)
       socket.off('repeat_mode_changed', onRepeatModeChanged)
       socket.off('dj_commentary', onDJCommentary) // CLEANUP
+      socket.off('dj_commentary_text', onDJCommentaryText)
     }
   }, [player, deviceId, token, userProfile, volume])
 
@@ -338,6 +371,7 @@ function App() {
     if (player) player.pause()
     setIsPlaying(false)
     setJoinedRoom(null)
+    roomSync.current = { seq: null, state: null }
     setCurrentTrack(null)
     setQueue([])
     setHistory([])
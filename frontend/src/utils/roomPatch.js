@@ -0,0 +1,31 @@
+// Applies the JSON-patch ops of a `room_patch` event to the last known room state.
+// Ops use paths like "/is_playing" or "/queue/3" and are applied in order.
+export function applyRoomPatch(state, ops) {
+    const next = { ...state };
+    const copied = new Set();
+
+    for (const { op, path, value } of ops) {
+        const [field, index] = path.split('/').slice(1);
+
+        if (index === undefined) {
+            if (op === 'remove') delete next[field];
+            else next[field] = value;
+            continue;
+        }
+
+        // Copy each list once so React sees a new reference
+        if (!copied.has(field)) {
+            next[field] = [...(next[field] || [])];
+            copied.add(field);
+        }
+
+        const list = next[field];
+        const i = index === '-' ? list.length : Number(index);
+
+        if (op === 'add') list.splice(i, 0, value);
+        else if (op === 'remove') list.splice(i, 1);
+        else list[i] = value;
+    }
+
+    return next;
+}